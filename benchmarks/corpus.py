@@ -0,0 +1,109 @@
+"""
+Deterministic synthetic corpus for benchmarks: resumes and job descriptions
+drawn from skills/skill_list.txt, as plain text and as generated PDFs.
+"""
+import random
+
+from core_engine.rule_engine.skill_matcher import load_skill_map, DEFAULT_SKILL_FILE
+from core_engine.nlp_engine.parity import ROLES, PHRASES
+
+# Approximate resume length per size, in sentences
+SIZES = {"small": 15, "medium": 60, "large": 240}
+
+
+class CorpusGenerator:
+    def __init__(self, seed: int = 42, skill_file: str = DEFAULT_SKILL_FILE):
+        self.rng = random.Random(seed)
+        skill_map = load_skill_map(skill_file)
+        # Mix canonical names and their variations, as real documents do
+        self.skill_terms = sorted({v for variations in skill_map.values() for v in variations})
+
+    def _skills(self, count):
+        return self.rng.sample(self.skill_terms, min(count, len(self.skill_terms)))
+
+    def resume(self, size: str = "medium") -> str:
+        sentences = SIZES[size]
+        rng = self.rng
+        lines = [
+            f"Candidate {rng.randint(1000, 9999)}",
+            f"{rng.choice(ROLES)} with {rng.randint(1, 15)}+ years of experience",
+            "Skills: " + ", ".join(self._skills(rng.randint(8, 25))),
+            "Experience",
+        ]
+        for _ in range(sentences):
+            sentence = rng.choice(PHRASES)
+            if rng.random() < 0.3:
+                sentence += f" Used {', '.join(self._skills(2))}."
+            lines.append(sentence)
+        lines.append("Education: Bachelor of Science in Computer Science")
+        return "\n".join(lines)
+
+    def job_description(self) -> str:
+        rng = self.rng
+        return "\n".join([
+            f"We are hiring a {rng.choice(ROLES)}.",
+            f"Requirements: {rng.randint(2, 8)} years of experience.",
+            "Must have: " + ", ".join(self._skills(rng.randint(5, 12))),
+            "Nice to have: " + ", ".join(self._skills(rng.randint(2, 6))),
+            " ".join(rng.sample(PHRASES, 3)),
+        ])
+
+    def resumes(self, count: int, size: str = "medium") -> list:
+        return [self.resume(size) for _ in range(count)]
+
+
+# ================================
+# MINIMAL PDF WRITER
+# ================================
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_to_pdf(text: str, lines_per_page: int = 45, width: int = 95) -> bytes:
+    """
+    Renders plain text into a simple multi-page PDF (Helvetica, no
+    compression) that PyPDF2 / pdfplumber can parse.
+    """
+    lines = []
+    for paragraph in text.split("\n"):
+        while len(paragraph) > width:
+            cut = paragraph.rfind(" ", 0, width)
+            cut = cut if cut > 0 else width
+            lines.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        lines.append(paragraph)
+
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+
+    # Object numbers: 1 catalog, 2 pages, 3 font, then (page, content) pairs
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i, page_lines in enumerate(pages):
+        page_num, content_num = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_num} 0 R")
+        stream = "BT /F1 10 Tf 50 760 Td 14 TL " + " ".join(
+            f"({_escape(line)}) '" for line in page_lines
+        ) + " ET"
+        objects[page_num] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_num} 0 R >>"
+        )
+        objects[content_num] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += f"{num} 0 obj\n{objects[num]}\nendobj\n".encode("latin-1", "replace")
+
+    xref = len(out)
+    count = max(objects) + 1
+    out += f"xref\n0 {count}\n0000000000 65535 f \n".encode()
+    for num in range(1, count):
+        out += f"{offsets[num]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
@@ -0,0 +1,148 @@
+"""
+Compares the PDF extraction backends on a fixture set: throughput and how
+closely their text agrees.
+
+    python -m benchmarks.pdf_backends                     # generated fixtures
+    python -m benchmarks.pdf_backends --dir resumes/      # your own PDFs
+    python -m benchmarks.pdf_backends --backends pypdf2,pdfplumber --out report.json
+
+Agreement is measured on normalized words (difflib ratio). Generated
+fixtures are compared against the text they were rendered from; real PDFs
+against the first backend listed.
+"""
+import argparse
+import difflib
+import json
+import os
+import statistics
+import time
+
+from benchmarks.corpus import CorpusGenerator, text_to_pdf
+
+
+def _words(text: str) -> list:
+    return (text or "").lower().split()
+
+
+def agreement(a: str, b: str) -> float:
+    """Similarity of two texts' word sequences, 0..1."""
+    a_words, b_words = _words(a), _words(b)
+    if not a_words and not b_words:
+        return 1.0
+    return difflib.SequenceMatcher(None, a_words, b_words, autojunk=False).ratio()
+
+
+# ================================
+# FIXTURES
+# ================================
+def generated_fixtures(count: int, seed: int) -> list:
+    """[(name, pdf bytes, source text)] across resume sizes."""
+    gen = CorpusGenerator(seed=seed)
+    sizes = ("small", "medium", "large")
+    fixtures = []
+    for i in range(count):
+        size = sizes[i % len(sizes)]
+        text = gen.resume(size)
+        fixtures.append((f"{size}-{i}.pdf", text_to_pdf(text), text))
+    return fixtures
+
+
+def directory_fixtures(path: str) -> list:
+    fixtures = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith(".pdf"):
+            with open(os.path.join(path, name), "rb") as f:
+                fixtures.append((name, f.read(), None))
+    return fixtures
+
+
+# ================================
+# COMPARISON
+# ================================
+def compare_backends(fixtures: list, backends: list) -> dict:
+    from core_engine.utils.pdf_reader import extract_document
+
+    # Whole documents, no budgets: this compares the libraries themselves
+    options = {"max_pages": 0, "max_chars": 0, "time_budget": 0}
+
+    texts = {}
+    report = {}
+    for backend in backends:
+        results = []
+        start = time.perf_counter()
+        for _, data, _ in fixtures:
+            results.append(extract_document(data, backend=backend, **options))
+        elapsed = time.perf_counter() - start
+
+        failures = [
+            {"file": name, "error": result["error"]}
+            for (name, _, _), result in zip(fixtures, results) if result["error"]
+        ]
+        pages = sum(result["pages"] for result in results)
+        texts[backend] = [result["text"] for result in results]
+        report[backend] = {
+            "documents": len(fixtures),
+            "failures": failures,
+            "seconds": round(elapsed, 4),
+            "documents_per_second": round(len(fixtures) / elapsed, 2) if elapsed else None,
+            "pages_per_second": round(pages / elapsed, 2) if elapsed else None,
+            "median_ms": round(statistics.median(r["elapsed"] for r in results) * 1000, 3)
+            if results else None,
+        }
+
+    has_source = all(source is not None for _, _, source in fixtures)
+    reference = "source" if has_source else backends[0]
+    for backend in backends:
+        expected = (
+            [source for _, _, source in fixtures] if has_source else texts[reference]
+        )
+        scores = [
+            agreement(text, other)
+            for text, other in zip(texts[backend], expected)
+            if text is not None and other is not None
+        ]
+        report[backend]["agreement_with"] = reference
+        report[backend]["agreement_mean"] = round(statistics.fmean(scores), 4) if scores else None
+        report[backend]["agreement_min"] = round(min(scores), 4) if scores else None
+
+    return report
+
+
+def main():
+    from core_engine.utils.pdf_reader import BACKENDS, available_backends
+
+    parser = argparse.ArgumentParser(description="Compare PDF extraction backends.")
+    parser.add_argument("--backends", default=",".join(available_backends()),
+                        help=f"comma-separated: {', '.join(BACKENDS)} (default: installed ones)")
+    parser.add_argument("--dir", help="directory of PDFs to use instead of generated fixtures")
+    parser.add_argument("--count", type=int, default=30, help="generated fixtures")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    backends = [b.strip().lower() for b in args.backends.split(",") if b.strip()]
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(unknown)}")
+    missing = [b for b in backends if b not in available_backends()]
+    if missing:
+        parser.error(f"not installed: {', '.join(missing)}")
+
+    fixtures = directory_fixtures(args.dir) if args.dir else generated_fixtures(args.count, args.seed)
+    if not fixtures:
+        parser.error("no PDF fixtures found")
+
+    report = {
+        "fixtures": args.dir or f"generated ({args.count}, seed {args.seed})",
+        "backends": compare_backends(fixtures, backends),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Benchmarks for the ApplySmart hot paths.
+
+    python -m benchmarks.run                          # everything, JSON to stdout
+    python -m benchmarks.run --only skills,pdf --quick
+    python -m benchmarks.run --out results.json
+    python -m benchmarks.run --compare baseline.json --threshold 0.2
+
+With --compare, every benchmark whose median is more than `threshold`
+slower than the baseline is flagged and the exit code is 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Benchmarks must not read or pollute the real caches, and the model is
+# loaded on first use rather than in the background.
+os.environ.setdefault("APPLYSMART_CACHE_DIR", tempfile.mkdtemp(prefix="applysmart-bench-"))
+os.environ.setdefault("EMBEDDING_CACHE_DISK_ENABLED", "false")
+os.environ.setdefault("PDF_CACHE_DISK_ENABLED", "false")
+os.environ.setdefault("MODEL_PRELOAD", "false")
+
+from benchmarks.corpus import CorpusGenerator, text_to_pdf  # noqa: E402
+
+GROUPS = ("skills", "features", "pdf", "embeddings", "ranking", "crossmatch", "api")
+
+
+# ================================
+# TIMING
+# ================================
+def measure(func, repeat: int, warmup: int = 1, items: int = 1) -> dict:
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "median_ms": round(median, 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "min_ms": round(samples[0], 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "runs": repeat,
+        "items": items,
+        "items_per_second": round(items / (median / 1000), 2) if median else None,
+    }
+
+
+# ================================
+# STUBS (no network in benchmarks)
+# ================================
+class _FakeGeminiResponse:
+    text = "- Build a small project with each missing skill."
+
+
+class _FakeGemini:
+    """Stands in for genai.Client: client.models.generate_content(...)."""
+
+    def __init__(self):
+        self.models = self
+
+    def generate_content(self, model, contents):
+        return _FakeGeminiResponse()
+
+
+def _install_stubs():
+    from core_engine.ai_engine import gemini_analyzer
+    from core_engine.utils import supabase_client
+    import core_engine.job_ranker as job_ranker
+
+    gemini_analyzer.set_client(_FakeGemini())
+
+    def no_supabase(token):
+        raise RuntimeError("Supabase is stubbed out in benchmarks")
+
+    supabase_client.get_client = no_supabase
+    job_ranker.get_client = no_supabase
+
+
+# ================================
+# BENCHMARKS
+# ================================
+def bench_skills(gen, quick):
+    from core_engine.rule_engine.skill_matcher import get_skill_index, extract_skills
+
+    index = get_skill_index()
+    results = {}
+    for size in ("small", "medium", "large"):
+        text = gen.resume(size)
+        results[f"extract_skills[{size}]"] = measure(
+            lambda: extract_skills(text, index), repeat=20 if quick else 200
+        )
+    return results
+
+
+def bench_features(gen, quick):
+    from core_engine.nlp_engine.feature_extractor import extract_features
+    from core_engine.nlp_engine.document import parse_document
+
+    jd = gen.job_description()
+    results = {}
+    for size in ("small", "large"):
+        text = gen.resume(size)
+        results[f"extract_features[{size}]"] = measure(
+            lambda: extract_features(text, jd), repeat=20 if quick else 200
+        )
+        results[f"parse_document[{size}]"] = measure(
+            lambda: parse_document(text), repeat=20 if quick else 200
+        )
+    return results
+
+
+def bench_pdf(gen, quick):
+    from core_engine.utils.pdf_reader import (
+        extract_document, extract_text_from_pdf, extract_texts_from_pdfs,
+    )
+    from core_engine.utils.pdf_cache import get_pdf_cache
+
+    cache = get_pdf_cache()
+
+    def cold(blobs):
+        if cache is not None:
+            cache.memory.clear()
+        extract_texts_from_pdfs(blobs)
+
+    results = {}
+    for size in ("small", "medium", "large"):
+        pdf = text_to_pdf(gen.resume(size))
+        results[f"extract_text_from_pdf[{size}]"] = measure(
+            lambda: extract_text_from_pdf(io.BytesIO(pdf)), repeat=5 if quick else 30
+        )
+
+    # Fast path: only the pages ranking needs out of a long document
+    long_pdf = text_to_pdf(gen.resume("large") * 4)
+    results["extract_document[long,all pages]"] = measure(
+        lambda: extract_document(long_pdf, max_pages=0, max_chars=0, time_budget=0),
+        repeat=3 if quick else 10,
+    )
+    results["extract_document[long,2 pages]"] = measure(
+        lambda: extract_document(long_pdf, max_pages=2, max_chars=0, time_budget=0),
+        repeat=3 if quick else 10,
+    )
+
+    batch = [text_to_pdf(gen.resume("medium")) for _ in range(20 if quick else 100)]
+    results[f"extract_texts_from_pdfs[cold,{len(batch)}]"] = measure(
+        lambda: cold(batch), repeat=2 if quick else 5, items=len(batch)
+    )
+    results[f"extract_texts_from_pdfs[cached,{len(batch)}]"] = measure(
+        lambda: extract_texts_from_pdfs(batch), repeat=2 if quick else 5, items=len(batch)
+    )
+    return results
+
+
+def bench_embeddings(gen, quick):
+    from core_engine.nlp_engine.embedding_model import embedding_model
+
+    if not embedding_model.load():
+        return {"_skipped": f"model unavailable: {embedding_model.load_error}"}
+
+    results = {}
+    counter = iter(range(10 ** 9))
+
+    for batch_size in (1, 32):
+        def cold():
+            # Unique texts every run so the embedding cache never hits
+            texts = [f"{next(counter)} {gen.resume('small')}" for _ in range(batch_size)]
+            embedding_model.get_embeddings(texts)
+
+        results[f"get_embeddings[cold,{batch_size}]"] = measure(
+            cold, repeat=3 if quick else 10, items=batch_size
+        )
+
+    warm_texts = gen.resumes(32, "small")
+    results["get_embeddings[cached,32]"] = measure(
+        lambda: embedding_model.get_embeddings(warm_texts), repeat=10 if quick else 50, items=32
+    )
+
+    # Many single-text calls at once (concurrent /analyze-resume requests),
+    # encoded one by one vs merged by the cross-request batcher
+    from concurrent.futures import ThreadPoolExecutor
+
+    callers = 16
+    batcher = embedding_model.batcher
+    modes = [("direct", None)] + ([("batched", batcher)] if batcher is not None else [])
+
+    def concurrent():
+        texts = [f"{next(counter)} {gen.resume('small')}" for _ in range(callers)]
+        list(pool.map(lambda text: embedding_model.get_embeddings([text]), texts))
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        try:
+            for name, active in modes:
+                type(embedding_model)._batcher = active
+                results[f"get_embeddings[concurrent {callers}x1,{name}]"] = measure(
+                    concurrent, repeat=3 if quick else 10, items=callers
+                )
+        finally:
+            type(embedding_model)._batcher = batcher
+    return results
+
+
+def bench_ranking(gen, quick):
+    from core_engine.nlp_engine.embedding_model import embedding_model
+    from core_engine.nlp_engine.ranker import rank_candidates
+
+    if not embedding_model.load():
+        return {"_skipped": f"model unavailable: {embedding_model.load_error}"}
+
+    jd = gen.job_description()
+    results = {}
+    for count in ((10, 100) if quick else (10, 100, 1000)):
+        resumes = [
+            {"filename": f"r{i}.pdf", "text": text}
+            for i, text in enumerate(gen.resumes(count, "medium"))
+        ]
+        if embedding_model.cache is not None:
+            embedding_model.cache.memory.clear()
+        results[f"rank_candidates[cold,{count}]"] = measure(
+            lambda: rank_candidates(jd, resumes), repeat=1, warmup=0, items=count
+        )
+        results[f"rank_candidates[cached,{count}]"] = measure(
+            lambda: rank_candidates(jd, resumes), repeat=3 if quick else 5, items=count
+        )
+    return results
+
+
+def bench_crossmatch(gen, quick):
+    """Resume x job matrix (skills bitsets + embedding similarity), model-free."""
+    import numpy as np
+    from core_engine.nlp_engine.cross_match import score_matrix, top_k_indices
+    from core_engine.nlp_engine.document import parse_documents
+    from core_engine.rule_engine.skill_vectors import get_skill_vocabulary, match_matrix
+
+    vocabulary = get_skill_vocabulary()
+    rng = np.random.default_rng(0)
+
+    results = {}
+    for resumes, jobs in (((500, 50), (1000, 100)) if quick else ((1000, 100), (5000, 500))):
+        resume_bits = vocabulary.encode_many(
+            [doc.skills for doc in parse_documents(gen.resumes(resumes, "small"))]
+        )
+        job_bits = vocabulary.encode_many(
+            [doc.skills for doc in parse_documents([gen.job_description() for _ in range(jobs)])]
+        )
+        resume_embeddings = rng.standard_normal((resumes, 384)).astype(np.float32)
+        job_embeddings = rng.standard_normal((jobs, 384)).astype(np.float32)
+
+        def full():
+            scores = score_matrix(resume_embeddings, job_embeddings, resume_bits, job_bits)["score"]
+            top_k_indices(scores, 10)
+            top_k_indices(scores.T, 10)
+
+        pairs = resumes * jobs
+        results[f"match_matrix[{resumes}x{jobs}]"] = measure(
+            lambda: match_matrix(resume_bits, job_bits), repeat=3 if quick else 5, items=pairs
+        )
+        results[f"cross_match_scores[{resumes}x{jobs}]"] = measure(
+            full, repeat=3 if quick else 5, items=pairs
+        )
+    return results
+
+
+def bench_api(gen, quick):
+    from fastapi.testclient import TestClient
+    from core_engine.main import app
+    from core_engine.nlp_engine.embedding_model import embedding_model
+
+    if not embedding_model.load():
+        return {"_skipped": f"model unavailable: {embedding_model.load_error}"}
+
+    client = TestClient(app)
+    jd = gen.job_description()
+    resume_pdf = text_to_pdf(gen.resume("medium"))
+
+    def analyze():
+        response = client.post(
+            "/analyze-resume",
+            data={"job_description": jd, "role": "Python Backend Developer"},
+            files={"resume": ("resume.pdf", resume_pdf, "application/pdf")},
+        )
+        response.raise_for_status()
+
+    count = 10 if quick else 50
+    batch = [
+        ("resumes", (f"r{i}.pdf", text_to_pdf(text), "application/pdf"))
+        for i, text in enumerate(gen.resumes(count, "medium"))
+    ]
+
+    def rank():
+        response = client.post("/rank-resumes", data={"job_description": jd}, files=batch)
+        response.raise_for_status()
+
+    return {
+        "api/analyze-resume": measure(analyze, repeat=5 if quick else 20),
+        f"api/rank-resumes[{count}]": measure(rank, repeat=2 if quick else 5, items=count),
+    }
+
+
+RUNNERS = {
+    "skills": bench_skills,
+    "features": bench_features,
+    "pdf": bench_pdf,
+    "embeddings": bench_embeddings,
+    "ranking": bench_ranking,
+    "crossmatch": bench_crossmatch,
+    "api": bench_api,
+}
+
+
+# ================================
+# REPORTING
+# ================================
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(groups, quick=False, seed=42) -> dict:
+    _install_stubs()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "commit": _git_commit(),
+            "seed": seed,
+            "quick": quick,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+        "skipped": {},
+    }
+
+    for group in groups:
+        # Same corpus for every group regardless of which ones run
+        gen = CorpusGenerator(seed=seed)
+        results = RUNNERS[group](gen, quick)
+
+        skipped = results.pop("_skipped", None)
+        if skipped:
+            report["skipped"][group] = skipped
+        report["results"].update(results)
+
+    return report
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns one row per benchmark present in both reports, with the ratio of
+    medians and whether it counts as a regression.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("median_ms"):
+            continue
+
+        ratio = result["median_ms"] / base["median_ms"]
+        rows.append({
+            "name": name,
+            "baseline_ms": base["median_ms"],
+            "current_ms": result["median_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ApplySmart benchmarks.")
+    parser.add_argument("--only", default=",".join(GROUPS),
+                        help=f"comma-separated groups: {', '.join(GROUPS)}")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions, smaller sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = [g for g in groups if g not in RUNNERS]
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(unknown)}")
+
+    report = run(groups, quick=args.quick, seed=args.seed)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        report["comparison"] = {
+            "baseline_commit": baseline.get("meta", {}).get("commit"),
+            "threshold": args.threshold,
+            "rows": rows,
+            "regressions": [row["name"] for row in rows if row["regression"]],
+        }
+        if report["comparison"]["regressions"]:
+            exit_code = 1
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if exit_code:
+        print(
+            f"Regressions over {args.threshold:.0%}: "
+            + ", ".join(report["comparison"]["regressions"]),
+            file=sys.stderr,
+        )
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
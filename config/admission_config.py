@@ -0,0 +1,26 @@
+import os
+from dotenv import load_dotenv
+
+from config.env import env_bool
+
+load_dotenv()
+
+# Admission control for the CPU-heavy endpoints (PDF parsing, embeddings):
+# requests served at once, and how many may wait for a slot before new ones
+# are rejected with 503. Bulk ranking may only fill BULK_QUEUE_SHARE of the
+# queue, so interactive /analyze-resume calls still get in under load.
+ADMISSION_ENABLED = env_bool("ADMISSION_ENABLED", True)
+CPU_MAX_CONCURRENT = int(os.getenv("CPU_MAX_CONCURRENT", "0")) or 2 * (os.cpu_count() or 1)
+CPU_MAX_QUEUE = int(os.getenv("CPU_MAX_QUEUE", "32"))
+BULK_QUEUE_SHARE = float(os.getenv("BULK_QUEUE_SHARE", "0.5"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+
+# Per-client token bucket over the API routes (0 = no limit). Clients are
+# identified by their Supabase user once their token has been verified, else
+# by address: the peer address, or, for requests coming through one of
+# TRUSTED_PROXIES (comma-separated IPs / CIDRs), the last X-Forwarded-For hop
+# that is not itself a trusted proxy.
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "30"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+TRUSTED_PROXIES = [p.strip() for p in os.getenv("TRUSTED_PROXIES", "").split(",") if p.strip()]
@@ -0,0 +1,27 @@
+import os
+from dotenv import load_dotenv
+
+from config.env import env_bool
+
+load_dotenv()
+
+CACHE_DIR = os.getenv("APPLYSMART_CACHE_DIR", ".cache/applysmart")
+
+# Embedding cache (in-memory LRU + on-disk SQLite tier)
+EMBEDDING_CACHE_ENABLED = env_bool("EMBEDDING_CACHE_ENABLED", True)
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "5000"))
+EMBEDDING_CACHE_DISK_ENABLED = env_bool("EMBEDDING_CACHE_DISK_ENABLED", True)
+EMBEDDING_CACHE_DISK_MAX_MB = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_MB", "512"))
+
+# Extracted PDF text, keyed by SHA-256 of the file (in-memory LRU + SQLite tier)
+PDF_CACHE_ENABLED = env_bool("PDF_CACHE_ENABLED", True)
+PDF_CACHE_MEMORY_ITEMS = int(os.getenv("PDF_CACHE_MEMORY_ITEMS", "2000"))
+PDF_CACHE_DISK_ENABLED = env_bool("PDF_CACHE_DISK_ENABLED", True)
+PDF_CACHE_DISK_MAX_MB = int(os.getenv("PDF_CACHE_DISK_MAX_MB", "256"))
+
+# Vector index over resume / job embeddings
+VECTOR_INDEX_MODE = os.getenv("VECTOR_INDEX_MODE", "exact")  # exact | ivf
+VECTOR_INDEX_NLIST = int(os.getenv("VECTOR_INDEX_NLIST", "256"))
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+# Index JD and candidate embeddings whenever /rank-job runs
+VECTOR_INDEX_AUTO = env_bool("VECTOR_INDEX_AUTO", True)
@@ -0,0 +1,9 @@
+import os
+
+
+def env_bool(name, default):
+    """Boolean setting: 1 / true / yes / on (any case) enable it, anything else disables it."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
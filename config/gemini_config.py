@@ -4,3 +4,25 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+
+# Hard timeout (seconds) before falling back to the static suggestions
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "20"))
+# Upstream HTTP call abort (seconds), so a hung call frees its
+# GEMINI_MAX_CONCURRENT slot instead of holding it indefinitely
+GEMINI_HTTP_TIMEOUT = float(os.getenv("GEMINI_HTTP_TIMEOUT", str(GEMINI_TIMEOUT)))
+
+# Suggestion cache keyed by (role, missing skills)
+GEMINI_CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", "86400"))
+GEMINI_CACHE_MAX_ITEMS = int(os.getenv("GEMINI_CACHE_MAX_ITEMS", "1000"))
+
+# Outbound calls at once, and calls allowed to wait for one; beyond that
+# suggestions fall back to the static text immediately
+GEMINI_MAX_CONCURRENT = int(os.getenv("GEMINI_MAX_CONCURRENT", "8"))
+GEMINI_MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", "32"))
+
+# Suggestions delivered after the score (/analyze-resume/stream, or
+# defer_suggestions + GET /analysis/{analysis_id}/suggestions): how long an
+# analysis stays retrievable, and how many are kept
+ANALYSIS_TTL = float(os.getenv("ANALYSIS_TTL", "600"))
+ANALYSIS_MAX_ITEMS = int(os.getenv("ANALYSIS_MAX_ITEMS", "1000"))
@@ -0,0 +1,11 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Resume downloads in job_ranker
+RESUME_DOWNLOAD_WORKERS = int(os.getenv("RESUME_DOWNLOAD_WORKERS", "16"))
+RESUME_DOWNLOAD_TIMEOUT = float(os.getenv("RESUME_DOWNLOAD_TIMEOUT", "15"))
+RESUME_DOWNLOAD_RETRIES = int(os.getenv("RESUME_DOWNLOAD_RETRIES", "2"))
+RESUME_DOWNLOAD_BACKOFF = float(os.getenv("RESUME_DOWNLOAD_BACKOFF", "0.5"))
+RESUME_DOWNLOAD_MAX_MB = float(os.getenv("RESUME_DOWNLOAD_MAX_MB", "10"))
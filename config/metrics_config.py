@@ -0,0 +1,20 @@
+import os
+from dotenv import load_dotenv
+
+from config.env import env_bool
+
+load_dotenv()
+
+# Per-stage latency histograms, item and error counters (GET /metrics).
+# When disabled, instrumented stages cost a single function call.
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+
+# Add a `Server-Timing` header (stage durations) to API responses
+SERVER_TIMING_ENABLED = env_bool("SERVER_TIMING_ENABLED", True)
+
+# Histogram bucket upper bounds, in seconds
+METRICS_BUCKETS = tuple(
+    float(b) for b in os.getenv(
+        "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60"
+    ).split(",")
+)
@@ -0,0 +1,34 @@
+import os
+from dotenv import load_dotenv
+
+from config.env import env_bool
+
+load_dotenv()
+
+# 'all-MiniLM-L6-v2' is a good balance of speed and performance
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+
+# torch      - PyTorch fp32 (baseline)
+# int8       - PyTorch with dynamically quantized (int8) Linear layers
+# onnx       - ONNX Runtime, fp32 graph
+# onnx-int8  - ONNX Runtime, quantized graph shipped with the model (EMBEDDING_ONNX_FILE)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# Intra-op threads for the encoder (0 = library default)
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+
+# Load the model in the background at startup (otherwise on first use)
+MODEL_PRELOAD = env_bool("MODEL_PRELOAD", True)
+# Run one tiny encode after loading so the first request is not slower
+MODEL_WARMUP = env_bool("MODEL_WARMUP", True)
+
+# Cross-request batching: concurrent small encode calls are merged into one
+# model call. A call waits at most EMBEDDING_BATCH_WAIT_MS for others to join;
+# a batch closes early at EMBEDDING_BATCH_MAX_TEXTS texts or
+# EMBEDDING_BATCH_MAX_TOKENS (estimated) tokens.
+EMBEDDING_BATCHING = env_bool("EMBEDDING_BATCHING", True)
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+EMBEDDING_BATCH_MAX_TEXTS = int(os.getenv("EMBEDDING_BATCH_MAX_TEXTS", "64"))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "8192"))
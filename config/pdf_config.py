@@ -0,0 +1,21 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Worker processes for bulk PDF text extraction (0 = one per CPU core)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))
+
+# Text extraction library: pypdf2 | pdfplumber
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pypdf2").lower()
+
+# Fast path: stop after this many pages / characters (0 = no limit).
+# Ranking only needs the first few pages of a resume.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "100000"))
+
+# Wall-clock budget per document (0 = none). Extraction stops between
+# pages once it is spent; a worker stuck inside a single page is killed
+# after the extra grace period and the document reported as timed out.
+PDF_TIME_BUDGET_SECONDS = float(os.getenv("PDF_TIME_BUDGET_SECONDS", "10"))
+PDF_KILL_GRACE_SECONDS = float(os.getenv("PDF_KILL_GRACE_SECONDS", "5"))
@@ -0,0 +1,14 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Two-stage ranking: candidates kept by the cheap first pass (skill and
+# lexical overlap) before any embedding is computed (0 = score everyone)
+RANK_SHORTLIST = int(os.getenv("RANK_SHORTLIST", "0"))
+
+# Results returned by /rank-resumes and /rank-job (0 = all)
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "0"))
+
+# /match/cross: largest resume x job matrix scored per request
+CROSS_MATCH_MAX_PAIRS = int(os.getenv("CROSS_MATCH_MAX_PAIRS", "5000000"))
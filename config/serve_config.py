@@ -0,0 +1,21 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Pre-fork server (python -m core_engine.serve): the model is loaded once in
+# the parent and shared copy-on-write by WEB_WORKERS forked processes.
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "7860"))
+# Worker processes (0 = one per CPU core)
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0"))
+# torch / BLAS threads per worker (0 = cores / workers, at least 1), so that
+# the workers together do not oversubscribe the cores
+WEB_WORKER_THREADS = int(os.getenv("WEB_WORKER_THREADS", "0"))
+
+# Recycle a worker after this many requests (0 = never), plus a random
+# 0..JITTER so the workers do not all restart at once
+WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "10000"))
+WEB_MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "1000"))
+# Seconds a stopping worker gets to finish in-flight requests before it is killed
+WEB_GRACEFUL_TIMEOUT = float(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
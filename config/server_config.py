@@ -0,0 +1,21 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Thread pools that keep blocking work off the event loop
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "32"))
+
+# Background ranking tasks (/tasks/{task_id})
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "2"))
+TASK_MAX_FINISHED = int(os.getenv("TASK_MAX_FINISHED", "200"))
+TASK_RESULT_TTL = float(os.getenv("TASK_RESULT_TTL", "3600"))
+# Tasks allowed to wait for a worker before new ones are rejected with 503
+TASK_MAX_QUEUED = int(os.getenv("TASK_MAX_QUEUED", "50"))
+
+# Streaming ranking (/rank-resumes/stream, /rank-job/{job_id}/stream):
+# resumes scored per batch, and uploaded PDFs being parsed at once
+# before the upload is paused (0 = twice the PDF workers)
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "16"))
+STREAM_MAX_PENDING_PDFS = int(os.getenv("STREAM_MAX_PENDING_PDFS", "0"))
@@ -0,0 +1,16 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Per-token client reuse
+SUPABASE_CLIENT_TTL = float(os.getenv("SUPABASE_CLIENT_TTL", "900"))
+SUPABASE_CLIENT_MAX = int(os.getenv("SUPABASE_CLIENT_MAX", "64"))
+
+# Ranking results are written back through this Postgres function (see the
+# README), with this many rows per call
+SUPABASE_SCORE_FUNCTION = os.getenv("SUPABASE_SCORE_FUNCTION", "update_application_scores")
+SUPABASE_WRITE_CHUNK = int(os.getenv("SUPABASE_WRITE_CHUNK", "200"))
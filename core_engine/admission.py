@@ -0,0 +1,365 @@
+import asyncio
+import heapq
+import ipaddress
+import itertools
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from config.admission_config import (
+    ADMISSION_ENABLED,
+    CPU_MAX_CONCURRENT,
+    CPU_MAX_QUEUE,
+    BULK_QUEUE_SHARE,
+    ADMISSION_QUEUE_TIMEOUT,
+    RATE_LIMIT_PER_MINUTE,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_CLIENTS,
+    TRUSTED_PROXIES,
+)
+from core_engine.utils.supabase_client import verified_user_id
+
+logger = logging.getLogger(__name__)
+
+# Priorities: lower is served first
+INTERACTIVE = 0
+BULK = 1
+
+
+class Overloaded(Exception):
+    """Work rejected up front; answered with `status` and a Retry-After header."""
+
+    def __init__(self, message: str, status: int = 503, retry_after: float = 1.0):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def rejection_body(error: Overloaded) -> dict:
+    return {"detail": str(error), "retry_after": error.retry_after}
+
+
+# ================================
+# BOUNDED, PRIORITIZED LANE
+# ================================
+class Lane:
+    """
+    At most `limit` holders at once; up to `max_queue` more wait in
+    priority order (interactive before bulk, then first come first served).
+    Bulk work may only take `bulk_queue` of those waiting places. Anything
+    beyond is rejected immediately, and a waiter that does not get a slot
+    within `queue_timeout` seconds is rejected too, rather than piling up.
+
+    Used from the event loop only.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, bulk_queue: int = None,
+                 queue_timeout: float = None):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.bulk_queue = self.max_queue if bulk_queue is None else min(bulk_queue, self.max_queue)
+        self.queue_timeout = queue_timeout or None
+
+        self.running = 0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "timeout": 0}
+        self._waiters = []
+        self._seq = itertools.count()
+        self._service_time = None
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Rough wait for a slot: queue length times the average hold time."""
+        if self._service_time is None:
+            return 1.0
+        return min(60.0, self._service_time * (self.waiting / self.limit + 1))
+
+    async def acquire(self, priority: int = BULK):
+        if self.running < self.limit and not self._waiters:
+            self.running += 1
+            self.admitted += 1
+            return
+
+        capacity = self.max_queue if priority == INTERACTIVE else self.bulk_queue
+        if self.waiting >= capacity:
+            self.shed["queue_full"] += 1
+            raise Overloaded(f"Server busy ({self.name} queue full), retry later",
+                             retry_after=self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(entry)
+            self.shed["timeout"] += 1
+            raise Overloaded(f"Server busy (no {self.name} slot within {self.queue_timeout:g}s)",
+                             retry_after=self.retry_after())
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        self.admitted += 1
+
+    def _abandon(self, entry):
+        future = entry[2]
+        if future.done():
+            # The slot was handed over just as we gave up: pass it on
+            self.release()
+            return
+        future.cancel()
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+
+    def release(self, held: float = None):
+        if held is not None:
+            # Exponential moving average of how long a slot is held
+            self._service_time = held if self._service_time is None else (
+                0.8 * self._service_time + 0.2 * held
+            )
+
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)  # slot handed over, `running` unchanged
+                return
+        self.running -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+# ================================
+# PER-CLIENT TOKEN BUCKET
+# ================================
+class RateLimiter:
+    """
+    Token bucket per client: `per_minute` tokens refill continuously up to
+    `burst`. Only the `max_clients` most recently seen clients are tracked.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self.limited = 0
+        self._buckets = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def take(self, client: str, cost: float = 1.0) -> float:
+        """Spends `cost` tokens; returns 0, or the seconds until they are available."""
+        if not self.enabled:
+            return 0.0
+
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+            self.limited += 1
+
+        self._buckets[client] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# ================================
+# SHARED STATE
+# ================================
+cpu_lane = Lane(
+    "cpu",
+    limit=CPU_MAX_CONCURRENT,
+    max_queue=CPU_MAX_QUEUE,
+    bulk_queue=int(CPU_MAX_QUEUE * BULK_QUEUE_SHARE),
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+)
+rate_limiter = RateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, RATE_LIMIT_MAX_CLIENTS)
+
+# Routes that go through the token bucket
+_API_PREFIXES = ("/analyze", "/analysis", "/rank", "/tasks", "/index", "/match")
+
+
+def classify(method: str, path: str):
+    """
+    Lane priority for a request, or None when it needs no CPU slot here.
+    /analyze-resume and /analyze-resume/stream take their own slot
+    (`cpu_slot`), only for parsing and scoring and not while Gemini
+    suggestions are waited for or streamed.
+    """
+    if method != "POST":
+        return None
+    if path.startswith(("/rank", "/index", "/match")):
+        return BULK
+    return None
+
+
+@asynccontextmanager
+async def cpu_slot(priority: int = BULK):
+    """Holds a `cpu_lane` slot for the block; raises `Overloaded` when none is available."""
+    if not ADMISSION_ENABLED:
+        yield
+        return
+
+    await cpu_lane.acquire(priority)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        cpu_lane.release(time.perf_counter() - start)
+
+
+_trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in TRUSTED_PROXIES]
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+
+# Requests seen from one untrusted private peer and nothing else; past
+# _SINGLE_PEER_WARNING of them, every client probably sits behind a proxy
+# missing from TRUSTED_PROXIES and shares one rate-limit bucket
+_SINGLE_PEER_WARNING = 100
+_single_peer = {"address": None, "count": 0}
+
+
+def _check_single_peer(address: str):
+    if _single_peer["count"] < 0:
+        return
+    if address != _single_peer["address"]:
+        if _single_peer["address"] is not None:
+            _single_peer["count"] = -1  # several peers: direct traffic
+            return
+        _single_peer["address"] = address
+
+    _single_peer["count"] += 1
+    if _single_peer["count"] == _SINGLE_PEER_WARNING:
+        _single_peer["count"] = -1
+        try:
+            private = ipaddress.ip_address(address).is_private
+        except ValueError:
+            private = False
+        if private and not _is_trusted_proxy(address):
+            logger.warning(
+                f"The last {_SINGLE_PEER_WARNING} requests all came from {address}, a private "
+                f"address: if it is a reverse proxy, add it to TRUSTED_PROXIES, otherwise "
+                f"every client shares one rate limit"
+            )
+
+
+def client_address(scope) -> str:
+    """
+    The peer address, unless the peer is a trusted proxy: then the last
+    X-Forwarded-For hop that is not a trusted proxy (hops further left are
+    client-supplied and cannot be trusted).
+    """
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    _check_single_peer(address)
+    if not _is_trusted_proxy(address):
+        return address
+
+    headers = dict(scope.get("headers") or ())
+    hops = headers.get(b"x-forwarded-for", b"").decode("latin-1").split(",")
+    for hop in reversed([hop.strip() for hop in hops if hop.strip()]):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return address
+
+
+def client_id(scope) -> str:
+    headers = dict(scope.get("headers") or ())
+    auth = headers.get(b"authorization", b"").decode("latin-1")
+    token = auth.partition(" ")[2]
+    if token:
+        user_id = verified_user_id(token)
+        if user_id is not None:
+            return "user:" + user_id
+    return "ip:" + client_address(scope)
+
+
+def stats() -> dict:
+    return {"cpu": cpu_lane.stats(), "rate_limited": rate_limiter.limited}
+
+
+# ================================
+# MIDDLEWARE
+# ================================
+async def _reject(send, error: Overloaded):
+    body = json.dumps(rejection_body(error)).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": error.status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", str(error.retry_after).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    Rate-limits API calls per client (429) and admits CPU-heavy requests
+    through `cpu_lane` (503 when its queue is full), before any of the
+    request body is read. A slot is held until the response is finished,
+    streaming responses included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if rate_limiter.enabled and path.startswith(_API_PREFIXES):
+            wait = rate_limiter.take(client_id(scope))
+            if wait:
+                await _reject(send, Overloaded("Rate limit exceeded", status=429, retry_after=wait))
+                return
+
+        priority = classify(scope["method"], path)
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await cpu_lane.acquire(priority)
+        except Overloaded as e:
+            await _reject(send, e)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            cpu_lane.release(time.perf_counter() - start)
@@ -1,18 +1,102 @@
-from google import genai
-from config.gemini_config import GEMINI_API_KEY
+import itertools
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
+from config.gemini_config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    GEMINI_TIMEOUT,
+    GEMINI_HTTP_TIMEOUT,
+    GEMINI_CACHE_TTL,
+    GEMINI_CACHE_MAX_ITEMS,
+    GEMINI_MAX_CONCURRENT,
+    GEMINI_MAX_QUEUE,
+    ANALYSIS_TTL,
+    ANALYSIS_MAX_ITEMS,
+)
+from core_engine.utils.lru_cache import LRUCache
+from core_engine.state_store import get_state_store
 
-def generate_suggestions(missing_skills, job_title="the role"):
+
+# -------------------------------
+# SHARED CLIENT + CACHE
+# -------------------------------
+_client = None
+_client_lock = threading.Lock()
+
+_cache = LRUCache(max_items=GEMINI_CACHE_MAX_ITEMS, ttl=GEMINI_CACHE_TTL)
+
+# Concurrent identical requests share one upstream call: key -> (future, stream)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Bounded: at most GEMINI_MAX_CONCURRENT calls in flight and GEMINI_MAX_QUEUE
+# waiting; past that, requests get the fallback text right away ("shed")
+_upstream = ThreadPoolExecutor(
+    max_workers=GEMINI_MAX_CONCURRENT, thread_name_prefix="applysmart-gemini"
+)
+_shed = 0
+
+
+class GeminiBusy(Exception):
+    """Too many Gemini calls pending; the request is not queued."""
+
+
+def get_client():
+    """Returns the process-wide Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if not GEMINI_API_KEY:
+                    raise ValueError("Gemini API key not loaded")
+
+                from google import genai
+                from google.genai import types
+                _client = genai.Client(
+                    api_key=GEMINI_API_KEY,
+                    # milliseconds
+                    http_options=types.HttpOptions(timeout=int(GEMINI_HTTP_TIMEOUT * 1000)),
+                )
+    return _client
+
+
+def set_client(client):
     """
-    Generates AI-based improvement suggestions.
-    Handles both:
-    - Missing skills case
-    - Perfect match case (important fix)
+    Replaces the shared client (e.g. with a local fake exposing
+    `client.models.generate_content(model=..., contents=...)`) and clears
+    the suggestion cache.
     """
+    global _client
+    with _client_lock:
+        _client = client
+    _cache.clear()
 
-    # -------------------------------
-    # FALLBACK (always available)
-    # -------------------------------
+
+def cache_stats() -> dict:
+    return {**_cache.stats(), "inflight": len(_inflight)}
+
+
+def queue_stats() -> dict:
+    pending = len(_inflight)
+    return {
+        "running": min(pending, GEMINI_MAX_CONCURRENT),
+        "waiting": max(0, pending - GEMINI_MAX_CONCURRENT),
+        "limit": GEMINI_MAX_CONCURRENT,
+        "max_queue": GEMINI_MAX_QUEUE,
+        "shed": _shed,
+    }
+
+
+def _cache_key(missing_skills, job_title):
+    role = " ".join(str(job_title).lower().split())
+    skills = tuple(sorted({s.strip().lower() for s in missing_skills or []}))
+    return role, skills
+
+
+def _fallback_text(missing_skills):
     if missing_skills:
         fallback = [
             f"- Learn {skill} through projects and official documentation."
@@ -25,62 +109,335 @@ def generate_suggestions(missing_skills, job_title="the role"):
             "- Tailor resume keywords for ATS systems.",
         ]
 
-    fallback_text = "AI suggestions unavailable.\n\n" + "\n".join(fallback)
+    return "AI suggestions unavailable.\n\n" + "\n".join(fallback)
+
+
+def _build_prompt(missing_skills, job_title):
+    if not missing_skills:
+        # ✅ PERFECT MATCH CASE (NEW)
+        return f"""
+        You are an expert Career Coach and Technical Recruiter.
+
+        The candidate already matches the role of '{job_title}' very well.
+
+        Provide:
+        • Advanced resume improvements
+        • Portfolio project ideas
+        • Ways to stand out from other candidates
+
+        Keep it concise.
+        Use bullet points.
+        Tone: professional and encouraging.
+        """
+
+    # ✅ MISSING SKILLS CASE
+    return f"""
+        You are an expert Career Coach and Technical Recruiter.
+
+        The candidate is missing these skills for the role of '{job_title}':
+        {", ".join(missing_skills)}
+
+        Provide a VERY brief improvement plan.
+
+        For each skill include:
+        • Actionable step (project idea)
+        • Topics to study
+        • Learning resources
+
+        Use bullet points.
+        Keep it concise and practical.
+        """
+
+
+# -------------------------------
+# STREAMED TEXT
+# -------------------------------
+class SuggestionStream:
+    """
+    Text of one upstream call as Gemini writes it. Listeners are called
+    with every new chunk, then with None once the call is over.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def append(self, chunk: str):
+        with self._lock:
+            self.chunks.append(chunk)
+            listeners = list(self._listeners)
+        self._notify(listeners, chunk)
+
+    def finish(self):
+        with self._lock:
+            self.done = True
+            listeners, self._listeners = self._listeners, []
+        self._notify(listeners, None)
+
+    def subscribe(self, listener) -> tuple:
+        """
+        Returns (chunks so far, done). Unless done, `listener` then gets
+        every later chunk and the final None.
+        """
+        with self._lock:
+            if not self.done:
+                self._listeners.append(listener)
+            return list(self.chunks), self.done
+
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @staticmethod
+    def _notify(listeners, chunk):
+        for listener in listeners:
+            try:
+                listener(chunk)
+            except Exception as e:
+                # e.g. the reader's event loop is gone; the call goes on
+                print("Gemini stream listener failed:", e)
+
+
+class GeminiTimeout(Exception):
+    """The upstream call ran past GEMINI_HTTP_TIMEOUT and was abandoned."""
+
+
+def _call_gemini(prompt, stream: SuggestionStream):
+    models = get_client().models
+    deadline = time.monotonic() + GEMINI_HTTP_TIMEOUT
+    try:
+        if hasattr(models, "generate_content_stream"):
+            # The HTTP timeout bounds each read; a stream that keeps
+            # trickling is cut off at the overall deadline here
+            response = models.generate_content_stream(model=GEMINI_MODEL, contents=prompt)
+            try:
+                for chunk in response:
+                    if time.monotonic() > deadline:
+                        raise GeminiTimeout(f"Gemini stream still running after {GEMINI_HTTP_TIMEOUT}s")
+                    if chunk.text:
+                        stream.append(chunk.text)
+            finally:
+                close = getattr(response, "close", None)
+                if close is not None:
+                    close()
+            text = stream.text()
+        else:
+            response = models.generate_content(model=GEMINI_MODEL, contents=prompt)
+            text = response.text or ""
+            if text:
+                stream.append(text)
+    finally:
+        stream.finish()
+    return text.strip() or None
+
+
+def _upstream_request(key, missing_skills, job_title):
+    """
+    Starts (or joins) the upstream call for `key` and returns its
+    (future, stream). Raises `GeminiBusy` when the bounded queue is full.
+    """
+    global _shed
+    with _inflight_lock:
+        pending = _inflight.get(key)
+        if pending is not None:
+            return pending
+
+        if len(_inflight) >= GEMINI_MAX_CONCURRENT + GEMINI_MAX_QUEUE:
+            _shed += 1
+            raise GeminiBusy(f"{len(_inflight)} Gemini calls pending")
+
+        stream = SuggestionStream()
+        future = _upstream.submit(_call_gemini, _build_prompt(missing_skills, job_title), stream)
+        _inflight[key] = (future, stream)
+
+    def _settle(done):
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        if not done.cancelled() and done.exception() is None and done.result():
+            _cache.put(key, done.result())
+
+    future.add_done_callback(_settle)
+    return future, stream
+
+
+def generate_suggestions(missing_skills, job_title="the role", timeout=GEMINI_TIMEOUT):
+    """
+    Generates AI-based improvement suggestions.
+    Handles both:
+    - Missing skills case
+    - Perfect match case (important fix)
+
+    Results are cached per (role, missing skills). On any error, when
+    Gemini does not answer within `timeout` seconds, or when too many calls
+    are already pending, the fallback text is returned (and not cached).
+    """
+
+    # -------------------------------
+    # FALLBACK (always available)
+    # -------------------------------
+    fallback_text = _fallback_text(missing_skills)
+
+    key = _cache_key(missing_skills, job_title)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
 
     # -------------------------------
     # AI GENERATION
     # -------------------------------
     try:
-        if not GEMINI_API_KEY:
+        if not GEMINI_API_KEY and _client is None:
             raise ValueError("Gemini API key not loaded")
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        future, _ = _upstream_request(key, missing_skills, job_title)
+        return future.result(timeout=timeout) or fallback_text
+
+    except FutureTimeout:
+        print(f"Gemini Error: no response within {timeout}s")
+        return fallback_text
+
+    except Exception as e:
+        print("Gemini Error:", e)
+        return fallback_text
+
+
+# -------------------------------
+# DEFERRED SUGGESTIONS
+# -------------------------------
+# Handles of the analyses started by this process; their state is also
+# written to the shared state store for polls that reach another worker
+_analyses = LRUCache(max_items=ANALYSIS_MAX_ITEMS, ttl=ANALYSIS_TTL)
+# Expired ones are pruned from the store every PRUNE_EVERY analyses
+_started = itertools.count(1)
+PRUNE_EVERY = 100
+
+
+class DeferredSuggestions:
+    """
+    Suggestions for one analysis, generated after its score was returned.
+    `future` / `stream` are None when the text was known right away
+    (cached, or the fallback).
+    """
+
+    def __init__(self, missing_skills, timeout: float):
+        self.id = uuid.uuid4().hex
+        self.fallback_text = _fallback_text(missing_skills)
+        self.deadline = time.monotonic() + timeout
+        self.future = None
+        self.stream = None
+        self.text = None
+        self.is_fallback = False
 
-        # -------------------------------
-        # PROMPT LOGIC (FIXED)
-        # -------------------------------
-        if not missing_skills:
-            # ✅ PERFECT MATCH CASE (NEW)
-            prompt = f"""
-            You are an expert Career Coach and Technical Recruiter.
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
 
-            The candidate already matches the role of '{job_title}' very well.
+    def result(self) -> dict:
+        """Current state: pending, or ready with the suggestions (or the fallback)."""
+        if self.text is None:
+            if self.future.done():
+                text = None
+                if not self.future.cancelled() and self.future.exception() is None:
+                    text = self.future.result()
+                self._settle(text)
+            elif not self.remaining():
+                print("Gemini Error: no response within the deadline")
+                self._settle(None)
 
-            Provide:
-            • Advanced resume improvements
-            • Portfolio project ideas
-            • Ways to stand out from other candidates
+        if self.text is None:
+            return {"analysis_id": self.id, "status": "pending", "ai_suggestions": None, "fallback": False}
+        return {
+            "analysis_id": self.id,
+            "status": "ready",
+            "ai_suggestions": self.text,
+            "fallback": self.is_fallback,
+        }
 
-            Keep it concise.
-            Use bullet points.
-            Tone: professional and encouraging.
-            """
+    def _settle(self, text):
+        self.text = text or self.fallback_text
+        self.is_fallback = not text
+        self._save()
+
+    def _on_done(self, future):
+        """Settles as soon as the call ends, so other workers see the text."""
+        if self.text is not None:
+            return
+        text = None
+        if self.remaining() and not future.cancelled() and future.exception() is None:
+            text = future.result()
+        self._settle(text)
+
+    def _save(self):
+        if self.text is None:
+            data = {
+                "status": "pending",
+                "fallback_text": self.fallback_text,
+                "deadline": time.time() + self.remaining(),
+            }
         else:
-            # ✅ MISSING SKILLS CASE
-            prompt = f"""
-            You are an expert Career Coach and Technical Recruiter.
+            data = {"status": "ready", "ai_suggestions": self.text, "fallback": self.is_fallback}
+        try:
+            get_state_store().put("analysis", self.id, data, ttl=ANALYSIS_TTL)
+        except Exception as e:
+            print("Failed to store suggestions:", e)
 
-            The candidate is missing these skills for the role of '{job_title}':
-            {", ".join(missing_skills)}
 
-            Provide a VERY brief improvement plan.
+def start_suggestions(missing_skills, job_title="the role", timeout=GEMINI_TIMEOUT) -> DeferredSuggestions:
+    """
+    Same suggestions as `generate_suggestions`, without waiting for them.
+    The returned handle is kept for `ANALYSIS_TTL` seconds under its id
+    (`get_suggestions`). Past `timeout` seconds it settles on the fallback text.
+    """
+    deferred = DeferredSuggestions(missing_skills, timeout)
 
-            For each skill include:
-            • Actionable step (project idea)
-            • Topics to study
-            • Learning resources
+    key = _cache_key(missing_skills, job_title)
+    cached = _cache.get(key)
+    if cached is not None:
+        deferred._settle(cached)
+    else:
+        # Pending first: the call may settle (and store the text) right away
+        deferred._save()
+        try:
+            if not GEMINI_API_KEY and _client is None:
+                raise ValueError("Gemini API key not loaded")
+            deferred.future, deferred.stream = _upstream_request(key, missing_skills, job_title)
+            deferred.future.add_done_callback(deferred._on_done)
+        except Exception as e:
+            print("Gemini Error:", e)
+            deferred._settle(None)
 
-            Use bullet points.
-            Keep it concise and practical.
-            """
+    _analyses.put(deferred.id, deferred)
+    if next(_started) % PRUNE_EVERY == 0:
+        try:
+            get_state_store().prune("analysis", ANALYSIS_MAX_ITEMS)
+        except Exception as e:
+            print("Failed to prune stored suggestions:", e)
+    return deferred
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt
-        )
 
-        return response.text.strip() if response.text else fallback_text
+def get_suggestions(analysis_id: str):
+    """The `DeferredSuggestions` this process started under `analysis_id`, or None."""
+    return _analyses.get(analysis_id)
 
-    except Exception as e:
-        print("Gemini Error:", e)
-        return fallback_text
\ No newline at end of file
+
+def stored_suggestions(analysis_id: str):
+    """
+    State of an analysis started by any worker, from the shared store
+    (blocking): same shape as `DeferredSuggestions.result()`, or None
+    (unknown / expired).
+    """
+    data = get_state_store().get("analysis", analysis_id)
+    if data is None:
+        return None
+
+    if data["status"] == "pending":
+        if time.time() < data["deadline"]:
+            return {"analysis_id": analysis_id, "status": "pending", "ai_suggestions": None, "fallback": False}
+        data = {"ai_suggestions": data["fallback_text"], "fallback": True}
+
+    return {
+        "analysis_id": analysis_id,
+        "status": "ready",
+        "ai_suggestions": data["ai_suggestions"],
+        "fallback": data["fallback"],
+    }
@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from config.server_config import CPU_EXECUTOR_WORKERS, IO_EXECUTOR_WORKERS
+
+# CPU-bound work (PDF parsing, skill extraction, encoding).
+# PyPDF2 holds the GIL, but torch releases it while encoding.
+cpu_executor = ThreadPoolExecutor(
+    max_workers=CPU_EXECUTOR_WORKERS, thread_name_prefix="applysmart-cpu"
+)
+
+# Blocking network calls (Gemini, Supabase, resume downloads)
+io_executor = ThreadPoolExecutor(
+    max_workers=IO_EXECUTOR_WORKERS, thread_name_prefix="applysmart-io"
+)
+
+
+# The request context is copied into the worker thread so per-request state
+# (e.g. the Server-Timing collector) follows the call.
+
+
+async def run_cpu(func, *args, **kwargs):
+    """Runs a blocking CPU-bound call without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(cpu_executor, call)
+
+
+async def run_io(func, *args, **kwargs):
+    """Runs a blocking I/O-bound call without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(io_executor, call)
+
+
+def shutdown_executors():
+    cpu_executor.shutdown(wait=False, cancel_futures=True)
+    io_executor.shutdown(wait=False, cancel_futures=True)
@@ -1,99 +1,415 @@
 
-from supabase import create_client, Client
-import os
-import requests
-import io
-from core_engine.nlp_engine.ranker import rank_candidates
-from core_engine.utils.text_cleaner import clean_text
-from core_engine.utils.pdf_reader import extract_text_from_pdf
-
-def fetch_and_rank_applications(job_id: str, token: str):
+import hashlib
+import logging
+from core_engine.nlp_engine.ranker import (
+    embed_documents, rank_precomputed, shortlist_indices, pruning_stats,
+)
+from core_engine.nlp_engine.embedding_model import embedding_model
+from core_engine.nlp_engine.document import parse_document, model_text_of
+from core_engine.rule_engine.skill_matcher import get_skill_index
+from core_engine.ranking_store import get_ranking_store
+from core_engine.nlp_engine.vector_index import get_index
+from config.cache_config import VECTOR_INDEX_AUTO
+from config.server_config import STREAM_BATCH_SIZE
+from config.supabase_config import SUPABASE_SCORE_FUNCTION
+from core_engine.utils.pdf_reader import extract_texts_from_pdfs
+from core_engine.utils.downloader import download_many
+from core_engine.utils.supabase_client import get_client, bulk_update
+from core_engine import metrics
+
+logger = logging.getLogger(__name__)
+
+def fetch_and_rank_applications(job_id: str, token: str, progress=None, incremental: bool = True,
+                                on_result=None, top_k: int = 0, shortlist: int = 0):
     """
     Fetches job JD and all applications for the job using the user's token.
     Downloads resumes, ranks them, and updates the database.
+
+    With `incremental`, artifacts from earlier runs (text, embedding, skills)
+    are reused for applications whose resume is unchanged: same URL, and a
+    conditional GET (ETag / Last-Modified, else the content hash) shows the
+    same file. Only new or changed applications are parsed and embedded
+    (or matched by content hash), and only scores that changed are written
+    back.
+
+    Two-stage mode: with `shortlist`, every application is still downloaded
+    and parsed, but only the `shortlist` best by the cheap first pass
+    (`ranker.shortlist_indices`) are embedded, scored and written back;
+    pruned ones keep their previous score. `top_k` limits the returned
+    results (all scored ones are still written back).
+
+    Returns {"results": [...], "errors": [...], "processed": n, "reused": n,
+    "pruning": {...}} where each error names the application and the stage
+    (download / parse / update) that failed.
+    `progress(stage, done, total)` is called as each stage starts.
+
+    `on_result(event)`, when given, receives provisional per-application
+    events while the run is in progress: stored scores of unchanged
+    applications first, then new ones in batches of STREAM_BATCH_SIZE as
+    soon as each batch is scored (in two-stage mode, only at the end),
+    plus download / parse errors.
     """
-    # Create a client specifically for this user context
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-
-    if not url or not key:
-        raise Exception("Supabase credentials missing on backend")
-
-    # Create client and set auth token
-    supabase: Client = create_client(url, key)
-    supabase.postgrest.auth(token)
-    supabase.auth.set_session(token, token)
-
-    # 1. Fetch Job Description
-    job_response = supabase.table('jobs').select('description, title').eq('id', job_id).single().execute()
-    
-    if not job_response.data:
-        raise Exception(f"Job {job_id} not found")
-        
-    job_data = job_response.data
-    jd_text = job_data.get('description', '')
-    if not jd_text:
-        jd_text = job_data.get('title', '')
-
-    # 2. Fetch Applications (only pending ones)
-    apps_response = supabase.table('applications').select('id, resume_url, user_id').eq('job_id', job_id).or_('status.is.null,status.eq.Pending').execute()
-    applications = apps_response.data
+    # Client for this user context (reused across requests with the same token)
+    supabase = get_client(token)
+
+    with metrics.stage("rank_job", "fetch") as fetch:
+        # 1. Fetch Job Description
+        job_response = supabase.table('jobs').select('description, title').eq('id', job_id).single().execute()
+
+        if not job_response.data:
+            raise Exception(f"Job {job_id} not found")
+
+        job_data = job_response.data
+        jd_text = job_data.get('description', '')
+        if not jd_text:
+            jd_text = job_data.get('title', '')
+
+        # 2. Fetch Applications (only pending ones)
+        apps_response = supabase.table('applications').select('id, resume_url, user_id, job_id').eq('job_id', job_id).or_('status.is.null,status.eq.Pending').execute()
+        applications = apps_response.data
+        fetch.items = len(applications or ())
 
     if not applications:
-        return []
+        return {"results": [], "errors": [], "processed": 0, "reused": 0,
+                "pruning": pruning_stats(0, 0, 0)}
 
-    # 3. Process Applications
-    processed_resumes = []
-    
+    # Embeddings of new applications wait until the shortlist is known
+    two_stage = bool(shortlist) and shortlist < len(applications)
+
+    # 3. Reuse artifacts from earlier runs
+    store = get_ranking_store()
+    model = embedding_model.model_id
+    stored = store.load_applications(job_id, model) if incremental else {}
+
+    # JD embedding reused while the normalized JD text is unchanged
+    jd = parse_document(jd_text)
+    jd_embedding = store.load_jd(job_id, jd.content_hash, model) if incremental else None
+    jd_changed = jd_embedding is None
+
+    if jd_changed:
+        jd_embedding = embed_documents([jd])[0]
+        store.save_jd(job_id, jd.content_hash, model, jd_embedding)
+
+    apps_by_id = {str(app['id']): app for app in applications}
+    artifacts = {}
+    errors = []
+
+    to_download = []
+    to_revalidate = []
     for app in applications:
-        resume_url = app.get('resume_url')
-        if not resume_url:
-            continue
-            
-        try:
-            # Download PDF
-            response = requests.get(resume_url)
-            response.raise_for_status()
-            
-            # Extract text
-            file_stream = io.BytesIO(response.content)
-            text = extract_text_from_pdf(file_stream)
-            cleaned_text = clean_text(text)
-            
-            processed_resumes.append({
-                "id": app['id'], 
-                "user_id": app['user_id'],
-                "filename": resume_url.split('/')[-1],
-                "text": cleaned_text
-            })
-            
-        except Exception as e:
-            print(f"Error processing app {app['id']}: {e}")
-            
-    if not processed_resumes:
-        return []
-        
-    # 4. Rank
-    ranking_results = rank_candidates(jd_text, processed_resumes)
-    
-    # 5. Update Database
-    final_results = []
-    
+        app_key = str(app['id'])
+        if not app.get('resume_url'):
+            errors.append(_app_error(app, "download", "Missing resume_url"))
+        elif app_key in stored and stored[app_key]['resume_url'] == app['resume_url']:
+            to_revalidate.append(app)
+        else:
+            to_download.append(app)
+
+    # Same URL: the file may still have been replaced in place
+    prefetched = {}
+    if to_revalidate:
+        if progress:
+            progress("revalidating", 0, len(to_revalidate))
+        with metrics.stage("rank_job", "revalidate", items=len(to_revalidate)) as revalidate_stage:
+            checks = download_many(
+                [app['resume_url'] for app in to_revalidate],
+                validators=[
+                    (stored[str(app['id'])]['etag'], stored[str(app['id'])]['last_modified'])
+                    for app in to_revalidate
+                ]
+            )
+            revalidate_stage.errors = sum(1 for check in checks if check["error"])
+
+        for app, check in zip(to_revalidate, checks):
+            app_key = str(app['id'])
+            artifact = stored[app_key]
+            if check["error"]:
+                # Storage unreachable: keep the last known ranking
+                logger.warning(f"Could not revalidate resume of application {app['id']}: {check['error']}")
+            elif check["not_modified"]:
+                pass
+            elif hashlib.sha256(check["content"]).hexdigest() != artifact['content_hash']:
+                prefetched[app_key] = check
+                to_download.append(app)
+                continue
+            elif (check["etag"], check["last_modified"]) != (artifact['etag'], artifact['last_modified']):
+                # Same bytes under new validators: kept for the next run
+                artifact = {**artifact, "etag": check["etag"], "last_modified": check["last_modified"]}
+            artifacts[app_key] = artifact
+
+    reused = len(artifacts)
+
+    if on_result:
+        for error in errors:
+            on_result({"event": "error", **error})
+        if not jd_changed:
+            for app_key, artifact in artifacts.items():
+                if artifact['score'] is not None:
+                    on_result({
+                        "event": "result",
+                        "id": apps_by_id[app_key]['id'],
+                        "user_id": apps_by_id[app_key]['user_id'],
+                        "score": artifact['score'],
+                        "reused": True
+                    })
+
+    # 4. Process new / changed applications (one batch, or several when streaming)
+    batch_size = STREAM_BATCH_SIZE if on_result else max(1, len(to_download))
+
+    for start in range(0, len(to_download), batch_size):
+        batch = to_download[start:start + batch_size]
+        reported = len(errors)
+
+        new_keys = _process_new_applications(
+            batch, store, model, incremental, artifacts, errors,
+            progress, start, len(to_download), embed=not two_stage, prefetched=prefetched
+        )
+
+        if on_result:
+            for error in errors[reported:]:
+                on_result({"event": "error", **error})
+        if on_result and not two_stage:
+            for res in rank_precomputed(
+                jd,
+                jd_embedding,
+                [_candidate(apps_by_id[app_key], artifacts[app_key]) for app_key in new_keys],
+                [artifacts[app_key]['embedding'] for app_key in new_keys],
+                [artifacts[app_key]['profile'] for app_key in new_keys]
+            ):
+                res.pop("text", None)
+                res.pop("rank", None)
+                on_result({"event": "result", **res, "reused": False})
+
+    # 5. Two-stage: cheap prefilter over every candidate, embeddings only
+    # for the shortlist
+    ranked_keys = list(artifacts)
+
+    if two_stage and len(ranked_keys) > shortlist:
+        with metrics.stage("rank_job", "prefilter", items=len(ranked_keys)):
+            kept = shortlist_indices(
+                jd,
+                [artifacts[app_key]['profile'] for app_key in ranked_keys],
+                [model_text_of(artifacts[app_key]['text']) for app_key in ranked_keys],
+                shortlist
+            )
+            ranked_keys = [ranked_keys[i] for i in kept]
+
+    pending = [app_key for app_key in ranked_keys if artifacts[app_key]['embedding'] is None]
+    if pending:
+        if progress:
+            progress("embedding", 0, len(pending))
+        embeddings = embed_documents([artifacts[app_key]['text'] for app_key in pending])
+        for app_key, embedding in zip(pending, embeddings):
+            artifacts[app_key]['embedding'] = embedding
+
+    processed = len(artifacts) - reused
+    with metrics.stage("rank_job", "store", items=processed):
+        # Pruned applications were never embedded: parsed again next run
+        store.save_applications(job_id, model, {
+            app_key: artifact for app_key, artifact in artifacts.items()
+            if stored.get(app_key) is not artifact and artifact['embedding'] is not None
+        })
+        store.prune_applications(job_id, [app['id'] for app in applications])
+
+    if not artifacts:
+        return {"results": [], "errors": errors, "processed": processed, "reused": reused,
+                "pruning": pruning_stats(0, 0, 0)}
+
+    # 6. Rank
+    if progress:
+        progress("scoring", 0, len(ranked_keys))
+
+    ranking_results = rank_precomputed(
+        jd,
+        jd_embedding,
+        [_candidate(apps_by_id[app_key], artifacts[app_key]) for app_key in ranked_keys],
+        [artifacts[app_key]['embedding'] for app_key in ranked_keys],
+        [artifacts[app_key]['profile'] for app_key in ranked_keys]
+    )
+
+    # 7. Update Database (bulk, only scores that changed)
+    if progress:
+        progress("saving", 0, len(ranking_results))
+
+    rows = []
+
     for res in ranking_results:
-        app_id = res['id']
-        score = res['score']
-        analysis = res['analysis']
-        
-        update_data = {
-            "score": score,
-            "rank_analysis": analysis
-        }
-        
+        app_key = str(res['id'])
+        if not jd_changed and artifacts[app_key]['score'] == res['score']:
+            continue
+
+        rows.append({
+            "id": res['id'],
+            "score": res['score'],
+            "rank_analysis": res['analysis']
+        })
+
+    with metrics.stage("rank_job", "update", items=len(rows)) as update_stage:
+        failures = bulk_update(supabase, SUPABASE_SCORE_FUNCTION, rows, columns=("score", "rank_analysis"))
+        update_stage.errors = len(failures)
+
+    failed_ids = {str(failure['id']) for failure in failures}
+
+    for failure in failures:
+        errors.append(_app_error(apps_by_id[str(failure['id'])], "update", failure['error']))
+
+    store.update_scores(job_id, {
+        row['id']: row['score'] for row in rows if str(row['id']) not in failed_ids
+    })
+
+    # 8. Keep the retrieval index in sync (job + candidates, keyed by user)
+    if VECTOR_INDEX_AUTO:
         try:
-            supabase.table('applications').update(update_data).eq('id', app_id).execute()
-            final_results.append(res)
+            with metrics.stage("rank_job", "index"):
+                if jd_changed:
+                    get_index("jobs").upsert([job_id], [jd_embedding])
+
+                fresh = [
+                    app_key for app_key in ranked_keys
+                    if stored.get(app_key) is not artifacts[app_key]
+                ]
+                if fresh:
+                    get_index("resumes").upsert(
+                        [apps_by_id[app_key]['user_id'] for app_key in fresh],
+                        [artifacts[app_key]['embedding'] for app_key in fresh]
+                    )
         except Exception as e:
-            print(f"Error updating app {app_id}: {e}")
-            final_results.append(res)
+            logger.error(f"Vector index update failed for job {job_id}: {e}")
+
+    results = ranking_results[:top_k] if top_k else ranking_results
+
+    return {
+        "results": results,
+        "errors": errors,
+        "processed": processed,
+        "reused": reused,
+        "pruning": pruning_stats(len(artifacts), len(ranked_keys), len(results))
+    }
+
+
+def _process_new_applications(apps, store, model, incremental, artifacts, errors,
+                              progress=None, done=0, total=0, embed=True, prefetched=None) -> list:
+    """
+    Downloads, parses, embeds and profiles `apps`, adding their artifacts to
+    `artifacts` and failures to `errors`. Returns the keys that were added.
+    Without `embed`, new artifacts get no embedding (None) yet.
+    `prefetched` maps app keys to downloads already made (revalidation).
+    """
+    added = []
+    prefetched = prefetched or {}
+
+    if progress:
+        progress("downloading", done, total)
+
+    to_fetch = [app for app in apps if str(app['id']) not in prefetched]
+    with metrics.stage("rank_job", "download", items=len(to_fetch)) as download_stage:
+        fetched = iter(download_many([app['resume_url'] for app in to_fetch]))
+        downloads = [prefetched.get(str(app['id'])) or next(fetched) for app in apps]
+        download_stage.errors = sum(1 for download in downloads if download["error"])
+
+    downloaded = []
+    first_by_hash = {}
+    duplicates = []
+    for app, download in zip(apps, downloads):
+        if download["error"]:
+            errors.append(_app_error(app, "download", download["error"]))
+            continue
+
+        content_hash = hashlib.sha256(download["content"]).hexdigest()
+
+        # Same file twice in this batch: processed once, shared below
+        if content_hash in first_by_hash:
+            duplicates.append((app, content_hash, download))
+            continue
+        first_by_hash[content_hash] = app
+
+        known = store.find_by_content_hash(content_hash, model) if incremental else None
+
+        if known is not None:
+            # Same PDF bytes seen before (e.g. moved URL or another job)
+            artifacts[str(app['id'])] = {
+                **known,
+                **_source(app, download),
+                "content_hash": content_hash,
+                "score": None
+            }
+            added.append(str(app['id']))
+        else:
+            downloaded.append((app, download, content_hash))
+
+    # Extract text (process pool, results in input order)
+    if progress:
+        progress("extracting", done, total)
+
+    with metrics.stage("rank_job", "parse", items=len(downloaded)) as parse_stage:
+        extracted = extract_texts_from_pdfs([download["content"] for _, download, _ in downloaded])
+
+        parsed = []
+        for (app, download, content_hash), item in zip(downloaded, extracted):
+            if item["error"]:
+                errors.append(_app_error(app, "parse", item["error"]))
+            else:
+                parsed.append((app, download, content_hash, item["text"]))
+        parse_stage.errors = len(downloaded) - len(parsed)
+
+    if parsed:
+        with metrics.stage("rank_job", "profile", items=len(parsed)):
+            skill_map = get_skill_index()
+            documents = [parse_document(text, skill_map) for _, _, _, text in parsed]
+
+        if embed:
+            if progress:
+                progress("embedding", done, total)
+            new_embeddings = embed_documents(documents)
+        else:
+            new_embeddings = [None] * len(documents)
+
+        for (app, download, content_hash, _), doc, embedding in zip(parsed, documents, new_embeddings):
+            artifacts[str(app['id'])] = {
+                **_source(app, download),
+                "content_hash": content_hash,
+                "text": doc.text,
+                "embedding": embedding,
+                "profile": doc.profile,
+                "score": None
+            }
+            added.append(str(app['id']))
+
+    for app, content_hash, download in duplicates:
+        first = first_by_hash[content_hash]
+        artifact = artifacts.get(str(first['id']))
+        if artifact is None:
+            errors.append(_app_error(app, "parse", f"Same file as application {first['id']}, which failed"))
+            continue
+
+        artifacts[str(app['id'])] = {**artifact, **_source(app, download), "score": None}
+        added.append(str(app['id']))
+
+    return added
+
+
+def _source(app: dict, download: dict) -> dict:
+    """Where an artifact's resume came from, and its HTTP validators for the next run."""
+    return {
+        "resume_url": app['resume_url'],
+        "etag": download["etag"],
+        "last_modified": download["last_modified"]
+    }
+
+
+def _candidate(app: dict, artifact: dict) -> dict:
+    return {
+        "id": app['id'],
+        "user_id": app['user_id'],
+        "filename": app['resume_url'].split('/')[-1],
+        "text": artifact['text']
+    }
+
 
-    return final_results
+def _app_error(app: dict, stage: str, error) -> dict:
+    return {
+        "id": app.get('id'),
+        "user_id": app.get('user_id'),
+        "stage": stage,
+        "error": str(error)
+    }
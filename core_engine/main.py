@@ -1,16 +1,48 @@
+import time
+
+_import_start = time.perf_counter()
+
+import asyncio
+
 from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pathlib import Path
-import os
 
-from core_engine.utils.pdf_reader import extract_text_from_pdf
-from core_engine.utils.text_cleaner import clean_text
+from core_engine.utils.pdf_reader import extract_texts_from_pdfs, shutdown_pool, start_pool, pool_stats
+from core_engine.utils.pdf_cache import get_pdf_cache
+from core_engine.utils import downloader
+from core_engine.nlp_engine.document import parse_document
 from core_engine.matcher import match_resume_with_jd
+from core_engine.executors import run_cpu, run_io, shutdown_executors
+from core_engine.tasks import task_manager
+from core_engine.streaming import (
+    MEDIA_TYPES, UploadStreamingResponse, stream_analysis, stream_format, stream_job_ranking,
+    stream_uploaded_ranking,
+)
+from core_engine.nlp_engine.vector_index import get_index
+from core_engine.nlp_engine.embedding_model import embedding_model
+from core_engine import startup, metrics, admission, static_site
+from config.model_config import MODEL_PRELOAD, MODEL_WARMUP
+from config.metrics_config import METRICS_ENABLED
+from config.ranking_config import RANK_SHORTLIST, RANK_TOP_K, CROSS_MATCH_MAX_PAIRS
 
 app = FastAPI(title="ApplySmart API")
 
+# ── Admission control ─────────────────────────────────────────────────────────
+# Innermost middleware, so rejections still carry CORS and Server-Timing headers.
+app.add_middleware(admission.AdmissionMiddleware)
+
+
+@app.exception_handler(admission.Overloaded)
+async def overloaded_handler(request: Request, error: admission.Overloaded):
+    return JSONResponse(
+        status_code=error.status,
+        content=admission.rejection_body(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
 # ── CORS ──────────────────────────────────────────────────────────────────────
 # In production (HF Spaces) the same origin serves both frontend + API,
 # so we only need localhost for local development.
@@ -23,93 +55,662 @@ app.add_middleware(
     ],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Per-request stage durations in a `Server-Timing` header
+app.add_middleware(metrics.ServerTimingMiddleware)
+
+@app.on_event("startup")
+def start_model_load():
+    # Heavy ML imports + weights load off the serving path; static files and
+    # non-ML endpoints are served immediately.
+    if MODEL_PRELOAD:
+        embedding_model.start_background_load(warm_up=MODEL_WARMUP)
+    start_pool()
+    startup.record("app_startup", time.perf_counter() - _import_start)
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    task_manager.shutdown()
+    shutdown_executors()
+    shutdown_pool()
+    downloader.shutdown()
+
+
+# ── Health ────────────────────────────────────────────────────────────────────
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: the embedding model is loaded and ranking can be served."""
+    body = {
+        "status": "ready" if embedding_model.is_ready else "not_ready",
+        "model": {
+            "name": embedding_model.model_name,
+            "backend": embedding_model.backend,
+            "status": embedding_model.status,
+            "error": embedding_model.load_error,
+        },
+        "startup_seconds": startup.phases,
+    }
+    return JSONResponse(status_code=200 if embedding_model.is_ready else 503, content=body)
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+def _cache_samples(field: str) -> dict:
+    from core_engine.ai_engine.gemini_analyzer import cache_stats
+
+    samples = {(("cache", "gemini"),): cache_stats()[field]}
+    for name, cache in (("embedding", embedding_model.cache), ("pdf_text", get_pdf_cache())):
+        if cache is not None:
+            stats = cache.stats()
+            samples[(("cache", name),)] = stats["memory"]["items"] if field == "items" else stats[field]
+    return samples
+
+
+def _pdf_cache_stat(field: str):
+    cache = get_pdf_cache()
+    return cache.stats()[field] if cache is not None else 0
+
+
+metrics.register_gauge(
+    "applysmart_model_ready", "1 once the embedding model is loaded.",
+    lambda: int(embedding_model.is_ready)
+)
+
+
+def _batcher_stat(field: str):
+    batcher = embedding_model.batcher
+    return batcher.stats()[field] if batcher is not None else 0
+
+
+metrics.register_gauge(
+    "applysmart_embedding_batches_total", "Model calls made by the cross-request encode batcher.",
+    lambda: _batcher_stat("batches"), kind="counter"
+)
+metrics.register_gauge(
+    "applysmart_embedding_batched_requests_total", "Encode calls merged into those batches.",
+    lambda: _batcher_stat("requests"), kind="counter"
+)
+metrics.register_gauge(
+    "applysmart_embedding_batched_texts_total", "Texts encoded by the batcher.",
+    lambda: _batcher_stat("texts"), kind="counter"
+)
+metrics.register_gauge(
+    "applysmart_cache_hits_total", "Cache hits.", lambda: _cache_samples("hits"), kind="counter"
+)
+metrics.register_gauge(
+    "applysmart_cache_misses_total", "Cache misses.", lambda: _cache_samples("misses"), kind="counter"
+)
+metrics.register_gauge(
+    "applysmart_cache_items", "Entries held in memory.", lambda: _cache_samples("items")
+)
+metrics.register_gauge(
+    "applysmart_pdf_duplicates_total", "PDFs identical to one already being parsed.",
+    lambda: _pdf_cache_stat("deduplicated"), kind="counter"
+)
+metrics.register_gauge(
+    "applysmart_pdf_bytes_saved_total", "PDF bytes not parsed thanks to the cache or deduplication.",
+    lambda: _pdf_cache_stat("bytes_saved"), kind="counter"
+)
+def _lane_samples(field: str) -> dict:
+    from core_engine.ai_engine.gemini_analyzer import queue_stats
+
+    lanes = {
+        "cpu": admission.cpu_lane.stats(),
+        "gemini": queue_stats(),
+        "tasks": task_manager.stats(),
+    }
+    return {(("lane", lane),): stats[field] for lane, stats in lanes.items()}
+
+
+def _shed_samples() -> dict:
+    from core_engine.ai_engine.gemini_analyzer import queue_stats
+
+    samples = {
+        (("lane", "cpu"), ("reason", reason)): count
+        for reason, count in admission.cpu_lane.shed.items()
+    }
+    samples[(("lane", "api"), ("reason", "rate_limited"))] = admission.rate_limiter.limited
+    samples[(("lane", "gemini"), ("reason", "queue_full"))] = queue_stats()["shed"]
+    samples[(("lane", "tasks"), ("reason", "queue_full"))] = task_manager.stats()["shed"]
+    return samples
+
+
+metrics.register_gauge(
+    "applysmart_queue_depth", "Requests waiting for a slot, per lane.",
+    lambda: _lane_samples("waiting")
+)
+metrics.register_gauge(
+    "applysmart_in_flight", "Requests holding a slot, per lane.",
+    lambda: _lane_samples("running")
+)
+metrics.register_gauge(
+    "applysmart_shed_total", "Requests rejected or degraded by admission control.",
+    _shed_samples, kind="counter"
+)
+metrics.register_gauge(
+    "applysmart_pdf_workers_killed_total", "PDF workers killed for overrunning the time budget.",
+    lambda: pool_stats()["killed"], kind="counter"
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of the stage histograms and counters."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # ── AI Endpoints ───────────────────────────────────────────────────────────────
 
-# Root route
-@app.get("/", include_in_schema=False)
-async def serve_root():
-    index = STATIC_DIR / "index.html"
-    return FileResponse(str(index))
+from typing import List, Optional
+import functools
 
+from core_engine.ai_engine.gemini_analyzer import get_suggestions, stored_suggestions
 
-@app.get("/{full_path:path}", include_in_schema=False)
-async def serve_react(full_path: str):
-    # Prevent API override
-    if full_path.startswith("analyze") or full_path.startswith("rank"):
-        raise HTTPException(status_code=404)
 
-    index = STATIC_DIR / "index.html"
-    return FileResponse(str(index))
+def _read_pdf_upload(resume_file) -> str:
+    """Text of one uploaded PDF, through the PDF text cache."""
+    item = extract_texts_from_pdfs([resume_file.read()])[0]
+    if item["error"]:
+        raise HTTPException(status_code=400, detail=f"Could not read PDF: {item['error']}")
+    return item["text"]
 
 
-from typing import List
+def _analyze(resume_file, job_description: str, role: str, defer_suggestions: bool = False) -> dict:
+    with metrics.stage("analyze", "parse", items=1):
+        resume_text = _read_pdf_upload(resume_file)
+    with metrics.stage("analyze", "normalize", items=2):
+        resume = parse_document(resume_text)
+        jd = parse_document(job_description)
+    return match_resume_with_jd(resume, jd, role, defer_suggestions)
+
 
 @app.post("/analyze-resume")
 async def analyze_resume(
     resume: UploadFile = File(...),
     job_description: str = Form(...),
-    role: str = Form("Python Backend Developer")
+    role: str = Form("Python Backend Developer"),
+    defer_suggestions: bool = Form(False)
 ):
-    resume_text = extract_text_from_pdf(resume.file)
-    resume_text = clean_text(resume_text)
-    jd_text = clean_text(job_description)
-    result = match_resume_with_jd(resume_text, jd_text, role)
+    """
+    Match score, matched / missing skills and Gemini suggestions.
+    With `defer_suggestions`, returns as soon as the score is computed;
+    the suggestions are then fetched from `suggestions_url`.
+    """
+    # A CPU slot for parsing and scoring only, not while Gemini is waited for
+    async with admission.cpu_slot(admission.INTERACTIVE):
+        result = await run_cpu(_analyze, resume.file, job_description, role, True)
+
+    if defer_suggestions:
+        return {
+            "filename": resume.filename,
+            "analysis": result,
+            "suggestions_url": f"/analysis/{result['analysis_id']}/suggestions",
+        }
+
+    deferred = get_suggestions(result.pop("analysis_id"))
+    result.pop("suggestions_status")
+    with metrics.stage("analyze", "gemini"):
+        if deferred.future is not None and not deferred.future.done():
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(deferred.future)), deferred.remaining()
+                )
+            except Exception:
+                pass
+        result["ai_suggestions"] = deferred.result()["ai_suggestions"]
+
     return {
         "filename": resume.filename,
         "analysis": result
     }
 
 
-from core_engine.nlp_engine.ranker import rank_candidates
-
-@app.post("/rank-resumes")
-async def rank_resumes(
+@app.post("/analyze-resume/stream")
+async def analyze_resume_stream(
+    request: Request,
+    resume: UploadFile = File(...),
     job_description: str = Form(...),
-    resumes: List[UploadFile] = File(...)
+    role: str = Form("Python Backend Developer"),
+    format: Optional[str] = None
 ):
+    """
+    Streams the analysis: score and skills as soon as they are computed
+    (`analysis` event), the Gemini suggestions while they are written
+    (`suggestion` events), then the final text (`complete`). NDJSON, or SSE.
+    """
+    fmt = stream_format(format, request.headers.get("accept"))
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or sse")
+
+    # A CPU slot for parsing and scoring only, not while Gemini writes
+    async with admission.cpu_slot(admission.INTERACTIVE):
+        result = await run_cpu(_analyze, resume.file, job_description, role, True)
+
+    payload = {"filename": resume.filename, "analysis": result}
+    return StreamingResponse(
+        stream_analysis(payload, get_suggestions(result["analysis_id"]), fmt),
+        media_type=MEDIA_TYPES[fmt]
+    )
+
+
+@app.get("/analysis/{analysis_id}/suggestions")
+async def analysis_suggestions(analysis_id: str, wait: float = 0):
+    """
+    Gemini suggestions of a deferred analysis: `pending`, or `ready` with
+    the text (`fallback: true` when Gemini failed or timed out). With
+    `wait`, a pending request is held up to that many seconds.
+    """
+    if wait < 0:
+        raise HTTPException(status_code=400, detail="wait must be >= 0")
+
+    deferred = get_suggestions(analysis_id)
+    if deferred is None:
+        # Started by another worker: poll the shared store
+        result = await run_io(stored_suggestions, analysis_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Analysis not found or expired")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while result["status"] == "pending" and loop.time() < deadline:
+            await asyncio.sleep(min(0.25, deadline - loop.time()))
+            result = await run_io(stored_suggestions, analysis_id) or result
+        return result
+
+    if wait and deferred.future is not None and not deferred.future.done():
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(deferred.future)), min(wait, deferred.remaining())
+            )
+        except Exception:
+            pass
+    return deferred.result()
+
+
+from core_engine.nlp_engine.ranker import rank_candidates
+
+
+def _rank_uploaded(job_description: str, files: list, progress=None,
+                   top_k: int = 0, shortlist: int = 0) -> dict:
+    """files: list of (filename, pdf bytes)"""
+    if progress:
+        progress("extracting", 0, len(files))
+
+    with metrics.stage("rank", "parse", items=len(files)) as parse_stage:
+        extracted = extract_texts_from_pdfs([content for _, content in files])
+        parse_stage.errors = sum(1 for item in extracted if item["error"])
+
     processed_resumes = []
-    for resume in resumes:
-        content = extract_text_from_pdf(resume.file)
+    errors = []
+    for (filename, _), item in zip(files, extracted):
+        if item["error"]:
+            errors.append({"filename": filename, "error": item["error"]})
+            continue
         processed_resumes.append({
-            "filename": resume.filename,
-            "text": content
+            "filename": filename,
+            "text": item["text"]
         })
-    ranking_results = rank_candidates(job_description, processed_resumes)
+    pruning = {}
+    ranking_results = rank_candidates(
+        job_description, processed_resumes, progress=progress,
+        top_k=top_k, shortlist=shortlist, stats=pruning
+    )
     return {
         "job_description_snippet": job_description[:100] + "...",
-        "results": ranking_results
+        "results": ranking_results,
+        "errors": errors,
+        "pruning": pruning
     }
 
 
+def _ranking_limits(top_k: Optional[int], shortlist: Optional[int]) -> tuple:
+    """Request values, or the configured defaults (0 = no limit)."""
+    top_k = RANK_TOP_K if top_k is None else top_k
+    shortlist = RANK_SHORTLIST if shortlist is None else shortlist
+    if top_k < 0 or shortlist < 0:
+        raise HTTPException(status_code=400, detail="top_k and shortlist must be >= 0")
+    return top_k, shortlist
+
+
+def _accepted(task) -> JSONResponse:
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "task_id": task.id,
+            "status_url": f"/tasks/{task.id}",
+            "result_url": f"/tasks/{task.id}/result"
+        }
+    )
+
+
+@app.post("/rank-resumes")
+async def rank_resumes(
+    job_description: str = Form(...),
+    resumes: List[UploadFile] = File(...),
+    background: bool = Form(False),
+    top_k: Optional[int] = Form(None),
+    shortlist: Optional[int] = Form(None)
+):
+    top_k, shortlist = _ranking_limits(top_k, shortlist)
+    files = [(resume.filename, await resume.read()) for resume in resumes]
+    rank = functools.partial(_rank_uploaded, top_k=top_k, shortlist=shortlist)
+
+    if background:
+        return _accepted(await run_io(task_manager.submit, "rank-resumes", rank, job_description, files))
+
+    return await run_cpu(rank, job_description, files)
+
+
+@app.post("/rank-resumes/stream")
+async def rank_resumes_stream(request: Request, format: Optional[str] = None):
+    """
+    Same form fields as /rank-resumes, consumed while they upload. Streams
+    NDJSON (default) or SSE (`?format=sse` or `Accept: text/event-stream`)
+    events: received, result (provisional rank), error, complete.
+    """
+    fmt = stream_format(format, request.headers.get("accept"))
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or sse")
+    return UploadStreamingResponse(
+        stream_uploaded_ranking(request, fmt, RANK_TOP_K), media_type=MEDIA_TYPES[fmt]
+    )
+
+
 from core_engine.job_ranker import fetch_and_rank_applications
 
-@app.post("/rank-job/{job_id}")
-async def rank_job(job_id: str, request: Request):
+
+def _bearer_token(request: Request) -> str:
     auth_header = request.headers.get('Authorization')
     if not auth_header:
         raise HTTPException(status_code=401, detail="Missing Authorization Header")
+    parts = auth_header.split(" ")
+    if len(parts) != 2 or not parts[1]:
+        raise HTTPException(status_code=401, detail="Malformed Authorization Header")
+    return parts[1]
+
+
+def _rank_job(job_id: str, token: str, full: bool = False, top_k: int = 0, shortlist: int = 0,
+              progress=None, on_result=None) -> dict:
+    outcome = fetch_and_rank_applications(
+        job_id, token, progress=progress, incremental=not full, on_result=on_result,
+        top_k=top_k, shortlist=shortlist
+    )
+    results = outcome["results"]
+    return {
+        "status": "success",
+        "ranked_count": len(results),
+        "processed_count": outcome["processed"],
+        "reused_count": outcome["reused"],
+        "results": results,
+        "errors": outcome["errors"],
+        "pruning": outcome["pruning"]
+    }
+
+
+@app.post("/rank-job/{job_id}")
+async def rank_job(job_id: str, request: Request, background: bool = False, full: bool = False,
+                   top_k: Optional[int] = None, shortlist: Optional[int] = None):
+    token = _bearer_token(request)
+    top_k, shortlist = _ranking_limits(top_k, shortlist)
+
+    if background:
+        # Outside the try: a full task queue is a 503 (Overloaded), not an error payload
+        return _accepted(await run_io(
+            task_manager.submit, "rank-job", _rank_job, job_id, token, full, top_k, shortlist
+        ))
+
     try:
-        token = auth_header.split(" ")[1]
-        results = fetch_and_rank_applications(job_id, token)
-        return {"status": "success", "ranked_count": len(results), "results": results}
+        return await run_io(_rank_job, job_id, token, full, top_k, shortlist)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
+@app.post("/rank-job/{job_id}/stream")
+async def rank_job_stream(job_id: str, request: Request, full: bool = False,
+                          format: Optional[str] = None, top_k: Optional[int] = None,
+                          shortlist: Optional[int] = None):
+    """
+    Streams progress, provisional per-application results, then the same
+    payload as /rank-job in a `complete` event (NDJSON, or SSE).
+    """
+    token = _bearer_token(request)
+    fmt = stream_format(format, request.headers.get("accept"))
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or sse")
+
+    top_k, shortlist = _ranking_limits(top_k, shortlist)
+
+    rank = functools.partial(_rank_job, job_id, token, full, top_k, shortlist)
+    return StreamingResponse(stream_job_ranking(rank, fmt), media_type=MEDIA_TYPES[fmt])
+
+
+# ── Vector Index (resume <-> job retrieval) ──────────────────────────────────
+# The "resumes" index holds one entry per candidate, keyed by Supabase user_id
+# (the latest resume /rank-job saw, or the one uploaded here).
+# Every route needs the caller's Supabase token. Candidates index and query
+# their own resume, companies their own jobs, and results only name jobs /
+# applicants the caller can read under RLS, as with /rank-job.
+
+from core_engine.nlp_engine.ranker import embed_documents
+from core_engine.utils.supabase_client import AuthError, get_client, get_user_id, select_values
+
+
+def _embed_pdf(resume_file):
+    return embed_documents([parse_document(_read_pdf_upload(resume_file))])[0]
+
+
+def _embed_text(text: str):
+    return embed_documents([parse_document(text)])[0]
+
+
+def _matches(pairs: list, id_key: str) -> list:
+    return [{id_key: item_id, "similarity": round(score * 100, 2)} for item_id, score in pairs]
+
+
+async def _caller(request: Request) -> tuple:
+    """(token, user id) of the request's verified Supabase token."""
+    token = _bearer_token(request)
+    try:
+        return token, await run_io(get_user_id, token)
+    except AuthError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+
+def _own_job(token: str, user_id: str, job_id: str) -> dict:
+    """The caller's job (description, title), or 404."""
+    response = (
+        get_client(token).table('jobs').select('description, title')
+        .eq('id', job_id).eq('company_id', user_id).execute()
+    )
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return response.data[0]
+
+
+def _visible_jobs(token: str) -> set:
+    return select_values(get_client(token), 'jobs', 'id')
+
+
+def _visible_applicants(token: str) -> set:
+    return select_values(get_client(token), 'applications', 'user_id')
+
+
+@app.post("/index/resumes")
+async def index_resume(request: Request, resume: UploadFile = File(...)):
+    """Adds or replaces the caller's own resume."""
+    _, user_id = await _caller(request)
+    embedding = await run_cpu(_embed_pdf, resume.file)
+    await run_cpu(get_index("resumes").upsert, [user_id], [embedding])
+    return {"status": "indexed", "user_id": user_id, "size": await run_cpu(len, get_index("resumes"))}
+
+
+@app.post("/index/jobs")
+async def index_job(request: Request, job_id: str = Form(...)):
+    """Adds or replaces one of the caller's jobs, with its description as stored in Supabase."""
+    token, user_id = await _caller(request)
+    job = await run_io(_own_job, token, user_id, job_id)
+    embedding = await run_cpu(_embed_text, job.get('description') or job.get('title', ''))
+    await run_cpu(get_index("jobs").upsert, [job_id], [embedding])
+    return {"status": "indexed", "job_id": job_id, "size": await run_cpu(len, get_index("jobs"))}
+
+
+@app.delete("/index/resumes/{user_id}")
+async def unindex_resume(user_id: str, request: Request):
+    _, caller_id = await _caller(request)
+    if user_id != caller_id:
+        raise HTTPException(status_code=403, detail="Only your own resume can be removed")
+    if not await run_cpu(get_index("resumes").remove, [user_id]):
+        raise HTTPException(status_code=404, detail="Resume not indexed")
+    return {"status": "removed", "user_id": user_id}
+
+
+@app.delete("/index/jobs/{job_id}")
+async def unindex_job(job_id: str, request: Request):
+    token, user_id = await _caller(request)
+    await run_io(_own_job, token, user_id, job_id)
+    if not await run_cpu(get_index("jobs").remove, [job_id]):
+        raise HTTPException(status_code=404, detail="Job not indexed")
+    return {"status": "removed", "job_id": job_id}
+
+
+@app.get("/match/resumes/{user_id}/jobs")
+async def jobs_for_indexed_resume(user_id: str, request: Request, k: int = 20):
+    token, caller_id = await _caller(request)
+    if user_id != caller_id:
+        raise HTTPException(status_code=403, detail="Only your own resume can be matched")
+    embedding = await run_cpu(get_index("resumes").get, user_id)
+    if embedding is None:
+        raise HTTPException(status_code=404, detail="Resume not indexed")
+    jobs = await run_io(_visible_jobs, token)
+    matches = await run_cpu(get_index("jobs").search, embedding, k, within=jobs)
+    return {"user_id": user_id, "jobs": _matches(matches, "job_id")}
+
+
+@app.get("/match/jobs/{job_id}/resumes")
+async def resumes_for_indexed_job(job_id: str, request: Request, k: int = 20):
+    token, user_id = await _caller(request)
+    await run_io(_own_job, token, user_id, job_id)
+    embedding = await run_cpu(get_index("jobs").get, job_id)
+    if embedding is None:
+        raise HTTPException(status_code=404, detail="Job not indexed")
+    applicants = await run_io(_visible_applicants, token)
+    matches = await run_cpu(get_index("resumes").search, embedding, k, within=applicants)
+    return {"job_id": job_id, "resumes": _matches(matches, "user_id")}
+
+
+@app.post("/match/jobs")
+async def jobs_for_resume(
+    request: Request,
+    resume: UploadFile = File(...),
+    k: int = Form(20)
+):
+    """Which indexed jobs (among those the caller can see) fit an uploaded resume."""
+    token, _ = await _caller(request)
+    embedding = await run_cpu(_embed_pdf, resume.file)
+    jobs = await run_io(_visible_jobs, token)
+    matches = await run_cpu(get_index("jobs").search, embedding, k, within=jobs)
+    return {"filename": resume.filename, "jobs": _matches(matches, "job_id")}
+
+
+@app.post("/match/resumes")
+async def resumes_for_job(
+    request: Request,
+    job_description: str = Form(...),
+    k: int = Form(20)
+):
+    """Top indexed candidates, among the caller's applicants, for a (new) job description."""
+    token, _ = await _caller(request)
+    embedding = await run_cpu(_embed_text, job_description)
+    applicants = await run_io(_visible_applicants, token)
+    matches = await run_cpu(get_index("resumes").search, embedding, k, within=applicants)
+    return {"resumes": _matches(matches, "user_id")}
+
+
+# ── Cross match (every resume x every job) ────────────────────────────────────
+
+from core_engine.nlp_engine.cross_match import cross_match
+
+
+def _documents(body: dict, field: str) -> list:
+    items = body.get(field)
+    if not isinstance(items, list) or not all(
+        isinstance(item, dict) and "id" in item and isinstance(item.get("text"), str)
+        for item in items
+    ):
+        raise HTTPException(status_code=400, detail=f"{field} must be a list of {{id, text}}")
+    return items
+
+
+@app.post("/match/cross")
+async def cross_match_endpoint(request: Request):
+    """
+    Body: {"resumes": [{id, text}], "jobs": [{id, text}], "k": 10, "details": true}
+    Best jobs per candidate and best candidates per job, scored like
+    /rank-resumes (embedding similarity + skill overlap) for every pair.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Body must be a JSON object")
+
+    resumes = _documents(body, "resumes")
+    jobs = _documents(body, "jobs")
+    if len(resumes) * len(jobs) > CROSS_MATCH_MAX_PAIRS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {CROSS_MATCH_MAX_PAIRS} resume x job pairs per request"
+        )
+    try:
+        k = int(body.get("k", 10))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="k must be an integer")
+
+    return await run_cpu(cross_match, resumes, jobs, k, None, bool(body.get("details", True)))
+
+
+# ── Background Tasks ──────────────────────────────────────────────────────────
+
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    task = await run_io(task_manager.get, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task.to_dict()
+
+
+@app.get("/tasks/{task_id}/result")
+async def get_task_result(task_id: str):
+    task = await run_io(task_manager.get, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not task.finished:
+        raise HTTPException(status_code=409, detail=f"Task is {task.status}")
+    if task.error:
+        return {"status": "error", "message": task.error}
+    return task.result
+
+
 # ── Serve React Frontend (production) ─────────────────────────────────────────
-# The Dockerfile builds the React app into frontend/dist.
-# FastAPI serves those static files for any non-API route.
+# The Dockerfile builds the React app into frontend/dist and precompresses it.
+# Its files are held in memory and served by one catch-all route (see
+# core_engine/static_site.py). This must stay last: the catch-all refuses
+# every path under the API routes registered above.
 
-STATIC_DIR = Path(__file__).parent.parent / "frontend" / "dist"
+static_site.mount(app, Path(__file__).parent.parent / "frontend" / "dist")
 
-if STATIC_DIR.exists():
-    # Serve JS/CSS/assets
-    app.mount("/assets", StaticFiles(directory=str(STATIC_DIR / "assets")), name="assets")
 
-    @app.get("/{full_path:path}", include_in_schema=False)
-    async def serve_react(full_path: str):
-        """Catch-all: serve index.html for all non-API routes (React Router SPA)."""
-        index = STATIC_DIR / "index.html"
-        return FileResponse(str(index))
+startup.record("imports", time.perf_counter() - _import_start)
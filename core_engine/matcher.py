@@ -1,20 +1,30 @@
-from core_engine.rule_engine.skill_matcher import load_skill_map, extract_skills
+from core_engine.rule_engine.skill_matcher import get_skill_index
 from core_engine.rule_engine.score_calculator import calculate_match_score
 from core_engine.rule_engine.gap_analyzer import find_missing_skills
-from core_engine.ai_engine.gemini_analyzer import generate_suggestions
+from core_engine.ai_engine.gemini_analyzer import generate_suggestions, start_suggestions
+from core_engine.nlp_engine.document import as_document
+from core_engine import metrics
 
 
-def match_resume_with_jd(resume_text: str, jd_text: str, role: str):
+def match_resume_with_jd(resume_text, jd_text, role: str, defer_suggestions: bool = False):
     """
     Complete matching pipeline:
     Resume + JD → Score + Gaps + AI Suggestions
+
+    Each side is raw text or an already parsed `ParsedDocument`.
+
+    With `defer_suggestions`, Gemini is not waited for: the result carries
+    an `analysis_id` and a `suggestions_status`, and `ai_suggestions` is
+    None until `get_suggestions(analysis_id)` has them (unless they were
+    known right away, e.g. cached).
     """
 
-    skill_map = load_skill_map("core_engine/skills/skill_list.txt")
+    skill_map = get_skill_index()
 
-    # Extract skills (lists)
-    resume_skills = extract_skills(resume_text, skill_map)
-    jd_skills = extract_skills(jd_text, skill_map)
+    # Extract skills (lists), unless already parsed
+    with metrics.stage("analyze", "skills", items=2):
+        resume_skills = as_document(resume_text, skill_map).skills
+        jd_skills = as_document(jd_text, skill_map).skills
 
     # Convert to sets ONCE (important)
     resume_set = set(resume_skills)
@@ -25,14 +35,23 @@ def match_resume_with_jd(resume_text: str, jd_text: str, role: str):
     missing_skills = sorted(list(jd_set - resume_set))
 
     # Score
-    match_score = calculate_match_score(resume_skills, jd_skills)
-
-    # AI Suggestions
-    suggestions = generate_suggestions(missing_skills, role)
+    with metrics.stage("analyze", "score"):
+        match_score = calculate_match_score(resume_skills, jd_skills)
 
-    return {
+    result = {
         "match_score": match_score,
         "matched_skills": matched_skills,
         "missing_skills": missing_skills,
-        "ai_suggestions": suggestions
-    }
\ No newline at end of file
+    }
+
+    # AI Suggestions
+    if defer_suggestions:
+        status = start_suggestions(missing_skills, role).result()
+        result["ai_suggestions"] = status["ai_suggestions"]
+        result["analysis_id"] = status["analysis_id"]
+        result["suggestions_status"] = status["status"]
+        return result
+
+    with metrics.stage("analyze", "gemini"):
+        result["ai_suggestions"] = generate_suggestions(missing_skills, role)
+    return result
\ No newline at end of file
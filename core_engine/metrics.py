@@ -0,0 +1,213 @@
+import bisect
+import contextvars
+import threading
+import time
+
+from config.metrics_config import METRICS_ENABLED, SERVER_TIMING_ENABLED, METRICS_BUCKETS
+
+# ================================
+# STAGE INSTRUMENTATION
+# ================================
+# Usage:
+#
+#     with metrics.stage("rank", "embedding", items=len(texts)) as s:
+#         ...
+#         s.errors += failed
+#
+# Records a latency histogram per (pipeline, stage), plus item and error
+# counters. An exception escaping the block counts as one error.
+
+_lock = threading.Lock()
+_histograms = {}     # (pipeline, stage) -> [bucket counts..., +Inf], sum
+_items = {}          # (pipeline, stage) -> total items
+_errors = {}         # (pipeline, stage) -> total errors
+_gauges = []         # (name, help, callback, kind)
+
+# Stage timings of the current request, for the Server-Timing header.
+# None outside a request (background tasks, scripts).
+_request_timings = contextvars.ContextVar("applysmart_request_timings", default=None)
+
+
+class _Stage:
+    __slots__ = ("pipeline", "name", "items", "errors", "_start")
+
+    def __init__(self, pipeline: str, name: str, items: int):
+        self.pipeline = pipeline
+        self.name = name
+        self.items = items
+        self.errors = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.errors += 1
+        _observe(self.pipeline, self.name, elapsed, self.items, self.errors)
+
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((f"{self.pipeline}-{self.name}", elapsed))
+        return False
+
+
+class _NullStage:
+    """Shared no-op stage used when metrics are disabled."""
+    __slots__ = ()
+
+    items = property(lambda self: 0, lambda self, value: None)
+    errors = property(lambda self: 0, lambda self, value: None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(pipeline: str, name: str, items: int = 0):
+    if not METRICS_ENABLED:
+        return _NULL_STAGE
+    return _Stage(pipeline, name, items)
+
+
+def _observe(pipeline, name, seconds, items, errors):
+    key = (pipeline, name)
+    index = bisect.bisect_left(METRICS_BUCKETS, seconds)
+
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(METRICS_BUCKETS) + 1), 0.0]
+        histogram[0][index] += 1
+        histogram[1] += seconds
+
+        if items:
+            _items[key] = _items.get(key, 0) + items
+        if errors:
+            _errors[key] = _errors.get(key, 0) + errors
+
+
+def register_gauge(name: str, help_text: str, callback, kind: str = "gauge"):
+    """
+    Exposes a value computed at scrape time (`kind` is the Prometheus type,
+    "counter" for values that only grow). `callback()` returns a number,
+    or a dict mapping label tuples (((key, value), ...)) to numbers.
+    """
+    _gauges.append((name, help_text, callback, kind))
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _items.clear()
+        _errors.clear()
+
+
+# ================================
+# PROMETHEUS TEXT FORMAT
+# ================================
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+    return "{" + body + "}"
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def render() -> str:
+    with _lock:
+        histograms = {key: (list(counts), total) for key, (counts, total) in _histograms.items()}
+        items = dict(_items)
+        errors = dict(_errors)
+
+    lines = [
+        "# HELP applysmart_stage_seconds Time spent in each pipeline stage.",
+        "# TYPE applysmart_stage_seconds histogram",
+    ]
+    bounds = list(METRICS_BUCKETS) + [float("inf")]
+    for (pipeline, name), (counts, total) in sorted(histograms.items()):
+        base = (("pipeline", pipeline), ("stage", name))
+        cumulative = 0
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            lines.append(
+                f"applysmart_stage_seconds_bucket{_labels(base + (('le', _le(bound)),))} {cumulative}"
+            )
+        lines.append(f"applysmart_stage_seconds_sum{_labels(base)} {total:.6f}")
+        lines.append(f"applysmart_stage_seconds_count{_labels(base)} {cumulative}")
+
+    for metric, values, help_text in (
+        ("applysmart_stage_items_total", items, "Items processed by each pipeline stage."),
+        ("applysmart_stage_errors_total", errors, "Errors raised or reported by each pipeline stage."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for (pipeline, name), value in sorted(values.items()):
+            lines.append(f"{metric}{_labels((('pipeline', pipeline), ('stage', name)))} {value}")
+
+    for name, help_text, callback, kind in _gauges:
+        try:
+            value = callback()
+        except Exception:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if isinstance(value, dict):
+            for labels, sample in value.items():
+                lines.append(f"{name}{_labels(labels)} {sample}")
+        else:
+            lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ================================
+# SERVER-TIMING (ASGI middleware)
+# ================================
+class ServerTimingMiddleware:
+    """
+    Collects the stages run while serving a request (including those run in
+    the executors, which copy the request context) and reports them in a
+    `Server-Timing` header, along with the total time until the response
+    headers were sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (METRICS_ENABLED and SERVER_TIMING_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        timings = []
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - start
+                entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+                entries.append(f"total;dur={total * 1000:.1f}")
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", ", ".join(entries).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
@@ -0,0 +1,136 @@
+import numpy as np
+
+from core_engine.nlp_engine.document import parse_documents
+from core_engine.nlp_engine.ranker import DEFAULT_WEIGHTS, embed_documents
+from core_engine.rule_engine.skill_matcher import get_skill_index
+from core_engine.rule_engine.skill_vectors import get_skill_vocabulary, match_matrix
+from core_engine import metrics
+
+
+def score_matrix(resume_embeddings, job_embeddings, resume_bits, job_bits,
+                 weights: dict = None) -> dict:
+    """
+    The ranker's score for every resume x job pair at once:
+    `weights` blend of cosine similarity (clipped at 0) and the skill score
+    from the bitset `match_matrix`, on the same 0-100 scale as
+    `ranker.rank_candidates`. Returns (R, J) arrays:
+        {"score", "semantic_score", "skill_score", "matched"}
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    resumes = np.asarray(resume_embeddings, dtype=np.float32)
+    jobs = np.asarray(job_embeddings, dtype=np.float32)
+
+    # Same normalization as `EmbeddingModel.compute_similarities`
+    resume_norms = np.linalg.norm(resumes, axis=1)
+    resume_norms[resume_norms == 0] = 1.0
+    job_norms = np.linalg.norm(jobs, axis=1)
+    job_norms[job_norms == 0] = 1.0
+
+    semantic = (resumes @ (jobs / job_norms[:, None]).T) / resume_norms[:, None]
+    semantic = np.maximum(semantic.astype(np.float64), 0.0)
+
+    skills = match_matrix(resume_bits, job_bits)
+    skill_score = skills["skill_score"]
+
+    score = semantic * weights['semantic'] + skill_score * weights['skills']
+    return {
+        "score": np.round(score * 100, 2),
+        "semantic_score": np.round(semantic * 100, 2),
+        "skill_score": np.round(skill_score * 100, 2),
+        "matched": skills["matched"],
+    }
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Per row, the column indices of the `k` best scores (ties: lower index first)."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.zeros((scores.shape[0], 0), dtype=np.intp)
+    if k == scores.shape[1]:
+        return np.argsort(-scores, axis=1, kind="stable")
+
+    # Select the k best per row, then sort only those
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    selected = np.take_along_axis(scores, part, axis=1)
+    top = np.take_along_axis(part, np.lexsort((part, -selected), axis=1), axis=1)
+
+    # Rows with ties across the k-th place: argpartition may have kept any of them
+    tied = (scores >= selected.min(axis=1)[:, None]).sum(axis=1) > k
+    if tied.any():
+        top[tied] = np.argsort(-scores[tied], axis=1, kind="stable")[:, :k]
+    return top
+
+
+def cross_match(resumes: list, jobs: list, k: int = 10, weights: dict = None,
+                details: bool = True) -> dict:
+    """
+    Matches every resume against every job.
+
+    resumes / jobs: [{"id": ..., "text": ...}]
+    Returns the best `k` jobs per candidate and the best `k` candidates per
+    job. With `details`, each match also lists matched and missing skills.
+    """
+    summary = {
+        "resume_count": len(resumes),
+        "job_count": len(jobs),
+        "pairs": len(resumes) * len(jobs),
+    }
+    if not resumes or not jobs:
+        return {"candidates": [], "jobs": [], **summary}
+
+    skill_map = get_skill_index()
+    vocabulary = get_skill_vocabulary()
+
+    with metrics.stage("cross_match", "preprocess", items=len(resumes) + len(jobs)):
+        resume_docs = parse_documents([r["text"] for r in resumes], skill_map)
+        job_docs = parse_documents([j["text"] for j in jobs], skill_map)
+        resume_bits = vocabulary.encode_many([doc.skills for doc in resume_docs])
+        job_bits = vocabulary.encode_many([doc.skills for doc in job_docs])
+
+    resume_embeddings = embed_documents(resume_docs)
+    job_embeddings = embed_documents(job_docs)
+
+    with metrics.stage("cross_match", "matrix", items=len(resumes) * len(jobs)):
+        matrix = score_matrix(resume_embeddings, job_embeddings, resume_bits, job_bits, weights)
+        best_jobs = top_k_indices(matrix["score"], k)
+        best_resumes = top_k_indices(matrix["score"].T, k)
+
+    with metrics.stage("cross_match", "select", items=best_jobs.size + best_resumes.size):
+        resume_skills = vocabulary.unpack(resume_bits)
+        job_skills = vocabulary.unpack(job_bits)
+        skill_names = np.array(vocabulary.skills)
+
+        def match(r, j):
+            entry = {
+                "score": float(matrix["score"][r, j]),
+                "semantic_score": float(matrix["semantic_score"][r, j]),
+                "skill_score": float(matrix["skill_score"][r, j]),
+                "matched_count": int(matrix["matched"][r, j]),
+            }
+            if details:
+                entry["matched_skills"] = skill_names[resume_skills[r] & job_skills[j]].tolist()
+                entry["missing_skills"] = skill_names[job_skills[j] & ~resume_skills[r]].tolist()
+            return entry
+
+        candidates = [
+            {
+                "id": resume["id"],
+                "jobs": [{"job_id": jobs[j]["id"], **match(r, j)} for j in best_jobs[r]],
+            }
+            for r, resume in enumerate(resumes)
+        ]
+        job_results = [
+            {
+                "id": job["id"],
+                "candidates": [{"resume_id": resumes[r]["id"], **match(r, j)} for r in best_resumes[j]],
+            }
+            for j, job in enumerate(jobs)
+        ]
+
+    return {
+        "candidates": candidates,
+        "jobs": job_results,
+        **summary,
+    }
@@ -0,0 +1,89 @@
+import hashlib
+import re
+
+from core_engine.rule_engine.skill_matcher import get_skill_index
+from core_engine.nlp_engine.feature_extractor import extract_experience
+
+# Same character class as `preprocessing.clean_text`, on already lowercased text
+_NON_MODEL_CHARS = re.compile(r"[^a-z0-9\s]")
+
+
+def normalize_text(raw: str) -> str:
+    """Lowercased, whitespace collapsed: same as `utils.text_cleaner.clean_text`."""
+    if not raw:
+        return ""
+    return " ".join(raw.lower().split())
+
+
+def model_text_of(text: str) -> str:
+    """
+    What the embedding model sees for normalized `text`: same as
+    `preprocessing.preprocess_text`.
+    """
+    return " ".join(_NON_MODEL_CHARS.sub(" ", text).split())
+
+
+class ParsedDocument:
+    """
+    A resume or job description normalized once for every consumer:
+
+    - text:             lowercased, whitespace-normalized (rule engine, storage)
+    - model_text:       punctuation stripped, fed to the embedding model
+    - skills:           sorted canonical skills found in `text`
+    - experience_years: largest "N years" mention
+    - content_hash:     sha256 of `text`, a stable cache key
+    """
+
+    __slots__ = ("text", "model_text", "skills", "experience_years", "content_hash")
+
+    def __init__(self, text, model_text, skills, experience_years, content_hash):
+        self.text = text
+        self.model_text = model_text
+        self.skills = skills
+        self.experience_years = experience_years
+        self.content_hash = content_hash
+
+    @classmethod
+    def parse(cls, raw_text: str, skill_index=None) -> "ParsedDocument":
+        if skill_index is None:
+            skill_index = get_skill_index()
+
+        text = normalize_text(raw_text)
+        return cls(
+            text=text,
+            model_text=model_text_of(text),
+            skills=sorted({skill for _, _, skill in skill_index.find_matches(text, lowered=True)}),
+            experience_years=extract_experience(text),
+            content_hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        )
+
+    @property
+    def profile(self) -> dict:
+        """Same shape as `feature_extractor.resume_profile`."""
+        return {"skills": self.skills, "experience_years": self.experience_years}
+
+
+def parse_document(raw_text: str, skill_index=None) -> ParsedDocument:
+    return ParsedDocument.parse(raw_text, skill_index)
+
+
+def parse_documents(raw_texts: list, skill_index=None) -> list:
+    """Parses many documents; identical texts are parsed once and shared."""
+    if skill_index is None:
+        skill_index = get_skill_index()
+
+    parsed = {}
+    documents = []
+    for raw_text in raw_texts:
+        doc = parsed.get(raw_text)
+        if doc is None:
+            doc = parsed[raw_text] = ParsedDocument.parse(raw_text, skill_index)
+        documents.append(doc)
+    return documents
+
+
+def as_document(value, skill_index=None) -> ParsedDocument:
+    """Accepts either a `ParsedDocument` or raw text."""
+    if isinstance(value, ParsedDocument):
+        return value
+    return ParsedDocument.parse(value, skill_index)
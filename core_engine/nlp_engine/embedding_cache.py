@@ -0,0 +1,209 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from core_engine.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Content address of one embedding: hash of (model name, text)."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache.
+
+    - Memory tier: LRU of float32 vectors.
+    - Disk tier (optional): SQLite blobs that survive restarts, evicted
+      least-recently-used first once the stored bytes exceed `disk_max_bytes`.
+    """
+
+    def __init__(self, model_name: str, memory_items: int = 5000,
+                 cache_dir: str = None, disk_max_bytes: int = 512 * 1024 * 1024):
+        self.model_name = model_name
+        self.memory = LRUCache(max_items=memory_items)
+        self.disk_max_bytes = disk_max_bytes
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._cache_dir = cache_dir
+        self._disk_bytes = 0
+
+        if cache_dir:
+            try:
+                self._open_disk(cache_dir)
+            except Exception as e:
+                logger.error(f"Embedding disk cache disabled: {e}")
+                self._conn = None
+
+    # -------------------------------
+    # DISK TIER
+    # -------------------------------
+    def _open_disk(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, "embeddings.sqlite3")
+
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access"
+            " ON embeddings (last_access)"
+        )
+        self._disk_bytes = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        self._conn = conn
+
+    def close(self):
+        """
+        Closes the disk tier. A SQLite connection must not cross a fork:
+        the pre-fork server closes it in the parent and each worker calls
+        `reopen()`.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def reopen(self):
+        if self._cache_dir and self._conn is None:
+            try:
+                self._open_disk(self._cache_dir)
+            except Exception as e:
+                logger.error(f"Embedding disk cache disabled: {e}")
+                self._conn = None
+
+    def _disk_get_many(self, keys: list) -> dict:
+        if self._conn is None or not keys:
+            return {}
+
+        found = {}
+        with self._lock:
+            # SQLite caps bound parameters, so look keys up in chunks
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+        return found
+
+    def _disk_put_many(self, items: dict):
+        if self._conn is None or not items:
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, vector in items.items():
+                blob = vector.tobytes()
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO embeddings (key, vector, last_access)"
+                    " VALUES (?, ?, ?)",
+                    (key, blob, now),
+                )
+                if cursor.rowcount:
+                    self._disk_bytes += len(blob)
+            self._conn.commit()
+            self._evict_disk()
+
+    def _evict_disk(self):
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+
+        # Drop the least recently used rows until we are back under ~90%
+        target = int(self.disk_max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access"
+        )
+        doomed = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= size
+
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+        self._conn.commit()
+
+    # -------------------------------
+    # PUBLIC API
+    # -------------------------------
+    def get_many(self, texts: list) -> tuple:
+        """
+        Looks up every text. Returns (keys, vectors) where `vectors[i]` is
+        None for a miss.
+        """
+        keys = [embedding_key(self.model_name, t) for t in texts]
+        vectors = [self.memory.get(k) for k in keys]
+
+        missing = [k for k, v in zip(keys, vectors) if v is None]
+        from_disk = self._disk_get_many(list(dict.fromkeys(missing)))
+
+        for i, key in enumerate(keys):
+            if vectors[i] is not None:
+                self.hits += 1
+            elif key in from_disk:
+                vectors[i] = from_disk[key]
+                self.memory.put(key, vectors[i])
+                self.hits += 1
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+
+        return keys, vectors
+
+    def put_many(self, keys: list, vectors) -> None:
+        items = {}
+        for key, vector in zip(keys, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            self.memory.put(key, vector)
+            items[key] = vector
+        self._disk_put_many(items)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "memory": self.memory.stats(),
+            "disk_enabled": self._conn is not None,
+            "disk_bytes": self._disk_bytes,
+            "disk_max_bytes": self.disk_max_bytes,
+        }
@@ -1,40 +1,257 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import logging
+import os
+import threading
+import time
+
+from config.model_config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_FILE,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_THREADS,
+    EMBEDDING_BATCHING,
+    EMBEDDING_BATCH_WAIT_MS,
+    EMBEDDING_BATCH_MAX_TEXTS,
+    EMBEDDING_BATCH_MAX_TOKENS,
+)
+from config.cache_config import (
+    CACHE_DIR,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MEMORY_ITEMS,
+    EMBEDDING_CACHE_DISK_ENABLED,
+    EMBEDDING_CACHE_DISK_MAX_MB,
+)
+from core_engine.nlp_engine.embedding_cache import EmbeddingCache
+from core_engine.nlp_engine.encode_batcher import EncodeBatcher
+from core_engine import startup
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+
+# Model lifecycle states
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+def load_sentence_model(model_name: str, backend: str = "torch", threads: int = 0,
+                        onnx_file: str = EMBEDDING_ONNX_FILE):
+    """
+    Builds a SentenceTransformer for one of the supported CPU backends.
+    torch / sentence-transformers are only imported here, so importing this
+    module stays cheap.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+
+    if backend in ("torch", "int8"):
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+
+        model = SentenceTransformer(model_name, device="cpu", backend="torch")
+
+        if backend == "int8":
+            import torch
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        return model
+
+    # ONNX Runtime
+    import onnxruntime
+
+    session_options = onnxruntime.SessionOptions()
+    if threads:
+        session_options.intra_op_num_threads = threads
+
+    model_kwargs = {
+        "provider": "CPUExecutionProvider",
+        "session_options": session_options,
+    }
+    if backend == "onnx-int8":
+        model_kwargs["file_name"] = onnx_file
+
+    return SentenceTransformer(
+        model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs
+    )
+
+
 class EmbeddingModel:
     _instance = None
     _model = None
+    _cache = None
+    _batcher = None
+
+    model_name = EMBEDDING_MODEL_NAME
+    backend = EMBEDDING_BACKEND
+    batch_size = EMBEDDING_BATCH_SIZE
+
+    # Identifies which vectors this model produces (cache / store / index key).
+    # Quantized backends drift slightly, so their vectors are kept apart.
+    model_id = (
+        EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == "torch"
+        else f"{EMBEDDING_MODEL_NAME}:{EMBEDDING_BACKEND}"
+    )
+
+    status = NOT_LOADED
+    load_error = None
+    _failed_at = 0.0
+    _load_lock = threading.Lock()
+
+    # After a failed load, don't retry on every request
+    retry_after_seconds = 30.0
 
     def __new__(cls):
-        """Singleton to ensure model is loaded only once"""
+        """
+        Singleton. Creating it is cheap: the model itself is loaded by
+        `load()` / `start_background_load()`, or on first use.
+        """
         if cls._instance is None:
             cls._instance = super(EmbeddingModel, cls).__new__(cls)
+
+            if EMBEDDING_CACHE_ENABLED:
+                cls._cache = EmbeddingCache(
+                    cls.model_id,
+                    memory_items=EMBEDDING_CACHE_MEMORY_ITEMS,
+                    cache_dir=(
+                        os.path.join(CACHE_DIR, "embeddings")
+                        if EMBEDDING_CACHE_DISK_ENABLED else None
+                    ),
+                    disk_max_bytes=EMBEDDING_CACHE_DISK_MAX_MB * 1024 * 1024,
+                )
+
+            if EMBEDDING_BATCHING:
+                cls._batcher = EncodeBatcher(
+                    cls._instance._encode_now,
+                    max_wait=EMBEDDING_BATCH_WAIT_MS / 1000.0,
+                    max_texts=EMBEDDING_BATCH_MAX_TEXTS,
+                    max_tokens=EMBEDDING_BATCH_MAX_TOKENS,
+                )
+        return cls._instance
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    @property
+    def is_ready(self) -> bool:
+        return self.status == READY
+
+    def load(self) -> bool:
+        """
+        Loads the model once (concurrent callers wait for the same load).
+        Returns True when the model is ready.
+        """
+        cls = type(self)
+        with cls._load_lock:
+            if cls.status == READY:
+                return True
+            if cls.status == FAILED and time.monotonic() - cls._failed_at < cls.retry_after_seconds:
+                return False
+
+            cls.status = LOADING
+            start = time.perf_counter()
             try:
-                logger.info("Loading Sentence Transformer model...")
-                # 'all-MiniLM-L6-v2' is a good balance of speed and performance
-                cls._model = SentenceTransformer('all-MiniLM-L6-v2') 
+                logger.info(f"Loading Sentence Transformer model ({cls.backend} backend)...")
+                cls._model = load_sentence_model(
+                    cls.model_name, cls.backend, EMBEDDING_THREADS
+                )
+                if cls._batcher is not None:
+                    cls._batcher.max_seq_length = (
+                        getattr(cls._model, "max_seq_length", None) or cls._batcher.max_seq_length
+                    )
+                cls.status = READY
+                cls.load_error = None
                 logger.info("Model loaded successfully.")
             except Exception as e:
                 logger.error(f"Failed to load model: {e}")
                 cls._model = None
-        return cls._instance
+                cls.status = FAILED
+                cls.load_error = str(e)
+                cls._failed_at = time.monotonic()
+            finally:
+                startup.record("model_load", time.perf_counter() - start)
+
+        return cls.status == READY
+
+    def warm_up(self):
+        """One tiny encode so the first real request doesn't pay for lazy init."""
+        if not self.load():
+            return
+        with startup.timed("model_warm_up"):
+            self._encode(["warm up"])
+
+    def start_background_load(self, warm_up: bool = True) -> threading.Thread:
+        def run():
+            if warm_up:
+                self.warm_up()
+            else:
+                self.load()
+
+        thread = threading.Thread(target=run, name="applysmart-model-load", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def batcher(self):
+        return self._batcher
 
     def get_embeddings(self, texts: list):
         """
         Generate embeddings for a list of texts.
         """
-        if self._model is None:
-            raise RuntimeError("Model is not loaded.")
-        
+        if self._model is None and not self.load():
+            raise RuntimeError(f"Model is not loaded: {self.load_error}")
+
         if not texts:
             return np.array([])
 
-        return self._model.encode(texts)
+        if self._cache is None:
+            # Identical texts are encoded once
+            unique = list(dict.fromkeys(texts))
+            if len(unique) == len(texts):
+                return self._encode(texts)
+            encoded = dict(zip(unique, self._encode(unique)))
+            return np.vstack([encoded[text] for text in texts])
+
+        keys, vectors = self._cache.get_many(texts)
+
+        # Only encode the misses (each distinct text once)
+        pending = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None and key not in pending:
+                pending[key] = text
+
+        if pending:
+            encoded = self._encode(list(pending.values()))
+            self._cache.put_many(list(pending), encoded)
+
+            fresh = dict(zip(pending, encoded))
+            vectors = [
+                fresh[key] if vector is None else vector
+                for key, vector in zip(keys, vectors)
+            ]
+
+        return np.vstack(vectors)
+
+    def _encode(self, texts: list):
+        if self._batcher is not None:
+            return self._batcher.encode(texts)
+        return self._encode_now(texts)
+
+    def _encode_now(self, texts: list):
+        encoded = self._model.encode(texts, batch_size=self.batch_size)
+        return np.asarray(encoded, dtype=np.float32)
 
     def compute_similarity(self, embedding1, embedding2):
         """
@@ -42,14 +259,28 @@ class EmbeddingModel:
         Input embeddings should be 1D or 2D arrays.
         Returns a float between -1 and 1.
         """
-        # Ensure inputs are 2D arrays for sklearn's cosine_similarity
-        if len(embedding1.shape) == 1:
-            embedding1 = embedding1.reshape(1, -1)
-        if len(embedding2.shape) == 1:
-            embedding2 = embedding2.reshape(1, -1)
+        embedding1 = np.asarray(embedding1).reshape(1, -1)[0]
+        return self.compute_similarities(embedding1, embedding2)[0]
+
+    def compute_similarities(self, query_embedding, embeddings):
+        """
+        Cosine similarity between one embedding and every row of a matrix.
+        The matrix is normalized once and scored with a single
+        matrix-vector product. Returns a 1D float array.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.size == 0:
+            return np.zeros(0, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+
+        row_norms = np.linalg.norm(matrix, axis=1)
+        row_norms[row_norms == 0] = 1.0
+        query_norm = np.linalg.norm(query) or 1.0
 
-        sim_matrix = cosine_similarity(embedding1, embedding2)
-        return sim_matrix[0][0]
+        return (matrix @ (query / query_norm)) / row_norms
 
 # Global instance
 embedding_model = EmbeddingModel()
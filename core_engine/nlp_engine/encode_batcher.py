@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from core_engine import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EncodeBatcher:
+    """
+    Merges concurrent encode calls into one model call.
+
+    Callers (request threads) block in `encode()`. A single batching thread
+    takes the oldest pending call, waits up to `max_wait` seconds for more
+    to arrive, stopping early once `max_texts` texts or `max_tokens`
+    estimated tokens are gathered, then encodes all of them at once and
+    hands each caller its own rows. The model's `encode` sorts a batch by
+    length before padding, so merged calls of different lengths stay cheap.
+
+    Calls with `max_texts` texts or more are already a full batch and are
+    encoded directly in the caller's thread.
+    """
+
+    def __init__(self, encode, max_wait: float = 0.005, max_texts: int = 64,
+                 max_tokens: int = 8192, max_seq_length: int = 256):
+        self._encode = encode
+        self.max_wait = max(0.0, max_wait)
+        self.max_texts = max(1, max_texts)
+        self.max_tokens = max(1, max_tokens)
+        self.max_seq_length = max_seq_length
+
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def tokens(self, text: str) -> int:
+        """Rough token count (~4 characters per token), capped at the model's limit."""
+        return min(self.max_seq_length, len(text) // 4 + 2)
+
+    def encode(self, texts: list) -> np.ndarray:
+        if len(texts) >= self.max_texts:
+            return self._encode(texts)
+
+        future = Future()
+        with self._cond:
+            if self._thread is None:
+                # Started on first use: never in a pre-fork parent
+                self._thread = threading.Thread(
+                    target=self._run, name="applysmart-encode-batcher", daemon=True
+                )
+                self._thread.start()
+            self._pending.append((texts, sum(self.tokens(t) for t in texts), time.monotonic(), future))
+            self._cond.notify()
+        return future.result()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "pending": len(self._pending),
+        }
+
+    # -------------------------------
+    # BATCHING THREAD
+    # -------------------------------
+    def _take_batch(self) -> list:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            deadline = self._pending[0][2] + self.max_wait
+            while True:
+                texts = sum(len(item[0]) for item in self._pending)
+                tokens = sum(item[1] for item in self._pending)
+                remaining = deadline - time.monotonic()
+                if texts >= self.max_texts or tokens >= self.max_tokens or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # Oldest first, within the budgets (the first call always fits)
+            batch = [self._pending.popleft()]
+            texts, tokens = len(batch[0][0]), batch[0][1]
+            while self._pending:
+                item = self._pending[0]
+                if texts + len(item[0]) > self.max_texts or tokens + item[1] > self.max_tokens:
+                    break
+                batch.append(self._pending.popleft())
+                texts += len(item[0])
+                tokens += item[1]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+
+            # Identical texts across callers are encoded once
+            unique = list(dict.fromkeys(text for item in batch for text in item[0]))
+            try:
+                with metrics.stage("embedding", "batch", items=len(unique)):
+                    encoded = self._encode(unique)
+            except Exception as e:
+                logger.error(f"Batched encode failed: {e}")
+                for item in batch:
+                    item[3].set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            self.texts += len(unique)
+
+            rows = {text: i for i, text in enumerate(unique)}
+            for texts, _, _, future in batch:
+                future.set_result(encoded[[rows[text] for text in texts]])
@@ -1,5 +1,5 @@
 import re
-from core_engine.rule_engine.skill_matcher import load_skill_map, extract_skills
+from core_engine.rule_engine.skill_matcher import get_skill_index, extract_skills
 #  ================================
 # EXPERIENCE EXTRACTION
 # ================================
@@ -19,24 +19,53 @@ def extract_experience(text: str) -> float:
 # MAIN FEATURE PIPELINE
 # ================================
 def extract_features(resume_text, jd_text, skill_file_path="core_engine/skills/skill_list.txt") -> dict:
-    
-    skill_map = load_skill_map(skill_file_path)
+    return extract_features_batch([resume_text], jd_text, skill_file_path)[0]
+
+
+def extract_features_batch(resume_texts, jd_text, skill_file_path="core_engine/skills/skill_list.txt") -> list:
+    """
+    Same features as `extract_features` for many resumes against one JD.
+    The JD is parsed exactly once per call.
+    """
+    skill_map = get_skill_index(skill_file_path)
 
-    # Extract skills separately
-    resume_skills = set(extract_skills(resume_text, skill_map))
     jd_skills = set(extract_skills(jd_text, skill_map))
 
+    return [
+        compare_profile(resume_profile(resume_text, skill_map), jd_skills)
+        for resume_text in resume_texts
+    ]
+
+
+# ================================
+# REUSABLE PIECES
+# ================================
+def resume_profile(resume_text, skill_map) -> dict:
+    """
+    The JD-independent part of a resume's features, which can be stored
+    and compared against any JD later.
+    """
+    return {
+        "skills": extract_skills(resume_text, skill_map),
+        "experience_years": extract_experience(resume_text)
+    }
+
+
+def compare_profile(profile: dict, jd_skills: set) -> dict:
+    resume_skills = set(profile["skills"])
+    jd_count = len(jd_skills)
+
     # Matching
-    matched_skills = sorted(list(resume_skills & jd_skills))
-    missing_skills = sorted(list(jd_skills - resume_skills))
+    matched_skills = sorted(resume_skills & jd_skills)
+    missing_skills = sorted(jd_skills - resume_skills)
 
     # Score
-    skill_score = (len(matched_skills) / len(jd_skills)) if jd_skills else 0
+    skill_score = (len(matched_skills) / jd_count) if jd_count else 0
 
     return {
         "matched_skills": matched_skills,
         "missing_skills": missing_skills,
         "skill_score": round(skill_score, 2),
-        "experience_years": extract_experience(resume_text),
+        "experience_years": profile["experience_years"],
         "found_skills": matched_skills
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,188 @@
+"""
+Backend parity check for the embedding model.
+
+Encodes a fixed fixture corpus with a baseline backend (PyTorch fp32) and a
+candidate backend, then reports:
+- cosine drift between the two embeddings of every text
+- ranking agreement when every fixture JD ranks every fixture resume
+- encoding throughput of both backends
+
+Usage:
+    python -m core_engine.nlp_engine.parity --backend onnx
+    python -m core_engine.nlp_engine.parity --backend int8 --threads 4
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from config.model_config import EMBEDDING_MODEL_NAME, EMBEDDING_BATCH_SIZE
+from core_engine.nlp_engine.embedding_model import BACKENDS, load_sentence_model
+from core_engine.nlp_engine.preprocessing import preprocess_text
+from core_engine.rule_engine.skill_matcher import load_skill_map, DEFAULT_SKILL_FILE
+
+# Synthetic text shared with the benchmark corpus (benchmarks/corpus.py)
+ROLES = [
+    "Backend Developer", "Data Scientist", "Frontend Engineer", "DevOps Engineer",
+    "Machine Learning Engineer", "Full Stack Developer", "QA Automation Engineer",
+    "Cloud Architect", "Mobile Developer", "Data Engineer",
+]
+
+PHRASES = [
+    "Built and maintained production services used by thousands of customers.",
+    "Collaborated with product managers and designers in an agile team.",
+    "Improved system performance and reduced infrastructure costs by 30 percent.",
+    "Mentored junior engineers and led weekly code reviews.",
+    "Designed data pipelines and automated reporting for the finance team.",
+    "Wrote unit and integration tests and set up continuous delivery.",
+    "Migrated legacy applications to a modern cloud platform.",
+    "Worked closely with stakeholders to gather and refine requirements.",
+    "Presented technical roadmaps to leadership every quarter.",
+    "Reduced incident response time by introducing better monitoring.",
+]
+
+
+def build_fixture_corpus(n_jobs: int = 10, n_resumes: int = 100, seed: int = 7) -> dict:
+    """Deterministic JDs and resumes drawn from the skill list."""
+    rng = random.Random(seed)
+    skills = sorted(load_skill_map(DEFAULT_SKILL_FILE))
+
+    def document(title, skill_count, sentence_count):
+        picked = rng.sample(skills, skill_count)
+        sentences = rng.sample(PHRASES, sentence_count)
+        years = rng.randint(1, 12)
+        return (
+            f"{title}. {years} years of experience. "
+            f"Skills: {', '.join(picked)}. " + " ".join(sentences)
+        )
+
+    jobs = [
+        document(f"We are hiring a {rng.choice(ROLES)}", rng.randint(5, 10), 3)
+        for _ in range(n_jobs)
+    ]
+    resumes = [
+        document(rng.choice(ROLES), rng.randint(6, 20), rng.randint(3, 6))
+        for _ in range(n_resumes)
+    ]
+    return {"jobs": jobs, "resumes": resumes}
+
+
+def _encode(model, texts, batch_size):
+    start = time.perf_counter()
+    vectors = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    elapsed = time.perf_counter() - start
+    return vectors, elapsed
+
+
+def _unit(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _spearman(a, b):
+    ranks_a = np.argsort(np.argsort(-a))
+    ranks_b = np.argsort(np.argsort(-b))
+    n = len(a)
+    if n < 2:
+        return 1.0
+    return float(1 - 6 * np.sum((ranks_a - ranks_b) ** 2) / (n * (n ** 2 - 1)))
+
+
+def compare_embeddings(baseline_jobs, baseline_resumes, candidate_jobs, candidate_resumes,
+                       top_k: int = 10) -> dict:
+    """Drift and ranking agreement between two sets of embeddings."""
+    base = _unit(np.vstack([baseline_jobs, baseline_resumes]))
+    cand = _unit(np.vstack([candidate_jobs, candidate_resumes]))
+    cosine = np.sum(base * cand, axis=1)
+
+    base_scores = _unit(baseline_jobs) @ _unit(baseline_resumes).T
+    cand_scores = _unit(candidate_jobs) @ _unit(candidate_resumes).T
+
+    k = min(top_k, base_scores.shape[1])
+    overlaps, spearman, top1 = [], [], []
+    for base_row, cand_row in zip(base_scores, cand_scores):
+        base_top = set(np.argsort(-base_row)[:k])
+        cand_top = set(np.argsort(-cand_row)[:k])
+        overlaps.append(len(base_top & cand_top) / k)
+        spearman.append(_spearman(base_row, cand_row))
+        top1.append(int(np.argmax(base_row) == np.argmax(cand_row)))
+
+    return {
+        "cosine_drift": {
+            "mean": round(float(np.mean(1 - cosine)), 6),
+            "max": round(float(np.max(1 - cosine)), 6),
+            "min_cosine": round(float(np.min(cosine)), 6),
+        },
+        "ranking": {
+            f"top{k}_overlap": round(float(np.mean(overlaps)), 4),
+            "spearman": round(float(np.mean(spearman)), 4),
+            "top1_agreement": round(float(np.mean(top1)), 4),
+            "max_score_delta": round(float(np.max(np.abs(base_scores - cand_scores))) * 100, 4),
+        },
+    }
+
+
+def check_parity(backend: str, baseline: str = "torch", model_name: str = EMBEDDING_MODEL_NAME,
+                 threads: int = 0, batch_size: int = EMBEDDING_BATCH_SIZE,
+                 corpus: dict = None, top_k: int = 10) -> dict:
+    corpus = corpus or build_fixture_corpus()
+    jobs = [preprocess_text(t) for t in corpus["jobs"]]
+    resumes = [preprocess_text(t) for t in corpus["resumes"]]
+    texts = jobs + resumes
+
+    report = {"model": model_name, "texts": len(texts), "backends": {}}
+    embeddings = {}
+
+    for name in (baseline, backend):
+        model = load_sentence_model(model_name, name, threads)
+        model.encode(texts[:4], batch_size=batch_size)  # warm-up
+
+        vectors, elapsed = _encode(model, texts, batch_size)
+        embeddings[name] = vectors
+        report["backends"][name] = {
+            "seconds": round(elapsed, 4),
+            "texts_per_second": round(len(texts) / elapsed, 2) if elapsed else None,
+        }
+
+    base, cand = embeddings[baseline], embeddings[backend]
+    report.update(compare_embeddings(
+        base[:len(jobs)], base[len(jobs):], cand[:len(jobs)], cand[len(jobs):], top_k
+    ))
+
+    base_speed = report["backends"][baseline]["texts_per_second"]
+    cand_speed = report["backends"][backend]["texts_per_second"]
+    if base_speed and cand_speed:
+        report["speedup"] = round(cand_speed / base_speed, 2)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare an embedding backend against fp32 PyTorch.")
+    parser.add_argument("--backend", choices=BACKENDS, required=True)
+    parser.add_argument("--baseline", choices=BACKENDS, default="torch")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    report = check_parity(
+        args.backend,
+        baseline=args.baseline,
+        model_name=args.model,
+        threads=args.threads,
+        batch_size=args.batch_size,
+        corpus=build_fixture_corpus(args.jobs, args.resumes),
+        top_k=args.top_k,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,235 @@
-from core_engine.nlp_engine.preprocessing import preprocess_text
 from core_engine.nlp_engine.embedding_model import embedding_model
-from core_engine.nlp_engine.feature_extractor import extract_features
+from core_engine.nlp_engine.feature_extractor import compare_profile
+from core_engine.nlp_engine.document import ParsedDocument, as_document, parse_documents
+from core_engine.nlp_engine.preprocessing import preprocess_text
+from core_engine.rule_engine.skill_matcher import get_skill_index
+from core_engine import metrics
+import heapq
 import numpy as np
 
+# Blend of semantic similarity and skill match used unless a caller passes its own
+DEFAULT_WEIGHTS = {'semantic': 0.7, 'skills': 0.3}
+
 
-def rank_candidates(jd_text: str, resumes: list, weights: dict = None) -> list:
+def rank_candidates(jd_text: str, resumes: list, weights: dict = None, progress=None,
+                    top_k: int = None, shortlist: int = None, stats: dict = None) -> list:
     """
     Ranks candidates based on JD.
+    `progress(stage, done, total)` is called as each stage starts.
+
+    Two-stage mode: with `shortlist`, a cheap first pass (`shortlist_indices`)
+    keeps that many candidates and only they are embedded and scored. With
+    `top_k`, only the best `top_k` results are returned. `stats`, when
+    given, is filled with the per-stage counts (`pruning_stats`).
     """
 
     if weights is None:
-        weights = {'semantic': 0.7, 'skills': 0.3}
+        weights = DEFAULT_WEIGHTS
+
+    candidates = len(resumes)
 
     # ================================
-    # 1. PREPROCESSING
+    # 1. PARSING (one normalization pass per document)
     # ================================
-    cleaned_jd = preprocess_text(jd_text)
-    cleaned_resumes_texts = [preprocess_text(r['text']) for r in resumes]
+    with metrics.stage("rank", "preprocess", items=len(resumes) + 1):
+        skill_map = get_skill_index()
+        jd = as_document(jd_text, skill_map)
+        documents = parse_documents([r['text'] for r in resumes], skill_map)
+        resumes = [{**r, "text": doc.text} for r, doc in zip(resumes, documents)]
+
+    if shortlist and shortlist < len(resumes):
+        with metrics.stage("rank", "prefilter", items=len(resumes)):
+            kept = shortlist_indices(
+                jd, [doc.profile for doc in documents], [doc.model_text for doc in documents],
+                shortlist, weights
+            )
+            resumes = [resumes[i] for i in kept]
+            documents = [documents[i] for i in kept]
 
     # ================================
     # 2. EMBEDDINGS
     # ================================
-    jd_embedding = embedding_model.get_embeddings([cleaned_jd])[0]
+    if progress:
+        progress("embedding", 0, len(resumes))
+
+    with metrics.stage("rank", "embedding", items=len(resumes) + 1):
+        jd_embedding = embedding_model.get_embeddings([jd.model_text])[0]
+
+        if documents:
+            resume_embeddings = embedding_model.get_embeddings([doc.model_text for doc in documents])
+        else:
+            resume_embeddings = None
+
+    with metrics.stage("rank", "similarity", items=len(resumes)):
+        if resume_embeddings is not None:
+            semantic_scores = embedding_model.compute_similarities(
+                jd_embedding, resume_embeddings
+            )
+        else:
+            semantic_scores = []
+
+    # ================================
+    # 3. FEATURES (JD parsed once)
+    # ================================
+    if progress:
+        progress("scoring", 0, len(resumes))
+
+    with metrics.stage("rank", "features", items=len(resumes)):
+        jd_skills = set(jd.skills)
+        all_features = [compare_profile(doc.profile, jd_skills) for doc in documents]
+
+    with metrics.stage("rank", "scoring", items=len(resumes)):
+        results = sort_and_rank(_score(resumes, semantic_scores, all_features, weights), top_k)
+
+    if stats is not None:
+        stats.update(pruning_stats(candidates, len(resumes), len(results)))
+    return results
+
+
+# ================================
+# TWO-STAGE RANKING
+# ================================
+def prefilter_scores(jd, profiles: list, model_texts: list, weights: dict = None) -> list:
+    """
+    Cheap first-pass scores, no embeddings: skill overlap (rule engine)
+    stands in for the skill part of the final score and the share of the
+    JD's terms found in the resume for the semantic part.
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    jd_skills = set(jd.skills)
+    jd_terms = {term for term in jd.model_text.split() if len(term) > 2}
+
+    scores = []
+    for profile, model_text in zip(profiles, model_texts):
+        skill = len(jd_skills.intersection(profile["skills"])) / len(jd_skills) if jd_skills else 0.0
+        lexical = len(jd_terms.intersection(model_text.split())) / len(jd_terms) if jd_terms else 0.0
+        scores.append(weights['semantic'] * lexical + weights['skills'] * skill)
+    return scores
+
+
+def shortlist_indices(jd, profiles: list, model_texts: list, size: int,
+                      weights: dict = None) -> list:
+    """
+    Indices (in input order) of the `size` candidates with the best
+    `prefilter_scores`; ties go to more experience, then to the earlier one.
+    """
+    if size >= len(profiles):
+        return list(range(len(profiles)))
+
+    scores = prefilter_scores(jd, profiles, model_texts, weights)
+    best = heapq.nlargest(
+        size, range(len(profiles)),
+        key=lambda i: (scores[i], profiles[i]["experience_years"], -i)
+    )
+    return sorted(best)
+
+
+def pruning_stats(candidates: int, shortlisted: int, returned: int) -> dict:
+    return {
+        "candidates": candidates,
+        "shortlisted": shortlisted,
+        "pruned_prefilter": candidates - shortlisted,
+        "returned": returned,
+        "pruned_top_k": shortlisted - returned,
+    }
 
-    if cleaned_resumes_texts:
-        resume_embeddings = embedding_model.get_embeddings(cleaned_resumes_texts)
-    else:
-        resume_embeddings = []
 
+def embed_documents(documents: list):
+    """
+    Embeddings exactly as `rank_candidates` computes them for resumes.
+    Accepts `ParsedDocument`s or raw texts.
+    """
+    texts = [
+        doc.model_text if isinstance(doc, ParsedDocument) else preprocess_text(doc)
+        for doc in documents
+    ]
+    with metrics.stage("rank", "embedding", items=len(texts)):
+        return embedding_model.get_embeddings(texts)
+
+
+def rank_precomputed(jd_text, jd_embedding, resumes: list, resume_embeddings,
+                     profiles: list, weights: dict = None, top_k: int = None) -> list:
+    """
+    Same ranking as `rank_candidates`, for resumes whose embeddings
+    (from `embed_documents`) and profiles (`ParsedDocument.profile`) were
+    computed earlier. Nothing is re-encoded; the JD (text or
+    `ParsedDocument`) is parsed only if it was not already.
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    with metrics.stage("rank", "similarity", items=len(resumes)):
+        if len(resumes) > 0:
+            semantic_scores = embedding_model.compute_similarities(
+                jd_embedding, resume_embeddings
+            )
+        else:
+            semantic_scores = []
+
+    with metrics.stage("rank", "features", items=len(resumes)):
+        jd_skills = set(as_document(jd_text).skills)
+        all_features = [compare_profile(profile, jd_skills) for profile in profiles]
+
+    with metrics.stage("rank", "scoring", items=len(resumes)):
+        return sort_and_rank(_score(resumes, semantic_scores, all_features, weights), top_k)
+
+
+def prepare_job(jd_text) -> dict:
+    """
+    Everything about the JD (text or `ParsedDocument`) that scoring needs,
+    computed once so resumes can be scored in separate batches as they
+    arrive (see `score_resumes`).
+    """
+    jd = as_document(jd_text)
+    return {
+        "jd_text": jd.text,
+        "embedding": embed_documents([jd])[0],
+        "skills": set(jd.skills),
+    }
+
+
+def score_resumes(job: dict, resumes: list, weights: dict = None) -> list:
+    """
+    Scores one batch of resumes against a prepared job. Scores are the same
+    as `rank_candidates` would give; results are unsorted and have no rank
+    (see `sort_and_rank`).
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    if not resumes:
+        return []
+
+    with metrics.stage("rank", "preprocess", items=len(resumes)):
+        documents = parse_documents([r["text"] for r in resumes])
+        resumes = [{**r, "text": doc.text} for r, doc in zip(resumes, documents)]
+
+    resume_embeddings = embed_documents(documents)
+    with metrics.stage("rank", "similarity", items=len(resumes)):
+        semantic_scores = embedding_model.compute_similarities(
+            job["embedding"], resume_embeddings
+        )
+
+    with metrics.stage("rank", "features", items=len(resumes)):
+        all_features = [compare_profile(doc.profile, job["skills"]) for doc in documents]
+
+    with metrics.stage("rank", "scoring", items=len(resumes)):
+        return _score(resumes, semantic_scores, all_features, weights)
+
+
+def _score(resumes, semantic_scores, all_features, weights) -> list:
     ranked_results = []
 
     # ================================
-    # 3. SCORING LOOP
+    # 4. SCORING LOOP
     # ================================
     for i, resume in enumerate(resumes):
 
         # ---------- Semantic Score ----------
-        if len(resume_embeddings) > 0:
-            sem_score = embedding_model.compute_similarity(
-                jd_embedding, resume_embeddings[i]
-            )
+        if len(semantic_scores) > 0:
+            sem_score = semantic_scores[i]
         else:
             sem_score = 0.0
 
@@ -47,12 +237,8 @@ def rank_candidates(jd_text: str, resumes: list, weights: dict = None) -> list:
         sem_score = float(sem_score)
         sem_score = max(0.0, sem_score)
 
-        # ---------- Feature Extraction ----------
-        features = extract_features(
-            resume["text"],
-            jd_text,
-            "core_engine/skills/skill_list.txt"
-        )
+        # ---------- Features ----------
+        features = all_features[i]
 
         skill_score = float(features['skill_score'])
 
@@ -84,10 +270,18 @@ def rank_candidates(jd_text: str, resumes: list, weights: dict = None) -> list:
 
         ranked_results.append(result)
 
+    return ranked_results
+
+
+def sort_and_rank(ranked_results: list, top_k: int = None) -> list:
     # ================================
-    # 4. SORT + RANK
+    # 5. SORT + RANK (heap selection when only the top k are wanted)
     # ================================
-    ranked_results.sort(key=lambda x: x['score'], reverse=True)
+    if top_k and top_k < len(ranked_results):
+        # Same order as the full sort: nlargest is stable too
+        ranked_results = heapq.nlargest(top_k, ranked_results, key=lambda x: x['score'])
+    else:
+        ranked_results.sort(key=lambda x: x['score'], reverse=True)
 
     for i, res in enumerate(ranked_results):
         res['rank'] = i + 1
@@ -0,0 +1,433 @@
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class IndexStore:
+    """
+    Shared, durable copy of the indexes: one SQLite row per (index, model,
+    id) with the vector, or NULL once removed, and a global sequence number
+    bumped by every write. Each process (pre-fork worker) keeps its own
+    in-memory `VectorIndex` and replays the rows written since it last
+    looked, so writes from any worker are kept and seen by all of them.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors ("
+                " name TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " item_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " vector BLOB,"
+                " PRIMARY KEY (name, model, item_id))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_vectors_seq ON vectors (name, model, seq)"
+            )
+            self._conn.commit()
+
+    def write(self, name: str, model: str, ids: list, vectors=None):
+        """Stores `vectors` under `ids`, or marks `ids` removed when `vectors` is None."""
+        with self._lock:
+            # IMMEDIATE: writers from every process take the next numbers in turn
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                last = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM vectors").fetchone()[0]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO vectors (name, model, item_id, seq, vector)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (name, model, item_id, last + 1 + i,
+                         None if vectors is None else vectors[i].tobytes())
+                        for i, item_id in enumerate(ids)
+                    ],
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def changes(self, name: str, model: str, since: int) -> list:
+        """[(seq, id, vector bytes or None)] written after `since`, in order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, item_id, vector FROM vectors"
+                " WHERE name = ? AND model = ? AND seq > ? ORDER BY seq",
+                (name, model, since),
+            ).fetchall()
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over unit-normalized float32 embeddings.
+
+    - exact: one matrix-vector product over every stored row, then
+      `argpartition` for the top-k.
+    - ivf:   rows are clustered with k-means into `nlist` lists; a query is
+      only scored against the rows of its `nprobe` closest lists.
+      Falls back to exact search until there is enough data to train.
+      Training runs in a background thread, outside the index lock:
+      queries keep using the previous lists (or exact search) meanwhile.
+
+    With a `store`, every mutation is written there first and reads catch
+    up with what other processes wrote (`sync`); without one the index
+    lives in memory only.
+    """
+
+    def __init__(self, store: IndexStore = None, name: str = None, model: str = None,
+                 mode: str = "exact", nlist: int = 256, nprobe: int = 16):
+        self.store = store
+        self.name = name
+        self.model = model
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+
+        self._lock = threading.RLock()
+        self._vectors = None          # (capacity, dim), first `_size` rows used
+        self._size = 0
+        self._ids = []
+        self._pos = {}
+        self._version = 0             # bumped by every mutation
+        self._seq = 0                 # last store change applied
+
+        # IVF state
+        self._centroids = None
+        self._assign = None           # list number per row
+        self._trained_size = 0
+        self._training = None         # background training thread
+
+    # -------------------------------
+    # BASIC PROPERTIES
+    # -------------------------------
+    def __len__(self):
+        self.sync()
+        return self._size
+
+    def __contains__(self, item_id):
+        self.sync()
+        return str(item_id) in self._pos
+
+    @property
+    def dim(self):
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    def get(self, item_id):
+        self.sync()
+        with self._lock:
+            row = self._pos.get(str(item_id))
+            return None if row is None else np.array(self._vectors[row])
+
+    # -------------------------------
+    # MUTATIONS
+    # -------------------------------
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _writable(self, extra_rows: int, dim: int):
+        """Makes sure the in-memory buffer is writable and has room."""
+        if self._vectors is None:
+            capacity = max(1024, extra_rows)
+            self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+            self._assign = np.full(capacity, -1, dtype=np.int32)
+            return
+
+        if self._vectors.shape[1] != dim:
+            raise ValueError(f"Expected {self._vectors.shape[1]}-d vectors, got {dim}-d")
+
+        needed = self._size + extra_rows
+        capacity = self._vectors.shape[0]
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            grown = np.zeros((capacity, dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+
+            assign = np.full(capacity, -1, dtype=np.int32)
+            assign[:self._size] = self._assign[:self._size]
+            self._assign = assign
+
+    def upsert(self, ids: list, vectors) -> None:
+        """Adds new ids and replaces the vectors of existing ones."""
+        ids = [str(i) for i in ids]
+        vectors = self._normalize(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+
+        if self.store is not None:
+            self.store.write(self.name, self.model, ids, vectors)
+        self._apply_upsert(ids, vectors)
+
+    add = upsert
+    update = upsert
+
+    def remove(self, ids: list) -> int:
+        """Removes ids (unknown ids are ignored). Returns how many were removed."""
+        ids = [str(i) for i in ids]
+        self.sync()
+        if self.store is not None:
+            known = [item_id for item_id in ids if item_id in self._pos]
+            if known:
+                self.store.write(self.name, self.model, known)
+        return self._apply_remove(ids)
+
+    def _apply_upsert(self, ids: list, vectors):
+        with self._lock:
+            self._writable(len(ids), vectors.shape[1])
+
+            for item_id, vector in zip(ids, vectors):
+                row = self._pos.get(item_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._ids.append(item_id)
+                    self._pos[item_id] = row
+                self._vectors[row] = vector
+                self._assign[row] = self._nearest_list(vector)
+
+            self._version += 1
+
+    def _apply_remove(self, ids: list) -> int:
+        removed = 0
+        with self._lock:
+            for item_id in ids:
+                row = self._pos.pop(str(item_id), None)
+                if row is None:
+                    continue
+
+                if removed == 0:
+                    self._writable(0, self._vectors.shape[1])
+
+                # Move the last row into the freed slot
+                last = self._size - 1
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._vectors[row] = self._vectors[last]
+                    self._assign[row] = self._assign[last]
+                    self._ids[row] = moved_id
+                    self._pos[moved_id] = row
+
+                self._ids.pop()
+                self._size -= 1
+                removed += 1
+
+            if removed:
+                self._version += 1
+
+        return removed
+
+    # -------------------------------
+    # IVF (approximate mode)
+    # -------------------------------
+    def _nearest_list(self, vector) -> int:
+        if self._centroids is None:
+            return -1
+        return int(np.argmax(self._centroids @ vector))
+
+    def _maybe_train(self):
+        """Starts background training when due (call with the lock held)."""
+        if self.mode != "ivf" or self._training is not None:
+            return
+        # Need a few rows per list, retrain once the index has doubled
+        if self._size < self.nlist * 8:
+            return
+        if self._centroids is not None and self._size < 2 * self._trained_size:
+            return
+
+        def run():
+            try:
+                self.train()
+            except Exception as e:
+                logger.error(f"Vector index training failed: {e}")
+            finally:
+                with self._lock:
+                    self._training = None
+
+        self._training = threading.Thread(target=run, name="applysmart-index-train", daemon=True)
+        self._training.start()
+
+    def train(self, iterations: int = 10, sample_size: int = 50000, seed: int = 0):
+        """
+        Spherical k-means over (a sample of) the stored vectors. The lock is
+        only held to copy the sample and to install the result.
+        """
+        rng = np.random.default_rng(seed)
+        with self._lock:
+            size, version = self._size, self._version
+            nlist = min(self.nlist, size)
+            if nlist == 0:
+                return
+            rows = rng.choice(size, sample_size, replace=False) if size > sample_size else slice(0, size)
+            sample = np.array(self._vectors[rows])
+            # The whole index: its labels are the final assignment
+            full_sample = size <= sample_size
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+
+            # Per-list sums via one sort + reduceat
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            grouped = sample[np.argsort(labels, kind="stable")]
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(grouped, starts[filled], axis=0)
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            centroids = np.where(empty[:, None], centroids, sums / np.where(norms == 0, 1, norms))
+
+        centroids = centroids.astype(np.float32)
+        assign = np.argmax(sample @ centroids.T, axis=1) if full_sample else None
+
+        with self._lock:
+            self._writable(0, self._vectors.shape[1])
+            self._centroids = centroids
+            if assign is None or self._version != version:
+                # Sampled, or the index changed while training
+                assign = np.argmax(self._vectors[:self._size] @ centroids.T, axis=1)
+            self._assign[:self._size] = assign
+            self._trained_size = self._size
+
+    # -------------------------------
+    # QUERY
+    # -------------------------------
+    def search(self, query, k: int = 10, exclude: set = None, within: set = None) -> list:
+        """
+        Top-k most similar stored items: [(id, cosine similarity)],
+        best first. With `within`, only those ids are considered (scored
+        exactly).
+        """
+        query = self._normalize(query)[0]
+        self.sync()
+
+        with self._lock:
+            self._maybe_train()
+            if self._size == 0:
+                return []
+
+            if within is not None:
+                rows = np.array(
+                    sorted(self._pos[item_id] for item_id in map(str, within) if item_id in self._pos),
+                    dtype=np.int64
+                )
+                if len(rows) == 0:
+                    return []
+                scores = self._vectors[rows] @ query
+            elif self.mode == "ivf" and self._centroids is not None:
+                probes = np.argsort(self._centroids @ query)[::-1][:self.nprobe]
+                rows = np.flatnonzero(np.isin(self._assign[:self._size], probes))
+                scores = self._vectors[rows] @ query
+            else:
+                rows = None
+                scores = self._vectors[:self._size] @ query
+
+            ids = self._ids
+
+            wanted = k + len(exclude or ())
+            if wanted < len(scores):
+                top = np.argpartition(-scores, wanted)[:wanted]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for i in top:
+                item_id = ids[i if rows is None else rows[i]]
+                if exclude and item_id in exclude:
+                    continue
+                results.append((item_id, float(scores[i])))
+                if len(results) == k:
+                    break
+
+            return results
+
+    # -------------------------------
+    # SHARED STORE
+    # -------------------------------
+    def sync(self):
+        """Applies what was written to the store since the last call (by any process)."""
+        if self.store is None:
+            return
+
+        with self._lock:
+            changes = self.store.changes(self.name, self.model, self._seq)
+            if not changes:
+                return
+
+            upserts = {}
+            for seq, item_id, vector in changes:
+                if vector is None:
+                    upserts.pop(item_id, None)
+                    if upserts:
+                        self._flush_upserts(upserts)
+                    self._apply_remove([item_id])
+                else:
+                    upserts[item_id] = vector
+            self._flush_upserts(upserts)
+            self._seq = changes[-1][0]
+
+    def _flush_upserts(self, upserts: dict):
+        if upserts:
+            self._apply_upsert(
+                list(upserts), np.stack([np.frombuffer(v, dtype=np.float32) for v in upserts.values()])
+            )
+            upserts.clear()
+
+
+# ================================
+# SHARED INDEXES (resumes / jobs)
+# ================================
+_indexes = {}
+_indexes_lock = threading.Lock()
+_store = None
+
+
+def get_index(name: str) -> VectorIndex:
+    """
+    Process-wide index `name`, backed by the store shared by every process
+    (APPLYSMART_CACHE_DIR/index/vectors.sqlite3).
+    """
+    global _store
+    index = _indexes.get(name)
+    if index is not None:
+        return index
+
+    with _indexes_lock:
+        if name not in _indexes:
+            from config.cache_config import (
+                CACHE_DIR, VECTOR_INDEX_MODE, VECTOR_INDEX_NLIST, VECTOR_INDEX_NPROBE,
+            )
+            from core_engine.nlp_engine.embedding_model import EmbeddingModel
+
+            if _store is None:
+                _store = IndexStore(os.path.join(CACHE_DIR, "index", "vectors.sqlite3"))
+            _indexes[name] = VectorIndex(
+                store=_store,
+                name=name,
+                model=EmbeddingModel.model_id,
+                mode=VECTOR_INDEX_MODE,
+                nlist=VECTOR_INDEX_NLIST,
+                nprobe=VECTOR_INDEX_NPROBE,
+            )
+        return _indexes[name]
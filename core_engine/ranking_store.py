@@ -0,0 +1,204 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+class RankingStore:
+    """
+    Per-job artifacts that let `/rank-job` skip work on re-runs.
+
+    - applications: resume URL with its HTTP validators (ETag /
+      Last-Modified), raw-content hash, cleaned text, embedding, skills,
+      experience and the last score written to Supabase.
+    - jobs: hash and embedding of the JD text that was last ranked against.
+
+    Embeddings are stored together with the id of the model that produced
+    them and are ignored once the model changes.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS applications ("
+                " job_id TEXT NOT NULL,"
+                " app_id TEXT NOT NULL,"
+                " resume_url TEXT NOT NULL,"
+                " content_hash TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " embedding BLOB NOT NULL,"
+                " skills TEXT NOT NULL,"
+                " experience_years REAL NOT NULL,"
+                " score REAL,"
+                " updated_at REAL NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " PRIMARY KEY (job_id, app_id))"
+            )
+            # Stores created before the validators were kept
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(applications)")}
+            for column in ("etag", "last_modified"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE applications ADD COLUMN {column} TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_applications_content_hash"
+                " ON applications (content_hash)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " jd_hash TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " jd_embedding BLOB NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    # -------------------------------
+    # APPLICATIONS
+    # -------------------------------
+    def load_applications(self, job_id: str, model: str) -> dict:
+        """Returns {app_id: artifact dict} for one job and model."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT app_id, resume_url, content_hash, text, embedding,"
+                " skills, experience_years, score, etag, last_modified"
+                " FROM applications WHERE job_id = ? AND model = ?",
+                (str(job_id), model),
+            ).fetchall()
+
+        return {
+            app_id: {
+                "resume_url": resume_url,
+                "content_hash": content_hash,
+                "text": text,
+                "embedding": np.frombuffer(embedding, dtype=np.float32),
+                "profile": {
+                    "skills": json.loads(skills),
+                    "experience_years": experience_years,
+                },
+                "score": score,
+                "etag": etag,
+                "last_modified": last_modified,
+            }
+            for (app_id, resume_url, content_hash, text, embedding,
+                 skills, experience_years, score, etag, last_modified) in rows
+        }
+
+    def find_by_content_hash(self, content_hash: str, model: str):
+        """Any stored artifact for the same resume bytes (from any job)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, embedding, skills, experience_years"
+                " FROM applications WHERE content_hash = ? AND model = ? LIMIT 1",
+                (content_hash, model),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        text, embedding, skills, experience_years = row
+        return {
+            "text": text,
+            "embedding": np.frombuffer(embedding, dtype=np.float32),
+            "profile": {
+                "skills": json.loads(skills),
+                "experience_years": experience_years,
+            },
+        }
+
+    def save_applications(self, job_id: str, model: str, artifacts: dict):
+        """artifacts: {app_id: artifact dict as returned by load_applications}"""
+        now = time.time()
+        rows = [
+            (
+                str(job_id), str(app_id), a["resume_url"], a["content_hash"],
+                a["text"], model,
+                np.asarray(a["embedding"], dtype=np.float32).tobytes(),
+                json.dumps(sorted(a["profile"]["skills"])),
+                float(a["profile"]["experience_years"]),
+                a.get("score"), now, a.get("etag"), a.get("last_modified"),
+            )
+            for app_id, a in artifacts.items()
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO applications"
+                " (job_id, app_id, resume_url, content_hash, text, model,"
+                "  embedding, skills, experience_years, score, updated_at,"
+                "  etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def update_scores(self, job_id: str, scores: dict):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE applications SET score = ? WHERE job_id = ? AND app_id = ?",
+                [(score, str(job_id), str(app_id)) for app_id, score in scores.items()],
+            )
+            self._conn.commit()
+
+    def prune_applications(self, job_id: str, keep_ids):
+        """Drops artifacts of applications that are no longer pending."""
+        keep = {str(app_id) for app_id in keep_ids}
+        with self._lock:
+            stored = [
+                row[0] for row in self._conn.execute(
+                    "SELECT app_id FROM applications WHERE job_id = ?", (str(job_id),)
+                )
+            ]
+            self._conn.executemany(
+                "DELETE FROM applications WHERE job_id = ? AND app_id = ?",
+                [(str(job_id), app_id) for app_id in stored if app_id not in keep],
+            )
+            self._conn.commit()
+
+    # -------------------------------
+    # JOB DESCRIPTIONS
+    # -------------------------------
+    def load_jd(self, job_id: str, jd_hash: str, model: str):
+        """Stored JD embedding, or None when the JD text or model changed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT jd_embedding FROM jobs"
+                " WHERE job_id = ? AND jd_hash = ? AND model = ?",
+                (str(job_id), jd_hash, model),
+            ).fetchone()
+
+        return None if row is None else np.frombuffer(row[0], dtype=np.float32)
+
+    def save_jd(self, job_id: str, jd_hash: str, model: str, embedding):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, jd_hash, model, jd_embedding, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (str(job_id), jd_hash, model,
+                 np.asarray(embedding, dtype=np.float32).tobytes(), time.time()),
+            )
+            self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_ranking_store() -> RankingStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from config.cache_config import CACHE_DIR
+                _store = RankingStore(os.path.join(CACHE_DIR, "ranking.sqlite3"))
+    return _store
@@ -1,4 +1,9 @@
+import os
 import re
+import threading
+
+
+DEFAULT_SKILL_FILE = "core_engine/skills/skill_list.txt"
 
 
 # ================================
@@ -23,18 +28,132 @@ def load_skill_map(skill_file_path: str):
 
 
 # ================================
-# SKILL EXTRACTION
+# COMPILED SKILL INDEX
+# ================================
+def _is_word_char(ch: str) -> bool:
+    # Same definition as `\w` in Python's `re` for str patterns
+    return ch.isalnum() or ch == "_"
+
+
+class SkillIndex:
+    """
+    Precompiled trie over every skill variation.
+
+    A document is scanned in a single pass: one C-level regex finds the
+    word-boundary positions where a keyword can start, and the trie is walked
+    from each of them. A keyword only counts when it is surrounded by word
+    boundaries, exactly like the old per-keyword `\\b...\\b` search.
+    """
+
+    _END = object()
+
+    def __init__(self, skill_map: dict):
+        self.skill_map = skill_map
+        self._trie = {}
+
+        for main_skill, variations in skill_map.items():
+            for keyword in variations:
+                if not keyword:
+                    continue
+
+                node = self._trie
+                for ch in keyword:
+                    node = node.setdefault(ch, {})
+                node.setdefault(self._END, set()).add(main_skill)
+
+        if self._trie:
+            first_chars = "".join(re.escape(ch) for ch in self._trie)
+            self._start_re = re.compile(rf"\b(?=[{first_chars}])")
+        else:
+            self._start_re = None
+
+    @property
+    def skills(self) -> list:
+        return sorted(self.skill_map)
+
+    def find_matches(self, text: str, lowered: bool = False) -> list:
+        """
+        Returns every (start, end, skill) occurrence in the lowercased text,
+        ordered by position. Pass `lowered=True` when the text is already
+        lowercase to skip the copy.
+        """
+        if not text or self._start_re is None:
+            return []
+
+        if not lowered:
+            text = text.lower()
+        length = len(text)
+        trie = self._trie
+        end_marker = self._END
+        matches = []
+
+        for boundary in self._start_re.finditer(text):
+            node = trie
+            pos = boundary.start()
+
+            while pos < length:
+                node = node.get(text[pos])
+                if node is None:
+                    break
+                pos += 1
+
+                skills = node.get(end_marker)
+                if skills is None:
+                    continue
+
+                # Trailing word boundary check
+                before = _is_word_char(text[pos - 1])
+                after = pos < length and _is_word_char(text[pos])
+                if before != after:
+                    for skill in skills:
+                        matches.append((boundary.start(), pos, skill))
+
+        return matches
+
+    def extract(self, text: str) -> list:
+        """
+        Returns the sorted list of canonical skills found in the text.
+        """
+        return sorted({skill for _, _, skill in self.find_matches(text)})
+
+
+# ================================
+# INDEX CACHE (hot reload on mtime)
 # ================================
-def extract_skills(text: str, skill_map: dict) -> list:
-    text = text.lower()
-    found_skills = set()
+_index_cache = {}
+_index_lock = threading.Lock()
 
-    for main_skill, variations in skill_map.items():
-        for keyword in variations:
-            pattern = rf"\b{re.escape(keyword)}\b"
 
-            if re.search(pattern, text):
-                found_skills.add(main_skill)
-                break
+def get_skill_index(skill_file_path: str = DEFAULT_SKILL_FILE) -> SkillIndex:
+    """
+    Returns the compiled index for a skill file, loading it once and
+    rebuilding it only when the file's modification time changes.
+    """
+    mtime = os.stat(skill_file_path).st_mtime_ns
+
+    cached = _index_cache.get(skill_file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _index_lock:
+        cached = _index_cache.get(skill_file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        index = SkillIndex(load_skill_map(skill_file_path))
+        _index_cache[skill_file_path] = (mtime, index)
+        return index
+
+
+# ================================
+# SKILL EXTRACTION
+# ================================
+def extract_skills(text: str, skill_map) -> list:
+    """
+    Accepts either a compiled `SkillIndex` or a raw skill map
+    (as returned by `load_skill_map`).
+    """
+    if not isinstance(skill_map, SkillIndex):
+        skill_map = SkillIndex(skill_map)
 
-    return sorted(list(found_skills))
\ No newline at end of file
+    return skill_map.extract(text)
@@ -0,0 +1,139 @@
+import threading
+
+import numpy as np
+
+from core_engine.rule_engine.skill_matcher import get_skill_index, DEFAULT_SKILL_FILE
+
+_WORD_BITS = 64
+
+
+class SkillVocabulary:
+    """
+    Skill sets as bit vectors over the skill list: bit i is set when the
+    i-th canonical skill (sorted) is present. A vector is `words` uint64s,
+    so a whole corpus is one (N, words) array and overlaps between any two
+    corpora are AND + popcount.
+    """
+
+    def __init__(self, skills: list):
+        self.skills = list(skills)
+        self.position = {skill: i for i, skill in enumerate(self.skills)}
+        self.words = max(1, -(-len(self.skills) // _WORD_BITS))
+
+    def __len__(self):
+        return len(self.skills)
+
+    def encode(self, skills) -> np.ndarray:
+        """One skill list -> (words,) uint64. Unknown skills are ignored."""
+        return self.encode_many([skills])[0]
+
+    def encode_many(self, skill_lists: list) -> np.ndarray:
+        """Many skill lists -> (N, words) uint64."""
+        bits = np.zeros((len(skill_lists), self.words * _WORD_BITS), dtype=bool)
+        position = self.position
+        for row, skills in enumerate(skill_lists):
+            columns = [position[skill] for skill in skills if skill in position]
+            bits[row, columns] = True
+        return _pack(bits)
+
+    def decode(self, vector) -> list:
+        """(words,) uint64 -> sorted skill names."""
+        bits = self.unpack(np.asarray(vector, dtype=np.uint64).reshape(1, -1))[0]
+        return [self.skills[i] for i in np.flatnonzero(bits)]
+
+    def unpack(self, vectors) -> np.ndarray:
+        """(N, words) uint64 -> (N, len(self)) bool."""
+        return _unpack(np.asarray(vectors, dtype=np.uint64))[:, :len(self.skills)]
+
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    """(N, words * 64) bool -> (N, words) uint64, bit i of word w = column 64w + i."""
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").astype(np.uint64, copy=False)
+
+
+def _unpack(vectors: np.ndarray) -> np.ndarray:
+    as_bytes = np.ascontiguousarray(vectors.astype("<u8", copy=False)).view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little").astype(bool)
+
+
+def popcount(vectors: np.ndarray) -> np.ndarray:
+    """Set bits per vector: (..., words) -> (...)."""
+    return np.bitwise_count(vectors).sum(axis=-1, dtype=np.int32)
+
+
+# ================================
+# R x J MATCHING
+# ================================
+def match_matrix(resume_bits: np.ndarray, job_bits: np.ndarray, chunk_rows: int = 1024) -> dict:
+    """
+    Every resume against every job in one pass, the vectorized form of
+    `compare_profile` / `calculate_match_score`:
+
+        matched:    (R, J) int32  - skills the job asks for that the resume has
+        required:   (J,)   int32  - skills each job asks for
+        skill_score (R, J) float  - matched / required (0 when a job lists none),
+                                    rounded like `compare_profile`
+
+    Resumes are processed `chunk_rows` at a time to bound memory.
+    """
+    resume_bits = np.asarray(resume_bits, dtype=np.uint64)
+    job_bits = np.asarray(job_bits, dtype=np.uint64)
+
+    required = popcount(job_bits)
+    matched = np.empty((len(resume_bits), len(job_bits)), dtype=np.int32)
+
+    for start in range(0, len(resume_bits), chunk_rows):
+        chunk = resume_bits[start:start + chunk_rows]
+        matched[start:start + len(chunk)] = popcount(chunk[:, None, :] & job_bits[None, :, :])
+
+    return {
+        "matched": matched,
+        "required": required,
+        "skill_score": _score_table(int(required.max(initial=0)))[matched, required[None, :]],
+    }
+
+
+def _score_table(max_required: int) -> np.ndarray:
+    """
+    table[m, q] = round(m / q, 2), with Python's rounding so scores are
+    bit-identical to `compare_profile`; table[:, 0] = 0.
+    """
+    size = max_required + 1
+    table = np.zeros((size, size), dtype=np.float64)
+    for q in range(1, size):
+        table[:q + 1, q] = [round(m / q, 2) for m in range(q + 1)]
+    return table
+
+
+def missing_masks(resume_bits: np.ndarray, job_bits: np.ndarray) -> np.ndarray:
+    """
+    Skills each job asks for that each resume lacks, as (R, J, words)
+    bit vectors (`SkillVocabulary.decode` turns one into names). Meant for
+    a selection of pairs: the full matrix is R * J * words * 8 bytes.
+    """
+    resume_bits = np.asarray(resume_bits, dtype=np.uint64)
+    job_bits = np.asarray(job_bits, dtype=np.uint64)
+    return job_bits[None, :, :] & ~resume_bits[:, None, :]
+
+
+# ================================
+# SHARED VOCABULARY
+# ================================
+_vocabularies = {}
+_vocabulary_lock = threading.Lock()
+
+
+def get_skill_vocabulary(skill_file_path: str = DEFAULT_SKILL_FILE) -> SkillVocabulary:
+    """Vocabulary of the current skill index, rebuilt when the skill file changes."""
+    index = get_skill_index(skill_file_path)
+
+    cached = _vocabularies.get(skill_file_path)
+    if cached is not None and cached[0] is index:
+        return cached[1]
+
+    with _vocabulary_lock:
+        cached = _vocabularies.get(skill_file_path)
+        if cached is None or cached[0] is not index:
+            cached = _vocabularies[skill_file_path] = (index, SkillVocabulary(index.skills))
+        return cached[1]
@@ -0,0 +1,285 @@
+"""
+Production entry point: a pre-fork server in front of the FastAPI app.
+
+    python -m core_engine.serve
+
+The parent imports the app and loads the embedding model once, then forks
+WEB_WORKERS uvicorn processes that share the listening socket and the model
+weights (copy-on-write). Each worker is capped to its share of the cores,
+and is recycled after WEB_MAX_REQUESTS requests. Replacements are forked
+from the parent, so they start with the model already loaded.
+
+Signals to the parent:
+    SIGTERM / SIGINT  graceful shutdown (in-flight requests finish)
+    SIGHUP            rolling restart: new workers first, then the old ones stop
+
+Background tasks (/tasks/{task_id}), deferred suggestions
+(/analysis/{analysis_id}/...) and the vector index are kept in SQLite
+stores every worker reads and writes, so any worker answers a poll.
+Admission queues, rate limits and /metrics are per worker.
+"""
+import gc
+import logging
+import os
+import random
+import signal
+import sys
+import time
+
+from config.serve_config import (
+    WEB_HOST,
+    WEB_PORT,
+    WEB_WORKERS,
+    WEB_WORKER_THREADS,
+    WEB_MAX_REQUESTS,
+    WEB_MAX_REQUESTS_JITTER,
+    WEB_GRACEFUL_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Thread pools sized from these when torch / numpy are first imported
+_THREAD_ENV = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+# A worker that dies sooner than this after being forked is crash-looping
+_MIN_UPTIME = 5.0
+
+
+def worker_count() -> int:
+    return WEB_WORKERS or os.cpu_count() or 1
+
+
+def threads_per_worker(workers: int) -> int:
+    return WEB_WORKER_THREADS or max(1, (os.cpu_count() or 1) // workers)
+
+
+def cap_threads(threads: int):
+    """
+    Per-worker defaults for every thread pool that scales with the core
+    count. Must run before numpy / torch and the app config are imported;
+    values set explicitly in the environment or .env win.
+    """
+    for name in _THREAD_ENV:
+        os.environ.setdefault(name, str(threads))
+    os.environ.setdefault("EMBEDDING_THREADS", str(threads))
+    os.environ.setdefault("CPU_EXECUTOR_WORKERS", str(max(2, threads)))
+    os.environ.setdefault("CPU_MAX_CONCURRENT", str(2 * threads))
+    os.environ.setdefault("PDF_EXTRACT_WORKERS", str(threads))
+
+
+# ================================
+# SUPERVISOR
+# ================================
+class PreforkServer:
+    """
+    Forks `workers` uvicorn servers for `app` on the already bound `sock`
+    and keeps that many running until told to stop.
+    """
+
+    def __init__(self, app, sock, workers: int, threads: int = 0,
+                 max_requests: int = 0, max_requests_jitter: int = 0,
+                 graceful_timeout: float = 30.0, uvicorn_options: dict = None):
+        self.app = app
+        self.sock = sock
+        self.workers = max(1, workers)
+        self.threads = threads
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.uvicorn_options = uvicorn_options or {}
+
+        # pid -> {"generation", "started", "stopping_since"}
+        self._workers = {}
+        self._generation = 0
+        self._stopping = False
+        self._respawn_after = 0.0
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        logger.info(f"Pre-fork server {os.getpid()}: {self.workers} workers, "
+                    f"{self.threads or 'default'} threads each")
+        try:
+            while not self._stopping:
+                self._reap()
+                self._maintain()
+                time.sleep(0.2)
+        finally:
+            self._stop_all()
+            self.sock.close()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._generation += 1
+
+    # -------------------------------
+    # WORKER LIFECYCLE
+    # -------------------------------
+    def _spawn(self):
+        limit = None
+        if self.max_requests:
+            limit = self.max_requests + random.randint(0, max(0, self.max_requests_jitter))
+
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._run_worker(limit)
+            except BaseException:
+                logger.exception("Worker failed")
+            finally:
+                logging.shutdown()
+                os._exit(code)
+
+        self._workers[pid] = {
+            "generation": self._generation,
+            "started": time.monotonic(),
+            "stopping_since": None,
+        }
+
+    def _run_worker(self, limit: int) -> int:
+        """Child process: serves until stopped or `limit` requests were handled."""
+        import uvicorn
+
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_DFL)
+
+        if self.threads and "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(self.threads)
+
+        from core_engine.nlp_engine.embedding_model import embedding_model
+        if embedding_model.cache is not None:
+            embedding_model.cache.reopen()
+
+        config = uvicorn.Config(
+            self.app,
+            limit_max_requests=limit,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            **self.uvicorn_options,
+        )
+        server = uvicorn.Server(config)
+        server.run(sockets=[self.sock])
+        return 0 if server.started else 3
+
+    def _reap(self):
+        while self._workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            worker = self._workers.pop(pid, None)
+            if worker is None or worker["stopping_since"] is not None or self._stopping:
+                continue
+
+            code = os.waitstatus_to_exitcode(status)
+            uptime = time.monotonic() - worker["started"]
+            if code == 0:
+                logger.info(f"Worker {pid} recycled after {uptime:.0f}s")
+            else:
+                logger.warning(f"Worker {pid} exited with code {code} after {uptime:.1f}s")
+                if uptime < _MIN_UPTIME:
+                    self._respawn_after = time.monotonic() + 1.0
+
+    def _maintain(self):
+        now = time.monotonic()
+
+        current = sum(1 for w in self._workers.values() if w["generation"] == self._generation)
+        if now >= self._respawn_after:
+            for _ in range(self.workers - current):
+                self._spawn()
+
+        for pid, worker in list(self._workers.items()):
+            if worker["generation"] != self._generation and worker["stopping_since"] is None:
+                # Old generation after SIGHUP: its replacements are already running
+                self._signal(pid, signal.SIGTERM)
+                worker["stopping_since"] = now
+            elif (worker["stopping_since"] is not None
+                  and now - worker["stopping_since"] > self.graceful_timeout + 5):
+                logger.warning(f"Killing worker {pid}, still running after graceful shutdown")
+                self._signal(pid, signal.SIGKILL)
+
+    def _stop_all(self):
+        now = time.monotonic()
+        for pid, worker in self._workers.items():
+            if worker["stopping_since"] is None:
+                self._signal(pid, signal.SIGTERM)
+                worker["stopping_since"] = now
+
+        deadline = now + self.graceful_timeout + 5
+        while self._workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+
+        for pid in list(self._workers):
+            logger.warning(f"Killing worker {pid}, still running after graceful shutdown")
+            self._signal(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._workers.pop(pid, None)
+
+    @staticmethod
+    def _signal(pid: int, signum: int):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+
+# ================================
+# ENTRY POINT
+# ================================
+def main():
+    workers = worker_count()
+    threads = threads_per_worker(workers)
+    cap_threads(threads)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(name)s: %(message)s")
+
+    import uvicorn
+    from core_engine.main import app
+    from core_engine.nlp_engine.embedding_model import embedding_model
+
+    # Loaded (not warmed up) here: running the encoder would start its
+    # thread pool, which must not exist at fork time. Each worker warms up
+    # its copy-on-write view of the weights on startup.
+    embedding_model.load()
+    if embedding_model.cache is not None:
+        embedding_model.cache.close()
+
+    options = {"host": WEB_HOST, "port": WEB_PORT}
+    sock = uvicorn.Config(app, **options).bind_socket()
+
+    # Move everything loaded so far out of the collector's reach, so the
+    # workers' garbage collections do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    PreforkServer(
+        app,
+        sock,
+        workers=workers,
+        threads=threads,
+        max_requests=WEB_MAX_REQUESTS,
+        max_requests_jitter=WEB_MAX_REQUESTS_JITTER,
+        graceful_timeout=WEB_GRACEFUL_TIMEOUT,
+        uvicorn_options=options,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
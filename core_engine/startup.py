@@ -0,0 +1,22 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent in each startup phase, in the order they finished
+phases = {}
+
+
+def record(phase: str, seconds: float):
+    phases[phase] = round(seconds, 4)
+    logger.info(f"Startup phase '{phase}' took {seconds:.3f}s")
+
+
+@contextmanager
+def timed(phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
@@ -0,0 +1,87 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class StateStore:
+    """
+    Background tasks and deferred suggestions, shared by every worker
+    process so that a poll is answered whichever worker it reaches.
+
+    One JSON document per (kind, id). Documents with an expiry are
+    dropped once it passes (`prune`); the ones without (tasks still
+    running) are kept until they are rewritten.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " kind TEXT NOT NULL,"
+                " id TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " expires_at REAL,"
+                " PRIMARY KEY (kind, id))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries (kind, expires_at)"
+            )
+            self._conn.commit()
+
+    def put(self, kind: str, item_id: str, data: dict, ttl: float = None):
+        """Stores `data` under (kind, id), kept for `ttl` seconds (None = until rewritten)."""
+        expires_at = None if ttl is None else time.time() + ttl
+        # default=str: a stray non-JSON value must not lose the whole document
+        encoded = json.dumps(data, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (kind, id, data, expires_at) VALUES (?, ?, ?, ?)",
+                (kind, item_id, encoded, expires_at),
+            )
+            self._conn.commit()
+
+    def get(self, kind: str, item_id: str):
+        """The document stored under (kind, id), or None (unknown / expired)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM entries WHERE kind = ? AND id = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (kind, item_id, time.time()),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def prune(self, kind: str, max_items: int = None):
+        """Drops expired documents, then the oldest expiring ones beyond `max_items`."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM entries WHERE kind = ? AND expires_at <= ?", (kind, time.time())
+            )
+            if max_items is not None:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE kind = ? AND expires_at IS NOT NULL AND id NOT IN ("
+                    " SELECT id FROM entries WHERE kind = ? AND expires_at IS NOT NULL"
+                    " ORDER BY expires_at DESC LIMIT ?)",
+                    (kind, kind, max_items),
+                )
+            self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_state_store() -> StateStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from config.cache_config import CACHE_DIR
+                _store = StateStore(os.path.join(CACHE_DIR, "state.sqlite3"))
+    return _store
@@ -0,0 +1,205 @@
+"""
+The built React app (frontend/dist), served from memory.
+
+Every file is read once when the app is imported (in the pre-fork parent,
+so workers share it), with its `.br` / `.gz` siblings when present:
+
+    python -m core_engine.static_site frontend/dist   # writes them, run after `npm run build`
+
+- Fingerprinted assets (assets/<name>-<hash>.<ext>) are cached for a year
+  as immutable.
+- Everything else, index.html included, must be revalidated: answered
+  with `304 Not Modified` when the client's ETag still matches.
+- Unknown non-API paths get index.html (client-side routes). API paths
+  are never answered with the SPA.
+"""
+import argparse
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+import sys
+from pathlib import Path
+
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Vite output: assets/index-B2mXk9_a.js
+_FINGERPRINT = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+# Encodings in order of preference -> file suffix
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Worth compressing (images and fonts already are)
+_COMPRESSIBLE = {".html", ".js", ".mjs", ".css", ".json", ".map", ".svg", ".txt", ".xml", ".ico", ".wasm"}
+_MIN_COMPRESS_BYTES = 512
+
+
+class StaticFile:
+    def __init__(self, path: str, content: bytes, variants: dict):
+        self.path = path
+        self.content = content
+        self.media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.cache_control = IMMUTABLE if _FINGERPRINT.match(path) else REVALIDATE
+
+        digest = hashlib.sha256(content).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        # encoding -> (bytes, etag); each representation has its own strong ETag
+        self.variants = {
+            encoding: (data, f'"{digest}-{encoding}"') for encoding, data in variants.items()
+        }
+
+
+class StaticSite:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.files = {}
+        self.bytes = 0
+        if self.root.is_dir():
+            self._load()
+
+    @property
+    def index(self):
+        return self.files.get("index.html")
+
+    def _load(self):
+        for file in sorted(self.root.rglob("*")):
+            if not file.is_file() or file.suffix in (".br", ".gz"):
+                continue
+            path = file.relative_to(self.root).as_posix()
+            variants = {}
+            for encoding, suffix in _ENCODINGS:
+                sibling = file.with_name(file.name + suffix)
+                if sibling.is_file():
+                    variants[encoding] = sibling.read_bytes()
+            self.files[path] = StaticFile(path, file.read_bytes(), variants)
+            self.bytes += len(self.files[path].content) + sum(len(v) for v in variants.values())
+        logger.info(f"Loaded {len(self.files)} frontend files ({self.bytes / 1024:.0f} KiB) from {self.root}")
+
+    def response(self, file: StaticFile, headers) -> Response:
+        """`file` in the best encoding the client accepts, or 304 if it already has it."""
+        accepted, refused = _accepted_encodings(headers.get("accept-encoding", ""))
+        content, etag, encoding = file.content, file.etag, None
+        for name, _ in _ENCODINGS:
+            # `*` stands for the encodings not named with q=0
+            if name in file.variants and (name in accepted or ("*" in accepted and name not in refused)):
+                (content, etag), encoding = file.variants[name], name
+                break
+
+        response_headers = {"ETag": etag, "Cache-Control": file.cache_control}
+        if file.variants:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if _etag_matches(headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=response_headers)
+
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+        return Response(content, media_type=file.media_type, headers=response_headers)
+
+
+def _accepted_encodings(header: str) -> tuple:
+    """(names accepted, names refused with q=0) from an Accept-Encoding header."""
+    accepted, refused = set(), set()
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        name = name.strip().lower()
+        if name:
+            (accepted if quality > 0 else refused).add(name)
+    return accepted, refused
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+# ================================
+# ROUTE
+# ================================
+def mount(app, root: Path):
+    """
+    Registers the single catch-all GET route for the frontend. Call it after
+    every API route: it answers whatever they did not match, and refuses
+    (404) paths under an API route's first segment, so a mistyped or
+    wrong-method API call never gets index.html back.
+    """
+    from fastapi import HTTPException, Request
+
+    site = StaticSite(root)
+    api_prefixes = {
+        route.path.strip("/").split("/")[0]
+        for route in app.routes
+        if getattr(route, "path", "").strip("/")
+    }
+
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_frontend(full_path: str, request: Request):
+        """Catch-all: frontend files, else index.html (React Router SPA)."""
+        if full_path.split("/")[0] in api_prefixes:
+            raise HTTPException(status_code=404)
+
+        file = site.files.get(full_path) or site.files.get(f"{full_path.rstrip('/')}/index.html")
+        if file is None and not full_path.startswith("assets/"):
+            file = site.index
+        if file is None:
+            raise HTTPException(status_code=404)
+        return site.response(file, request.headers)
+
+    return site
+
+
+# ================================
+# PRECOMPRESSION (build step)
+# ================================
+def precompress(root: Path) -> int:
+    """Writes .gz (and .br, if the `brotli` package is installed) next to each compressible file."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        logger.warning("brotli is not installed: writing .gz files only")
+
+    written = 0
+    for file in Path(root).rglob("*"):
+        if not file.is_file() or file.suffix not in _COMPRESSIBLE:
+            continue
+        data = file.read_bytes()
+        if len(data) < _MIN_COMPRESS_BYTES:
+            continue
+
+        outputs = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            outputs.append((".br", brotli.compress(data, quality=11)))
+        for suffix, compressed in outputs:
+            # Only keep a variant that is actually smaller
+            if len(compressed) < len(data):
+                file.with_name(file.name + suffix).write_bytes(compressed)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompress the built frontend (gzip / brotli).")
+    parser.add_argument("root", nargs="?", default=str(Path(__file__).parent.parent / "frontend" / "dist"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not Path(args.root).is_dir():
+        sys.exit(f"{args.root} is not a directory (run `npm run build` first)")
+    print(f"Wrote {precompress(Path(args.root))} compressed files under {args.root}")
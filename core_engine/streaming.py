@@ -0,0 +1,342 @@
+import asyncio
+import bisect
+import json
+import logging
+import os
+
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from config.server_config import STREAM_BATCH_SIZE, STREAM_MAX_PENDING_PDFS
+from config.pdf_config import PDF_EXTRACT_WORKERS
+from core_engine.executors import run_cpu, run_io
+from core_engine.nlp_engine.ranker import prepare_job, pruning_stats, score_resumes, sort_and_rank
+from core_engine.utils.pdf_reader import submit_extraction
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+# ================================
+# EVENT ENCODING
+# ================================
+def encode_event(event: dict, fmt: str) -> str:
+    """
+    ndjson: one JSON object per line.
+    sse:    `event: <name>` + `data: <json>`, as read by EventSource.
+    """
+    data = json.dumps(event, default=str)
+    if fmt == "sse":
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def stream_format(fmt: str, accept: str) -> str:
+    if fmt:
+        return fmt
+    return "sse" if "text/event-stream" in (accept or "") else "ndjson"
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that does not listen for a disconnect while streaming:
+    the body iterator is still reading the request upload, and a disconnect
+    listener would consume its chunks. A dropped client surfaces as
+    `ClientDisconnect` from `request.stream()` instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+# ================================
+# INCREMENTAL MULTIPART READER
+# ================================
+async def iter_multipart(request):
+    """
+    Yields the parts of a multipart/form-data request as each one is fully
+    received, without waiting for (or holding) the rest of the upload:
+        ("field", name, value) or ("file", name, filename, content)
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise ValueError("Expected a multipart/form-data request")
+
+    completed = []
+    state = {"headers": {}, "field": b"", "value": b"", "data": bytearray()}
+
+    def on_part_begin():
+        state["headers"] = {}
+        state["data"] = bytearray()
+
+    def on_header_field(data, start, end):
+        state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["field"].lower()] = state["value"]
+        state["field"] = b""
+        state["value"] = b""
+
+    def on_part_data(data, start, end):
+        state["data"] += data[start:end]
+
+    def on_part_end():
+        _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8")
+        if b"filename" in options:
+            filename = options[b"filename"].decode("utf-8")
+            completed.append(("file", name, filename, bytes(state["data"])))
+        else:
+            completed.append(("field", name, state["data"].decode("utf-8")))
+        state["data"] = bytearray()
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+    })
+
+    async for chunk in request.stream():
+        if chunk:
+            parser.write(chunk)
+        while completed:
+            yield completed.pop(0)
+
+    parser.finalize()
+    while completed:
+        yield completed.pop(0)
+
+
+# ================================
+# /rank-resumes/stream
+# ================================
+async def stream_uploaded_ranking(request, fmt: str, top_k_default: int = 0):
+    """
+    Ranks resumes while they are being uploaded. Each PDF is handed to the
+    extraction pool as soon as its part is received and scored in small
+    batches once the job description is known (send `job_description`
+    before the files so scoring can start right away).
+
+    Events: received, result (with the provisional rank among the resumes
+    scored so far), error, then complete (final ordering, limited to the
+    `top_k` form field when sent) or failed. Resumes are scored as they
+    arrive, so there is no shortlist stage here.
+    """
+    queue = asyncio.Queue()
+    pending = asyncio.Semaphore(
+        STREAM_MAX_PENDING_PDFS or 2 * (PDF_EXTRACT_WORKERS or os.cpu_count() or 1)
+    )
+    extractions = set()
+
+    async def extract(index, filename, content):
+        try:
+            item = await asyncio.wrap_future(submit_extraction(content))
+        finally:
+            pending.release()
+        await queue.put(("extracted", index, filename, item))
+
+    async def read_upload():
+        try:
+            count = 0
+            async for part in iter_multipart(request):
+                if part[0] == "field":
+                    if part[1] in ("job_description", "top_k"):
+                        await queue.put((part[1], part[2]))
+                    continue
+
+                _, _, filename, content = part
+                await queue.put(("received", count, filename))
+                # Backpressure: stop reading the upload while the pool is full
+                await pending.acquire()
+                task = asyncio.ensure_future(extract(count, filename, content))
+                extractions.add(task)
+                task.add_done_callback(extractions.discard)
+                count += 1
+
+            if extractions:
+                await asyncio.gather(*list(extractions))
+            await queue.put(("end", count))
+        except ClientDisconnect:
+            await queue.put(("failed", "Client disconnected"))
+        except Exception as e:
+            await queue.put(("failed", str(e)))
+
+    reader = asyncio.ensure_future(read_upload())
+
+    job = None
+    jd_text = None
+    top_k = top_k_default
+    ready = []          # extracted, waiting for the JD or the next batch
+    scored = []         # results without text, in arrival order
+    negated_scores = [] # sorted ascending, for provisional ranks
+    errors = []
+    total = None
+
+    try:
+        while True:
+            message = await queue.get()
+            messages = [message]
+            while not queue.empty():
+                messages.append(queue.get_nowait())
+
+            events = []
+            for message in messages:
+                kind = message[0]
+                if kind == "job_description":
+                    jd_text = message[1]
+                    job = await run_cpu(prepare_job, jd_text)
+                elif kind == "top_k":
+                    try:
+                        top_k = max(0, int(message[1]))
+                    except ValueError:
+                        yield encode_event({"event": "failed", "message": "top_k must be an integer"}, fmt)
+                        return
+                elif kind == "received":
+                    events.append({"event": "received", "index": message[1], "filename": message[2]})
+                elif kind == "extracted":
+                    _, index, filename, item = message
+                    if item["error"]:
+                        errors.append({"filename": filename, "error": item["error"]})
+                        events.append({"event": "error", "index": index, "filename": filename,
+                                       "error": item["error"]})
+                    else:
+                        ready.append({"index": index, "filename": filename, "text": item["text"]})
+                elif kind == "end":
+                    total = message[1]
+                elif kind == "failed":
+                    yield encode_event({"event": "failed", "message": message[1]}, fmt)
+                    return
+
+            for event in events:
+                yield encode_event(event, fmt)
+
+            if job is not None:
+                while ready:
+                    batch, ready = ready[:STREAM_BATCH_SIZE], ready[STREAM_BATCH_SIZE:]
+                    for result in await run_cpu(score_resumes, job, batch):
+                        result.pop("text", None)
+                        bisect.insort(negated_scores, -result["score"])
+                        scored.append(result)
+                        yield encode_event({
+                            "event": "result",
+                            **result,
+                            "provisional_rank": bisect.bisect_left(negated_scores, -result["score"]) + 1,
+                            "scored": len(scored),
+                        }, fmt)
+
+            if total is not None:
+                break
+
+        if job is None:
+            yield encode_event({"event": "failed", "message": "job_description is required"}, fmt)
+            return
+
+        # Upload order first, so ties rank exactly as in /rank-resumes
+        scored.sort(key=lambda result: result["index"])
+        results = sort_and_rank(scored, top_k)
+        for result in results:
+            result.pop("index", None)
+        yield encode_event({
+            "event": "complete",
+            "job_description_snippet": jd_text[:100] + "...",
+            "results": results,
+            "errors": errors,
+            "pruning": pruning_stats(len(scored), len(scored), len(results)),
+        }, fmt)
+    finally:
+        reader.cancel()
+        for task in list(extractions):
+            task.cancel()
+
+
+# ================================
+# /rank-job/{job_id}/stream
+# ================================
+async def stream_job_ranking(rank_job, fmt: str):
+    """
+    Runs `rank_job(progress=..., on_result=...)` on the IO executor and
+    streams its progress and provisional results, then the final outcome
+    as a `complete` event (or `failed`).
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def emit(event):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def progress(stage, done=0, total=0):
+        emit({"event": "progress", "stage": stage, "done": done, "total": total})
+
+    async def run():
+        try:
+            result = await run_io(rank_job, progress=progress, on_result=emit)
+            await queue.put({"event": "complete", **result})
+        except Exception as e:
+            logger.error(f"Streaming job ranking failed: {e}")
+            await queue.put({"event": "failed", "message": str(e)})
+
+    runner = asyncio.ensure_future(run())
+    try:
+        while True:
+            event = await queue.get()
+            yield encode_event(event, fmt)
+            if event["event"] in ("complete", "failed"):
+                break
+    finally:
+        runner.cancel()
+
+
+# ================================
+# ANALYSIS + STREAMED SUGGESTIONS
+# ================================
+async def stream_analysis(payload: dict, deferred, fmt: str):
+    """
+    Streams a finished `/analyze-resume` payload as an `analysis` event,
+    then the Gemini suggestions as `suggestion` chunk events while they are
+    written, then `complete` with the final text. When Gemini fails or
+    misses its deadline, `complete` carries the fallback text instead
+    (`fallback: true`) and replaces whatever was streamed.
+    """
+    yield encode_event({"event": "analysis", **payload}, fmt)
+
+    if deferred.stream is not None:
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        chunks, done = deferred.stream.subscribe(
+            lambda chunk: loop.call_soon_threadsafe(queue.put_nowait, chunk)
+        )
+        for chunk in chunks:
+            yield encode_event({"event": "suggestion", "text": chunk}, fmt)
+
+        while not done:
+            try:
+                chunk = await asyncio.wait_for(queue.get(), deferred.remaining())
+            except asyncio.TimeoutError:
+                break
+            if chunk is None:
+                break
+            yield encode_event({"event": "suggestion", "text": chunk}, fmt)
+
+        # The call's future settles just after its last chunk
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(deferred.future)), deferred.remaining()
+            )
+        except Exception:
+            pass
+
+    yield encode_event({"event": "complete", **deferred.result()}, fmt)
+
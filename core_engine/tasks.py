@@ -0,0 +1,218 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config.server_config import TASK_WORKERS, TASK_MAX_FINISHED, TASK_RESULT_TTL, TASK_MAX_QUEUED
+from core_engine.admission import Overloaded
+from core_engine.state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Task:
+    """One background ranking run and its progress."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.stage = None
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @classmethod
+    def from_dict(cls, data: dict, result=None) -> "Task":
+        """A read-only copy of a task stored by another worker."""
+        task = cls(data["kind"])
+        task.id = data["task_id"]
+        task.status = data["status"]
+        task.stage = data["progress"]["stage"]
+        task.done = data["progress"]["done"]
+        task.total = data["progress"]["total"]
+        task.result = result
+        task.error = data["error"]
+        task.created_at = data["created_at"]
+        task.started_at = data["started_at"]
+        task.finished_at = data["finished_at"]
+        return task
+
+    def report(self, stage: str, done: int = 0, total: int = 0):
+        """Progress callback handed to the pipeline functions."""
+        self.stage = stage
+        self.done = done
+        self.total = total
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": {
+                "stage": self.stage,
+                "done": self.done,
+                "total": self.total,
+            },
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class TaskManager:
+    """
+    Registry of background tasks.
+    Tasks run in this process; their state is also written to the shared
+    state store, so any worker process can answer `get`.
+    Finished tasks are kept for `result_ttl` seconds (at most `max_finished`).
+    At most `max_queued` tasks wait for a worker; more are rejected.
+    """
+
+    def __init__(self, workers: int = TASK_WORKERS,
+                 max_finished: int = TASK_MAX_FINISHED,
+                 result_ttl: float = TASK_RESULT_TTL,
+                 max_queued: int = TASK_MAX_QUEUED):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="applysmart-task"
+        )
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.max_finished = max_finished
+        self.result_ttl = result_ttl
+        self.max_queued = max_queued
+        self.shed = 0
+
+    def submit(self, kind: str, func, *args, **kwargs) -> Task:
+        """
+        Queues `func(*args, progress=task.report, **kwargs)` and returns the
+        task immediately. Raises `Overloaded` when the queue is full.
+        """
+        task = Task(kind)
+        with self._lock:
+            self._prune()
+            if self.max_queued and self._count(QUEUED) >= self.max_queued:
+                self.shed += 1
+                raise Overloaded(
+                    "Too many background tasks queued, retry later",
+                    retry_after=self._average_duration() * self._count(QUEUED) / max(1, self.workers),
+                )
+            self._tasks[task.id] = task
+
+        self._save(task)
+        self._executor.submit(self._run, task, func, args, kwargs)
+        return task
+
+    def _count(self, status: str) -> int:
+        return sum(1 for task in self._tasks.values() if task.status == status)
+
+    def _average_duration(self) -> float:
+        durations = [
+            task.finished_at - task.started_at
+            for task in self._tasks.values()
+            if task.finished_at is not None and task.started_at is not None
+        ]
+        return sum(durations) / len(durations) if durations else 1.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._count(RUNNING),
+                "waiting": self._count(QUEUED),
+                "max_queue": self.max_queued,
+                "shed": self.shed,
+            }
+
+    def get(self, task_id: str):
+        """The task, from this process or from the shared store (blocking), or None."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+        if task is not None:
+            return task
+
+        data = get_state_store().get("task", task_id)
+        return None if data is None else Task.from_dict(data["task"], data["result"])
+
+    def _save(self, task: Task):
+        """Writes the task's state to the shared store (kept `result_ttl` once finished)."""
+        try:
+            get_state_store().put(
+                "task", task.id,
+                {"task": task.to_dict(), "result": task.result},
+                ttl=self.result_ttl if task.finished else None,
+            )
+        except Exception as e:
+            logger.error(f"Failed to store task {task.id}: {e}")
+
+    def _run(self, task: Task, func, args, kwargs):
+        task.status = RUNNING
+        task.started_at = time.time()
+        self._save(task)
+
+        def progress(stage: str, done: int = 0, total: int = 0):
+            task.report(stage, done, total)
+            self._save(task)
+
+        try:
+            result = func(*args, progress=progress, **kwargs)
+            task.report("done", task.total, task.total)
+        except Exception as e:
+            logger.exception(f"Task {task.id} ({task.kind}) failed")
+            task.error = str(e)
+            status = FAILED
+        else:
+            task.result = result
+            status = SUCCEEDED
+
+        # finished_at first: a task that reads as finished always has it
+        # (_prune and _average_duration run concurrently under submit())
+        task.finished_at = time.time()
+        task.status = status
+        self._save(task)
+
+    def _prune(self):
+        now = time.time()
+        finished = sorted(
+            (t for t in self._tasks.values() if t.finished),
+            key=lambda t: t.finished_at,
+        )
+        overflow = len(finished) - self.max_finished
+        for i, task in enumerate(finished):
+            if i < overflow or now - task.finished_at > self.result_ttl:
+                del self._tasks[task.id]
+
+        try:
+            get_state_store().prune("task", self.max_finished)
+        except Exception as e:
+            logger.error(f"Failed to prune stored tasks: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        # Tasks of this process will not finish: say so to whoever polls them
+        with self._lock:
+            unfinished = [task for task in self._tasks.values() if task.finished_at is None]
+        for task in unfinished:
+            task.error = "The server stopped before the task finished"
+            task.finished_at = time.time()
+            task.status = FAILED
+            self._save(task)
+
+
+task_manager = TaskManager()
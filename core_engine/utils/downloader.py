@@ -0,0 +1,169 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.http_config import (
+    RESUME_DOWNLOAD_WORKERS,
+    RESUME_DOWNLOAD_TIMEOUT,
+    RESUME_DOWNLOAD_RETRIES,
+    RESUME_DOWNLOAD_BACKOFF,
+    RESUME_DOWNLOAD_MAX_MB,
+)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    pass
+
+
+# One keep-alive session and pool per process, shared by every batch, so
+# connections to the storage host stay open across batches and requests.
+# Created on first use (never in a pre-fork parent).
+_session = None
+_executor = None
+_lock = threading.Lock()
+
+
+def build_session(pool_size: int = RESUME_DOWNLOAD_WORKERS) -> requests.Session:
+    """
+    Keep-alive session whose connection pool is large enough for
+    `pool_size` concurrent downloads from the same host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _fetch(session, url, timeout, max_bytes, validators=None):
+    """
+    {"content": bytes | None, "etag": str | None, "last_modified": str | None};
+    content is None when `validators` (etag, last_modified) show the stored
+    copy is still current (304 Not Modified).
+    """
+    headers = {}
+    if validators:
+        etag, last_modified = validators
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    with session.get(url, timeout=timeout, stream=True, headers=headers) as response:
+        if response.status_code in RETRYABLE_STATUS:
+            raise requests.HTTPError(
+                f"{response.status_code} Server Error for url: {url}",
+                response=response,
+            )
+        response.raise_for_status()
+
+        result = {
+            "content": None,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if response.status_code == 304:
+            return result
+
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise DownloadError(f"File too large ({declared} bytes, limit {max_bytes})")
+
+        chunks = []
+        received = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            received += len(chunk)
+            if received > max_bytes:
+                raise DownloadError(f"File too large (over {max_bytes} bytes)")
+            chunks.append(chunk)
+
+        result["content"] = b"".join(chunks)
+        return result
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS
+    return False
+
+
+def download_file(
+    session: requests.Session,
+    url: str,
+    timeout: float = RESUME_DOWNLOAD_TIMEOUT,
+    max_bytes: int = int(RESUME_DOWNLOAD_MAX_MB * 1024 * 1024),
+    retries: int = RESUME_DOWNLOAD_RETRIES,
+    backoff: float = RESUME_DOWNLOAD_BACKOFF,
+    validators: tuple = None,
+) -> dict:
+    """
+    Downloads one file (conditionally, given `validators`, see `_fetch`).
+    Connection errors, timeouts and 429/5xx responses are retried with
+    exponential backoff; anything else fails immediately.
+    """
+    attempt = 0
+    while True:
+        try:
+            return _fetch(session, url, timeout, max_bytes, validators)
+        except Exception as e:
+            if attempt >= retries or not _is_retryable(e):
+                raise
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
+
+def _shared():
+    global _session, _executor
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=RESUME_DOWNLOAD_WORKERS, thread_name_prefix="applysmart-download"
+                )
+                _session = build_session(RESUME_DOWNLOAD_WORKERS)
+    return _session, _executor
+
+
+def download_many(urls: list, validators: list = None, session: requests.Session = None,
+                  **kwargs) -> list:
+    """
+    Downloads every URL over the shared session, at most
+    RESUME_DOWNLOAD_WORKERS at a time (across all concurrent callers).
+    `validators`, one (etag, last_modified) per URL, makes the requests
+    conditional: unchanged files come back with "not_modified" and no content.
+
+    Returns one dict per URL, in input order:
+        {"url": ..., "content": bytes | None, "not_modified": bool,
+         "etag": str | None, "last_modified": str | None, "error": str | None}
+    """
+    if not urls:
+        return []
+
+    shared_session, executor = _shared()
+    session = session or shared_session
+
+    def task(url, url_validators):
+        try:
+            fetched = download_file(session, url, validators=url_validators, **kwargs)
+        except Exception as e:
+            return {"url": url, "content": None, "not_modified": False,
+                    "etag": None, "last_modified": None, "error": str(e)}
+        return {"url": url, **fetched, "not_modified": fetched["content"] is None, "error": None}
+
+    return list(executor.map(task, urls, validators or [None] * len(urls)))
+
+
+def shutdown():
+    global _session, _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _session.close()
+        _session = _executor = None
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from core_engine.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def pdf_text_key(data: bytes, variant: str = "") -> str:
+    """
+    Content address of a PDF: SHA-256 of its raw bytes, plus the extraction
+    settings (`variant`) when they change what is extracted.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest}:{variant}" if variant else digest
+
+
+# Extraction result fields kept next to the text
+_META_FIELDS = ("backend", "pages", "total_pages", "truncated", "truncated_by")
+
+
+class PdfTextCache:
+    """
+    Extracted PDF text (with its extraction metadata) keyed by the SHA-256
+    of the file.
+
+    - Memory tier: LRU of results.
+    - Disk tier (optional): SQLite rows that survive restarts, evicted
+      least-recently-used first once the stored text exceeds `disk_max_bytes`.
+
+    `bytes_saved` counts the PDF bytes that did not have to be parsed,
+    either because of a cache hit or because an identical file was already
+    being parsed (`deduplicated`).
+    """
+
+    def __init__(self, memory_items: int = 2000, cache_dir: str = None,
+                 disk_max_bytes: int = 256 * 1024 * 1024):
+        self.memory = LRUCache(max_items=memory_items)
+        self.disk_max_bytes = disk_max_bytes
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.bytes_saved = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_bytes = 0
+
+        if cache_dir:
+            try:
+                self._open_disk(cache_dir)
+            except Exception as e:
+                logger.error(f"PDF text disk cache disabled: {e}")
+                self._conn = None
+
+    # -------------------------------
+    # DISK TIER
+    # -------------------------------
+    def _open_disk(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, "pdf_text.sqlite3")
+
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(pdf_text)")}
+        if columns and "meta" not in columns:
+            # Written before extraction metadata was stored: just a cache
+            conn.execute("DROP TABLE pdf_text")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pdf_text ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " meta TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pdf_text_last_access"
+            " ON pdf_text (last_access)"
+        )
+        self._disk_bytes = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pdf_text"
+        ).fetchone()[0]
+        self._conn = conn
+
+    def _disk_get(self, key: str):
+        if self._conn is None:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, meta FROM pdf_text WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE pdf_text SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return {"text": row[0], **json.loads(row[1])}
+
+    def _disk_put(self, key: str, result: dict):
+        if self._conn is None:
+            return
+
+        text = result["text"]
+        meta = json.dumps({field: result.get(field) for field in _META_FIELDS})
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO pdf_text (key, text, meta, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, text, meta, size, time.time()),
+            )
+            if cursor.rowcount:
+                self._disk_bytes += size
+            self._conn.commit()
+            self._evict_disk()
+
+    def _evict_disk(self):
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+
+        # Drop the least recently used rows until we are back under ~90%
+        target = int(self.disk_max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM pdf_text ORDER BY last_access")
+        doomed = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= size
+
+        self._conn.executemany("DELETE FROM pdf_text WHERE key = ?", doomed)
+        self._conn.commit()
+
+    # -------------------------------
+    # PUBLIC API
+    # -------------------------------
+    def get(self, key: str, size: int = 0):
+        """
+        Cached {"text", "backend", "pages", ...} for a PDF key, or None.
+        `size` is the PDF's byte size.
+        """
+        result = self.memory.get(key)
+        if result is None:
+            result = self._disk_get(key)
+            if result is not None:
+                self.memory.put(key, result)
+                self.disk_hits += 1
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.bytes_saved += size
+        return dict(result)
+
+    def put(self, key: str, result: dict) -> None:
+        """Stores an extraction result (`pdf_reader.extract_document`)."""
+        entry = {"text": result["text"], **{field: result.get(field) for field in _META_FIELDS}}
+        self.memory.put(key, entry)
+        self._disk_put(key, entry)
+
+    def record_duplicate(self, size: int) -> None:
+        self.deduplicated += 1
+        self.bytes_saved += size
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "bytes_saved": self.bytes_saved,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "memory": self.memory.stats(),
+            "disk_enabled": self._conn is not None,
+            "disk_bytes": self._disk_bytes,
+            "disk_max_bytes": self.disk_max_bytes,
+        }
+
+
+# ================================
+# SHARED CACHE
+# ================================
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache():
+    """Process-wide cache, or None when PDF_CACHE_ENABLED is off."""
+    global _cache
+    from config.cache_config import (
+        CACHE_DIR, PDF_CACHE_ENABLED, PDF_CACHE_MEMORY_ITEMS,
+        PDF_CACHE_DISK_ENABLED, PDF_CACHE_DISK_MAX_MB,
+    )
+
+    if not PDF_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfTextCache(
+                memory_items=PDF_CACHE_MEMORY_ITEMS,
+                cache_dir=os.path.join(CACHE_DIR, "pdf_text") if PDF_CACHE_DISK_ENABLED else None,
+                disk_max_bytes=PDF_CACHE_DISK_MAX_MB * 1024 * 1024,
+            )
+        return _cache
@@ -1,10 +1,297 @@
+import importlib.util
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
 import PyPDF2
 
+from config.pdf_config import (
+    PDF_EXTRACT_WORKERS,
+    PDF_BACKEND,
+    PDF_MAX_PAGES,
+    PDF_MAX_CHARS,
+    PDF_TIME_BUDGET_SECONDS,
+    PDF_KILL_GRACE_SECONDS,
+)
+from core_engine.utils.pdf_cache import get_pdf_cache, pdf_text_key
+from core_engine.utils.pdf_workers import PdfWorkerPool
+
+
 def extract_text_from_pdf(file):
+    return read_pdf_text(file).lower()
+
+
+def read_pdf_text(file, backend: str = None) -> str:
+    """
+    Page texts of every page joined as extracted (case preserved).
+    Normalization happens once, in `nlp_engine.document.ParsedDocument`.
+    """
+    with BACKENDS[backend or PDF_BACKEND](file) as (_, pages):
+        return "".join(pages)
+
+
+# ================================
+# BACKENDS
+# ================================
+# Each backend opens a file-like object and yields (page count, iterator of
+# page texts), so pages are only parsed as far as the caller reads.
+@contextmanager
+def _pypdf2_pages(file):
     reader = PyPDF2.PdfReader(file)
-    text = ""
+    yield len(reader.pages), (page.extract_text() or "" for page in reader.pages)
+
+
+@contextmanager
+def _pdfplumber_pages(file):
+    # Optional dependency, only imported when selected
+    import pdfplumber
+
+    def texts(pages):
+        for page in pages:
+            text = page.extract_text() or ""
+            page.close()
+            yield text
+
+    with pdfplumber.open(file) as pdf:
+        yield len(pdf.pages), texts(pdf.pages)
+
+
+BACKENDS = {
+    "pypdf2": _pypdf2_pages,
+    "pdfplumber": _pdfplumber_pages,
+}
+
+_BACKEND_MODULES = {
+    "pypdf2": "PyPDF2",
+    "pdfplumber": "pdfplumber",
+}
+
+
+def available_backends() -> list:
+    """Backends whose library is installed."""
+    return [
+        name for name, module in _BACKEND_MODULES.items()
+        if importlib.util.find_spec(module) is not None
+    ]
+
+
+def extraction_options(backend: str = None, max_pages: int = None, max_chars: int = None,
+                       time_budget: float = None) -> dict:
+    """`extract_document` keyword arguments, defaulting to the configured ones."""
+    return {
+        "backend": (backend or PDF_BACKEND).lower(),
+        "max_pages": PDF_MAX_PAGES if max_pages is None else max_pages,
+        "max_chars": PDF_MAX_CHARS if max_chars is None else max_chars,
+        "time_budget": PDF_TIME_BUDGET_SECONDS if time_budget is None else time_budget,
+    }
+
+
+def _result(backend: str, text=None, error=None, pages=0, total_pages=0,
+            truncated_by=None, elapsed=0.0) -> dict:
+    return {
+        "text": text,
+        "error": error,
+        "backend": backend,
+        "pages": pages,
+        "total_pages": total_pages,
+        "truncated": truncated_by is not None,
+        "truncated_by": truncated_by,
+        "elapsed": round(elapsed, 6),
+    }
+
+
+def extract_document(data: bytes, backend: str = None, max_pages: int = None,
+                     max_chars: int = None, time_budget: float = None) -> dict:
+    """
+    Extracts one PDF (raw bytes) in this process. Never raises; returns:
+        {"text", "error", "backend", "pages", "total_pages",
+         "truncated", "truncated_by", "elapsed"}
+
+    Fast path: stops after `max_pages` pages or `max_chars` characters
+    (0 = no limit), and once `time_budget` seconds are spent (checked
+    between pages). `truncated_by` says which limit was hit.
+    """
+    options = extraction_options(backend, max_pages, max_chars, time_budget)
+    backend = options["backend"]
+    max_pages, max_chars, time_budget = (
+        options["max_pages"], options["max_chars"], options["time_budget"]
+    )
+
+    start = time.perf_counter()
+    opener = BACKENDS.get(backend)
+    if opener is None:
+        return _result(backend, error=f"Unknown PDF backend '{backend}', expected one of {list(BACKENDS)}")
+
+    parts = []
+    chars = 0
+    parsed = 0
+    truncated_by = None
+    try:
+        with opener(io.BytesIO(data)) as (total_pages, pages):
+            for text in pages:
+                parts.append(text)
+                chars += len(text)
+                parsed += 1
+                if parsed == total_pages:
+                    break
+                if max_chars and chars >= max_chars:
+                    truncated_by = "chars"
+                    break
+                if max_pages and parsed >= max_pages:
+                    truncated_by = "pages"
+                    break
+                if time_budget and time.perf_counter() - start >= time_budget:
+                    truncated_by = "time"
+                    break
+    except ImportError:
+        return _result(backend, error=f"PDF backend '{backend}' is not installed",
+                       elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return _result(backend, error=str(e), pages=parsed, elapsed=time.perf_counter() - start)
+
+    text = "".join(parts)
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars]
+        truncated_by = truncated_by or "chars"
+
+    return _result(backend, text=text, pages=parsed, total_pages=total_pages,
+                   truncated_by=truncated_by, elapsed=time.perf_counter() - start)
+
+
+# ================================
+# PARALLEL EXTRACTION
+# ================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _worker_count() -> int:
+    return PDF_EXTRACT_WORKERS or os.cpu_count() or 1
+
+
+def _hard_timeout() -> float:
+    if not PDF_TIME_BUDGET_SECONDS:
+        return None
+    return PDF_TIME_BUDGET_SECONDS + PDF_KILL_GRACE_SECONDS
+
+
+def _get_pool() -> PdfWorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PdfWorkerPool(_worker_count(), hard_timeout=_hard_timeout())
+        return _pool
+
+
+def start_pool():
+    """Starts the extraction workers ahead of the first request."""
+    if _hard_timeout() is not None or _worker_count() > 1:
+        _get_pool()
+
+
+def pool_stats() -> dict:
+    pool = _pool
+    if pool is None:
+        return {"workers": 0, "killed": 0, "crashed": 0}
+    return {"workers": pool.size, "killed": pool.killed, "crashed": pool.crashed}
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+def extract_texts_from_pdfs(blobs: list) -> list:
+    """
+    Extracts many PDFs (raw bytes) on the worker pool. Returns one
+    `extract_document` result per input, in input order. A failing, crashing
+    or stuck file only affects its own entry. Cached files are not parsed
+    again and identical files in a batch are parsed once.
+    """
+    if not blobs:
+        return []
+
+    # Not worth the IPC round trip for a single document
+    inline = len(blobs) == 1
+    futures = [submit_extraction(data, inline=inline) for data in blobs]
+    return [future.result() for future in futures]
+
+
+# ================================
+# CACHED / DEDUPLICATED SUBMISSION
+# ================================
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def submit_extraction(data: bytes, inline: bool = False, **options) -> Future:
+    """
+    Starts extracting one PDF and returns a future that resolves to an
+    `extract_document` result (it never raises), so documents can be handed
+    over one by one as they arrive. `options` override the configured
+    backend and budgets.
+
+    Served from the PDF text cache when the same bytes were parsed before
+    with the same options; a file identical to one still being parsed
+    shares that parse.
+
+    With a time budget set, extraction always runs in a worker process so a
+    document stuck inside one page can be killed (`inline` is ignored).
+    """
+    options = extraction_options(**options)
+    cache = get_pdf_cache()
+    key = None
+    if cache is not None:
+        key = pdf_text_key(
+            data, f"{options['backend']}:{options['max_pages']}:{options['max_chars']}"
+        )
+
+    if cache is not None:
+        cached = cache.get(key, len(data))
+        if cached is not None:
+            result = Future()
+            result.set_result({**cached, "error": None, "elapsed": 0.0})
+            return result
+
+        with _inflight_lock:
+            pending = _inflight.get(key)
+            if pending is not None:
+                cache.record_duplicate(len(data))
+                return pending
+            result = _inflight[key] = Future()
+    else:
+        result = Future()
+
+    def _finish(item):
+        if cache is not None:
+            # Time-truncated text depends on load, so it is not reused
+            if item["text"] is not None and item["truncated_by"] != "time":
+                cache.put(key, item)
+            with _inflight_lock:
+                _inflight.pop(key, None)
+        result.set_result(item)
+
+    if _hard_timeout() is None and (inline or _worker_count() == 1):
+        _finish(extract_document(data, **options))
+        return result
+
+    start = time.perf_counter()
 
-    for page in reader.pages:
-        text += page.extract_text() or ""
+    def _done(future):
+        try:
+            _finish(future.result())
+        except Exception as e:
+            _finish(_result(options["backend"], error=str(e) or type(e).__name__,
+                            elapsed=time.perf_counter() - start))
 
-    return text.lower()
+    try:
+        _get_pool().submit(data, options).add_done_callback(_done)
+    except Exception as e:
+        _finish(_result(options["backend"], error=str(e)))
+    return result
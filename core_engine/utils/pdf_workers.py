@@ -0,0 +1,155 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionTimeout(Exception):
+    """The worker did not answer within the hard timeout and was killed."""
+
+
+class WorkerCrashed(Exception):
+    """The worker process died while extracting."""
+
+
+def _worker_main(conn):
+    """Child process: extracts the documents sent over `conn` until told to stop."""
+    from core_engine.utils.pdf_reader import extract_document
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        data, options = request
+        conn.send(extract_document(data, **options))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn,), name="applysmart-pdf", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class PdfWorkerPool:
+    """
+    Long-lived extraction processes, each driven by its own supervisor thread.
+
+    Unlike a ProcessPoolExecutor, a document that overruns `hard_timeout`
+    only costs its own worker: that process is killed and replaced, and the
+    rest of the pool keeps going. Futures resolve to
+    the worker's result, or raise `ExtractionTimeout` / `WorkerCrashed`.
+    """
+
+    def __init__(self, workers: int, hard_timeout: float = None):
+        # spawn: never fork a parent that may already hold torch threads
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks = queue.Queue()
+        self._closed = False
+        self.hard_timeout = hard_timeout or None
+        self.killed = 0
+        self.crashed = 0
+
+        self._threads = [
+            threading.Thread(target=self._supervise, name=f"applysmart-pdf-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def size(self) -> int:
+        return len(self._threads)
+
+    def submit(self, data: bytes, options: dict) -> Future:
+        if self._closed:
+            raise RuntimeError("PDF worker pool is shut down")
+        future = Future()
+        self._tasks.put((data, options, future))
+        return future
+
+    def shutdown(self):
+        """Stops the workers once their current document is done; queued ones are cancelled."""
+        self._closed = True
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None:
+                task[2].cancel()
+        for _ in self._threads:
+            self._tasks.put(None)
+
+    def _supervise(self):
+        worker = None
+        try:
+            while True:
+                # (Re)start the process before the next document arrives, so
+                # its start-up time never counts against a document's budget
+                start_error = None
+                if worker is None and not self._closed:
+                    try:
+                        worker = _Worker(self._context)
+                    except Exception as e:
+                        logger.error(f"Could not start PDF worker: {e}")
+                        start_error = e
+
+                task = self._tasks.get()
+                if task is None:
+                    return
+                data, options, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                if worker is None:
+                    future.set_exception(WorkerCrashed(f"could not start PDF worker: {start_error}"))
+                    continue
+
+                try:
+                    worker.conn.send((data, options))
+                    if worker.conn.poll(self.hard_timeout):
+                        future.set_result(worker.conn.recv())
+                        continue
+
+                    logger.warning(f"Killing PDF worker stuck for more than {self.hard_timeout:g}s")
+                    worker.kill()
+                    worker = None
+                    self.killed += 1
+                    future.set_exception(ExtractionTimeout(
+                        f"PDF extraction timed out after {self.hard_timeout:g}s"
+                    ))
+                except (EOFError, OSError) as e:
+                    logger.error(f"PDF worker crashed: {e!r}")
+                    worker.kill()
+                    worker = None
+                    self.crashed += 1
+                    future.set_exception(WorkerCrashed(f"PDF worker crashed: {e!r}"))
+        finally:
+            if worker is not None:
+                worker.close()
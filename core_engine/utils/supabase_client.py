@@ -0,0 +1,115 @@
+import hashlib
+
+from config.supabase_config import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_CLIENT_TTL,
+    SUPABASE_CLIENT_MAX,
+    SUPABASE_WRITE_CHUNK,
+)
+from core_engine.utils.lru_cache import LRUCache
+
+# Clients are bound to a user's token, so they are cached per token
+_clients = LRUCache(max_items=SUPABASE_CLIENT_MAX, ttl=SUPABASE_CLIENT_TTL)
+# Verified token -> user id, for as long as its client
+_users = LRUCache(max_items=SUPABASE_CLIENT_MAX, ttl=SUPABASE_CLIENT_TTL)
+
+# Rows per request when reading a whole column (PostgREST caps responses)
+_PAGE_SIZE = 1000
+
+
+def get_client(token: str):
+    """
+    Returns a Supabase client authenticated as `token`, reusing the one built
+    for the same token within the last SUPABASE_CLIENT_TTL seconds.
+    """
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise Exception("Supabase credentials missing on backend")
+
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    from supabase import create_client
+
+    # Create client and set auth token
+    client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    client.postgrest.auth(token)
+    client.auth.set_session(token, token)
+
+    _clients.put(key, client)
+    return client
+
+
+class AuthError(Exception):
+    """The token was rejected by Supabase Auth."""
+
+
+def get_user_id(token: str) -> str:
+    """Id of the Supabase user `token` belongs to; raises AuthError if it is not valid."""
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    user_id = _users.get(key)
+    if user_id is not None:
+        return user_id
+
+    client = get_client(token)
+    try:
+        user = client.auth.get_user(token).user
+    except Exception as e:
+        raise AuthError(f"Invalid token: {e}")
+    if user is None:
+        raise AuthError("Invalid token")
+
+    _users.put(key, str(user.id))
+    return str(user.id)
+
+
+def verified_user_id(token: str):
+    """User id of `token` if it was verified recently (no network call), else None."""
+    return _users.get(hashlib.sha256(token.encode("utf-8")).hexdigest())
+
+
+def select_values(client, table: str, column: str) -> set:
+    """Every value of `column` in the rows of `table` the client can see (RLS applies)."""
+    values = set()
+    start = 0
+    while True:
+        rows = client.table(table).select(column).range(start, start + _PAGE_SIZE - 1).execute().data or []
+        values.update(str(row[column]) for row in rows if row.get(column) is not None)
+        if len(rows) < _PAGE_SIZE:
+            return values
+        start += _PAGE_SIZE
+
+
+def bulk_update(client, function: str, rows: list, columns: tuple,
+                chunk_size: int = SUPABASE_WRITE_CHUNK) -> list:
+    """
+    Writes `columns` of `rows` (dicts carrying "id") with one call of the
+    Postgres function `function` per chunk. The function updates existing
+    rows only and returns the ids it wrote, so rows deleted in the meantime
+    stay deleted and other columns are never overwritten.
+
+    Returns [{"id": ..., "error": str}] for every row that could not be
+    written: the whole chunk if the call failed, otherwise the ids the
+    function did not return.
+    """
+    errors = []
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        payload = [{"id": row["id"], **{column: row[column] for column in columns}} for row in chunk]
+
+        try:
+            written = client.rpc(function, {"rows": payload}).execute().data or []
+        except Exception as e:
+            errors.extend({"id": row["id"], "error": str(e)} for row in chunk)
+            continue
+
+        written = {str(item["id"] if isinstance(item, dict) else item) for item in written}
+        errors.extend(
+            {"id": row["id"], "error": "Row not updated (deleted or not writable)"}
+            for row in chunk if str(row["id"]) not in written
+        )
+
+    return errors
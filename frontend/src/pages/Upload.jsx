@@ -10,6 +10,7 @@ const Upload = () => {
   const [jdText, setJdText] = useState("");
   const [result, setResult] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [suggestionsPending, setSuggestionsPending] = useState(false);
   const { showAlert } = useDialog();
 
   const handleUpload = async () => {
@@ -27,17 +28,43 @@ const Upload = () => {
 
     try {
       const API_BASE = import.meta.env.VITE_API_URL || "";
-      const response = await fetch(`${API_BASE}/analyze-resume`, {
+      // Streamed: the score arrives as soon as it is computed, then the
+      // AI suggestions while Gemini writes them (one JSON event per line)
+      const response = await fetch(`${API_BASE}/analyze-resume/stream`, {
         method: "POST",
         body: formData,
       });
-
-      const data = await response.json();
-      setResult(data.analysis);
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+      const handleEvent = (event) => {
+        if (event.event === "analysis") {
+          setResult({ ...event.analysis, ai_suggestions: event.analysis.ai_suggestions || "" });
+          setSuggestionsPending(event.analysis.suggestions_status !== "ready");
+          setLoading(false);
+        } else if (event.event === "suggestion") {
+          setResult((prev) => ({ ...prev, ai_suggestions: prev.ai_suggestions + event.text }));
+        } else if (event.event === "complete") {
+          setResult((prev) => ({ ...prev, ai_suggestions: event.ai_suggestions }));
+          setSuggestionsPending(false);
+        }
+      };
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)));
+      }
     } catch (error) {
       await showAlert('Backend connection failed. Make sure the AI engine is running.', { variant: 'error', title: 'Connection Failed' });
     } finally {
       setLoading(false);
+      setSuggestionsPending(false);
     }
   };
 
@@ -173,6 +200,9 @@ const Upload = () => {
                 AI Suggestions
               </h4>
               <div className="suggestions-box markdown-content">
+                {suggestionsPending && !result.ai_suggestions && (
+                  <p style={{ color: "var(--text-secondary)" }}>Generating suggestions…</p>
+                )}
                 <ReactMarkdown>
                   {result.ai_suggestions}
                 </ReactMarkdown>